@@ -0,0 +1,454 @@
+"""
+Headless JSON API over the issue store, for tools that file and query issues
+in bulk (CI bots, chat intake). Runs as its own process next to the
+Streamlit app and shares its data through the same storage layer
+(HELPDESK_BACKEND, HELPDESK_DB):
+
+    python src/api.py --port 8600
+
+    GET  /issues?status=Open&urgency=High,Medium&college=MIT&from=2025-01-01&to=2025-01-31
+                &sort=oldest&limit=100&offset=0             -> {"total", "issues"}
+    GET  /issues/<id>                                        -> issue
+    POST /issues            {"issues": [{Name, Email, College, Title, Description, Urgency}, ...]}
+                                                             -> {"ids", "created"}
+    POST /issues/get        {"ids": [...]}                   -> {"issues", "missing"}
+    POST /issues/<id>/resolve  {"resolved_by", "response", "expected_version"?}
+    POST /issues/resolve    {"items": [{"id", "resolved_by", "response", "expected_version"?}, ...]}
+    GET  /stats                                              -> counts by status, urgency, college, lead
+    GET  /changes?since=<seq>&limit=500                      -> {"latest", "complete", "changes"}
+    GET  /health, GET /metrics (Prometheus text)
+
+Created issues are Open and stamped with the server's time. An issue may carry
+its own "ID": retrying a request then never files it twice (it is left out of
+"created"). Resolves check expected_version like the panel does and answer 409
+with the current issue on a conflict.
+
+Throughput comes from three things:
+- keep-alive: HTTP/1.1 connections carry many requests
+- a fixed pool of HELPDESK_API_THREADS worker threads instead of a thread
+  per connection, so each worker opens its store connections (thread-local
+  SQLite handles) once and reuses them
+- group commit: concurrent creates are queued to one writer thread that
+  writes everything waiting in a single store.insert_issues call (one lock
+  and journal append, or one transaction)
+
+Set HELPDESK_API_TOKEN to require "Authorization: Bearer <token>".
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from utils import metrics
+from utils.metrics import Histogram
+from utils.schema import SchemaVersionError
+from utils.snapshot import plain_issue
+from utils.storage import (get_store, ConflictError, IssueNotFoundError, SORT_ORDERS, URGENCY_LEVELS)
+from utils.users import is_gmail
+
+log = logging.getLogger(__name__)
+
+API_HOST = os.environ.get("HELPDESK_API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("HELPDESK_API_PORT", 8600))
+API_THREADS = int(os.environ.get("HELPDESK_API_THREADS", 32))
+API_TOKEN = os.environ.get("HELPDESK_API_TOKEN")
+
+IDLE_TIMEOUT = 15.0            # Seconds a keep-alive connection may sit idle before its worker drops it
+MAX_BODY_BYTES = 16 * 2**20
+MAX_BATCH = 5000               # Issues (or IDs, or resolves) per request
+MAX_PAGE = 1000
+GROUP_MAX_ISSUES = 10000       # Most issues one group commit writes
+
+REQUIRED_FIELDS = ["Name", "Email", "College", "Title", "Description", "Urgency"]
+
+API_SECONDS = Histogram("helpdesk_api_seconds", "API request latency per route.", ["route"])
+GROUP_ISSUES = Histogram("helpdesk_api_group_issues", "Issues written per group commit.",
+                         buckets=(1, 10, 100, 1000, 10000))
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+# ─── GROUP COMMIT ──────────────────────────────────────────────────────────────
+
+class _Pending:
+    def __init__(self, issues):
+        self.issues = issues
+        self.created = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class WriteBatcher:
+    """
+    Request threads queue their new issues and wait; one writer thread takes
+    everything queued (up to GROUP_MAX_ISSUES) and inserts it with one
+    store.insert_issues call. No timer: while one group is written, the
+    next one gathers, so an idle server adds no latency.
+    """
+
+    def __init__(self, store, max_issues=GROUP_MAX_ISSUES):
+        self.store = store
+        self.max_issues = max_issues
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, name="api-writer", daemon=True).start()
+
+    def submit(self, issues):
+        """Blocks until the issues are stored. Returns the IDs that were new."""
+        pending = _Pending(issues)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.created
+
+    def _loop(self):
+        while True:
+            group = [self._queue.get()]
+            size = len(group[0].issues)
+            while size < self.max_issues:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                group.append(pending)
+                size += len(pending.issues)
+            self._write(group, size)
+
+    def _write(self, group, size):
+        try:
+            inserted = set(self.store.insert_issues([issue for p in group for issue in p.issues]))
+            GROUP_ISSUES.observe(size)
+            for p in group:
+                # An ID sent twice counts as created for its first sender only
+                p.created = []
+                for issue in p.issues:
+                    if issue["ID"] in inserted:
+                        p.created.append(issue["ID"])
+                        inserted.discard(issue["ID"])
+        except Exception as exc:
+            for p in group:
+                p.error = exc
+        finally:
+            for p in group:
+                p.done.set()
+
+# ─── ENDPOINTS ─────────────────────────────────────────────────────────────────
+
+def _items(body, key):
+    items = body.get(key)
+    if not isinstance(items, list):
+        raise ApiError(400, f'expected a "{key}" list')
+    if len(items) > MAX_BATCH:
+        raise ApiError(413, f"at most {MAX_BATCH} {key} per request")
+    return items
+
+
+def _new_issue(raw, k, now):
+    """A validated Open issue from a request item; ApiError naming item `k` otherwise."""
+    if not isinstance(raw, dict):
+        raise ApiError(400, f"issues[{k}] is not an object")
+    issue = {c: str(raw.get(c, "") or "").strip() for c in REQUIRED_FIELDS}
+    missing = [c for c in REQUIRED_FIELDS if not issue[c]]
+    if missing:
+        raise ApiError(400, f"issues[{k}] is missing {', '.join(missing)}")
+    if not is_gmail(issue["Email"]):
+        raise ApiError(400, f"issues[{k}]: Email must be a Gmail address")
+    if issue["Urgency"] not in URGENCY_LEVELS:
+        raise ApiError(400, f"issues[{k}]: Urgency must be one of {', '.join(URGENCY_LEVELS)}")
+    issue_id = str(raw.get("ID") or "").strip() or f"{now:%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    return {**issue, "ID": issue_id, "Status": "Open", "Timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ResolvedBy": "", "Response": ""}
+
+
+def create_issues(api, body, query):
+    raw = _items(body, "issues") if "issues" in body else [body]
+    now = datetime.now()
+    issues = [_new_issue(item, k, now) for k, item in enumerate(raw)]
+    created = api.batcher.submit(issues) if issues else []
+    return 201 if created else 200, {"ids": [i["ID"] for i in issues], "created": created}
+
+
+def _date(query, key):
+    value = query.get(key, [""])[0]
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        raise ApiError(400, f"{key} must be YYYY-MM-DD")
+
+
+def _int(query, key, default, low, high):
+    try:
+        value = int(query.get(key, [default])[0])
+    except ValueError:
+        raise ApiError(400, f"{key} must be an integer")
+    return min(max(value, low), high)
+
+
+def list_issues(api, body, query):
+    urgency = [u for v in query.get("urgency", []) for u in v.split(",") if u]
+    if any(u not in URGENCY_LEVELS for u in urgency):
+        raise ApiError(400, f"urgency must be among {', '.join(URGENCY_LEVELS)}")
+    sort = query.get("sort", ["oldest"])[0]
+    if sort not in SORT_ORDERS:
+        raise ApiError(400, f"sort must be one of {', '.join(SORT_ORDERS)}")
+    page, total = api.store.query_issues(
+        status=query.get("status", [None])[0] or None,
+        urgency=urgency or None,
+        college=query.get("college", [None])[0] or None,
+        date_from=_date(query, "from"),
+        date_to=_date(query, "to"),
+        sort=sort,
+        limit=_int(query, "limit", 100, 1, MAX_PAGE),
+        offset=_int(query, "offset", 0, 0, sys.maxsize),
+    )
+    return 200, {"total": total, "issues": [plain_issue(r) for r in page.to_dict("records")]}
+
+
+def get_issue(api, body, query, issue_id):
+    issue = api.store.get(issue_id)
+    if issue is None:
+        raise ApiError(404, f"no issue {issue_id}")
+    return 200, plain_issue(issue)
+
+
+def get_issues(api, body, query):
+    found, missing = [], []
+    for issue_id in _items(body, "ids"):
+        issue = api.store.get(str(issue_id))
+        if issue is None:
+            missing.append(issue_id)
+        else:
+            found.append(plain_issue(issue))
+    return 200, {"issues": found, "missing": missing}
+
+
+def _resolve(api, issue_id, item):
+    """(HTTP status, result) for one resolve."""
+    resolved_by = str(item.get("resolved_by") or "").strip()
+    if not resolved_by:
+        return 400, {"id": issue_id, "error": "resolved_by is required"}
+    version = item.get("expected_version")
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        return 400, {"id": issue_id, "error": "expected_version must be an integer"}
+    try:
+        after = api.store.resolve(issue_id, resolved_by, str(item.get("response") or ""), expected_version=version)
+    except ConflictError as exc:
+        return 409, {"id": issue_id, "error": str(exc), "current": plain_issue(exc.current)}
+    except IssueNotFoundError:
+        return 404, {"id": issue_id, "error": f"no issue {issue_id}"}
+    return 200, {"id": issue_id, "issue": plain_issue(after)}
+
+
+def resolve_issue(api, body, query, issue_id):
+    status, result = _resolve(api, issue_id, body)
+    return status, result["issue"] if status == 200 else result
+
+
+def resolve_issues(api, body, query):
+    results = []
+    for k, item in enumerate(_items(body, "items")):
+        if not isinstance(item, dict) or not str(item.get("id") or "").strip():
+            raise ApiError(400, f'items[{k}] needs an "id"')
+        status, result = _resolve(api, str(item["id"]).strip(), item)
+        results.append({"status": status, **result})
+    return 200, {"results": results}
+
+
+def stats(api, body, query):
+    agg = api.store.aggregates()
+    return 200, {
+        "total":   agg.total(),
+        "status":  agg.by("Status"),
+        "urgency": agg.by("Urgency"),
+        "college": agg.by("College"),
+        "lead":    agg.by("ResolvedBy"),
+    }
+
+
+def changes(api, body, query):
+    since = _int(query, "since", 0, 0, sys.maxsize)
+    found, complete = api.store.changes.since(since, _int(query, "limit", 500, 1, MAX_PAGE))
+    return 200, {"latest": api.store.changes.latest(), "complete": complete, "changes": found}
+
+
+def health(api, body, query):
+    return 200, {"ok": True, "backend": type(api.store).__name__}
+
+
+# (method, path pattern, handler); "{id}" matches one path segment
+ROUTES = [
+    ("GET",  "/health",               health),
+    ("GET",  "/stats",                stats),
+    ("GET",  "/changes",              changes),
+    ("GET",  "/issues",               list_issues),
+    ("POST", "/issues",               create_issues),
+    ("POST", "/issues/get",           get_issues),
+    ("POST", "/issues/resolve",       resolve_issues),
+    ("GET",  "/issues/{id}",          get_issue),
+    ("POST", "/issues/{id}/resolve",  resolve_issue),
+]
+
+
+def match(method, path):
+    """(route pattern, handler, path args) for a request, or (None, None, ())."""
+    parts = [unquote(p) for p in path.split("/") if p]
+    for route_method, pattern, handler in ROUTES:
+        want = [p for p in pattern.split("/") if p]
+        if route_method != method or len(want) != len(parts):
+            continue
+        if all(w == "{id}" or w == p for w, p in zip(want, parts)):
+            return pattern, handler, tuple(p for w, p in zip(want, parts) if w == "{id}")
+    return None, None, ()
+
+# ─── HTTP ──────────────────────────────────────────────────────────────────────
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # Keep-alive: every response carries a Content-Length
+    timeout = IDLE_TIMEOUT
+    disable_nagle_algorithm = True  # Headers and body are two writes; don't hold the body for an ACK
+    server_version = "ResolveHubAPI/1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        t0 = time.perf_counter()
+        url = urlsplit(self.path)
+        if method == "GET" and url.path == "/metrics":
+            self._send(200, metrics.render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+            return
+        pattern, handler, args = match(method, url.path)
+        try:
+            if handler is None:
+                raise ApiError(404, f"no endpoint {method} {url.path}")
+            self._authorize()
+            body = self._body() if method == "POST" else {}
+            status, payload = handler(self.server.api, body, parse_qs(url.query), *args)
+        except ApiError as exc:
+            status, payload = exc.status, {"error": exc.message}
+        except SchemaVersionError as exc:
+            status, payload = 503, {"error": str(exc)}
+        except Exception:
+            log.exception("%s %s failed", method, url.path)
+            status, payload = 500, {"error": "internal error"}
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+        API_SECONDS.observe(time.perf_counter() - t0, route=f"{method} {pattern or 'unknown'}")
+
+    def _authorize(self):
+        if API_TOKEN and not hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {API_TOKEN}"):
+            raise ApiError(401, "missing or wrong bearer token")
+
+    def _body(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True  # Cannot tell where this request ends
+            raise ApiError(411, "Content-Length required")
+        if not length.strip().isdigit():  # Also refuses negatives, which read() would take as "until EOF"
+            self.close_connection = True
+            raise ApiError(400, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True  # The body stays unread
+            raise ApiError(413, f"body over {MAX_BODY_BYTES} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ApiError(400, "body is not valid JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "body must be a JSON object")
+        return body
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Thousands of requests a second would flood the console; see /metrics
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer whose connections are served by `threads` long-lived worker
+    threads. Store connections are per thread, so the workers are also the
+    connection pool: opened once each, reused for every request. A
+    keep-alive connection holds its worker until it closes or idles for
+    IDLE_TIMEOUT; connections beyond the pool wait in the queue.
+    """
+
+    request_queue_size = 128  # Listen backlog: bursts of new clients wait instead of being reset
+
+    def __init__(self, address, handler, threads=API_THREADS):
+        super().__init__(address, handler)
+        self._connections = queue.Queue()
+        for i in range(threads):
+            threading.Thread(target=self._worker, name=f"api-{i}", daemon=True).start()
+
+    def process_request(self, request, client_address):
+        self._connections.put((request, client_address))
+
+    def _worker(self):
+        while True:
+            request, client_address = self._connections.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+
+class Api:
+    """What the endpoints share: the store and its create batcher."""
+
+    def __init__(self, store):
+        self.store = store
+        self.batcher = WriteBatcher(store)
+
+
+def make_server(host=API_HOST, port=API_PORT, threads=API_THREADS, store=None):
+    server = PooledHTTPServer((host, port), ApiHandler, threads)
+    server.api = Api(store or get_store())
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the issue store as a JSON API.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--threads", type=int, default=API_THREADS, help="worker threads (concurrent connections)")
+    args = parser.parse_args(argv)
+
+    try:
+        server = make_server(args.host, args.port, args.threads)
+    except SchemaVersionError as exc:
+        sys.exit(str(exc))
+    print(f"ResolveHub API on http://{args.host}:{args.port} ({type(server.api.store).__name__}, {args.threads} threads)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
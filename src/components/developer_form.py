@@ -1,28 +1,40 @@
-from streamlit import st
-from ..models.issue import Issue
-from ..utils.storage import save_issue
+import streamlit as st
+
+from models.issue import Issue
+from utils.users import is_gmail
+
+URGENCY_OPTIONS = ["Low", "Medium", "High"]
 
 class DeveloperForm:
-    def __init__(self):
+    def __init__(self, email=""):
+        self.default_email = email  # Prefilled with the login, so the issue shows under My Issues
         self.name = ""
-        self.college = ""
         self.email = ""
+        self.college = ""
+        self.title = ""
         self.description = ""
+        self.urgency = ""
 
     def display_form(self):
-        st.header("Developer Intern Issue Submission")
-        self.name = st.text_input("Name")
-        self.college = st.text_input("College")
-        self.email = st.text_input("Registered Email")
-        self.description = st.text_area("Issue Description")
+        """Renders the form. Returns the submitted Issue once it validates, else None."""
+        with st.form("issue_form", clear_on_submit=True):
+            self.name        = st.text_input("Your Name", key="int_name")
+            self.email       = st.text_input("Your Email (must be @gmail.com)", value=self.default_email, key="int_email")
+            self.college     = st.text_input("Your College", key="int_college")
+            self.title       = st.text_input("Issue Title", key="int_title")
+            self.description = st.text_area("Describe the issue", key="int_description")
+            self.urgency     = st.selectbox("Urgency", URGENCY_OPTIONS, key="int_urgency")
+            submitted        = st.form_submit_button("Submit Issue")
 
-        if st.button("Submit"):
-            if self.validate_form():
-                issue = Issue(self.name, self.college, self.email, self.description)
-                save_issue(issue)
-                st.success("Issue submitted successfully!")
-            else:
-                st.error("Please fill in all fields.")
+        if not submitted:
+            return None
+        if not self.validate_form():
+            st.warning("Please fill in all the fields to proceed.")
+        elif not is_gmail(self.email):
+            st.warning("Please enter a valid Gmail address ending with @gmail.com.")
+        else:
+            return Issue(self.name, self.college, self.email, self.title, self.description, self.urgency)
+        return None
 
     def validate_form(self):
-        return all([self.name, self.college, self.email, self.description])
\ No newline at end of file
+        return all([self.name, self.email, self.college, self.title, self.description, self.urgency])
@@ -1,34 +1,52 @@
 import streamlit as st
-import pandas as pd
 
-from utils.storage import get_all_issues, save_issue
+from utils.storage import get_store, ConflictError, IssueNotFoundError
 
 class TechLeadDashboard:
-    def __init__(self):
-        self.issues_df = get_all_issues()  # Should return a DataFrame
+    def __init__(self, store=None, lead_email=None, page_size=25):
+        self.store = store or get_store()
+        self.lead_email = lead_email or st.session_state.get("user")  # Recorded as ResolvedBy
+        self.page_size = page_size
 
     def display_dashboard(self):
         st.title("Tech Lead Dashboard")
         st.write("Here are the issues submitted by developer interns:")
 
-        if self.issues_df.empty:
-            st.info("No issues submitted yet.")
+        # One page at a time, like the Tech Lead panel: nothing else is read or rendered
+        page = st.session_state.get("dash_page", 1)
+        open_issues, total = self.open_page(page)
+        last_page = max(1, -(-total // self.page_size))
+        if page > last_page:  # Issues were resolved since the page was picked
+            st.session_state.dash_page = page = last_page
+            open_issues, total = self.open_page(page)
+        if total == 0:
+            st.info("No open issues.")
             return
 
-        for idx, row in self.issues_df.iterrows():
-            self.display_issue(idx, row)
+        for _, row in open_issues.iterrows():
+            self.display_issue(row)
 
-    def display_issue(self, idx, row):
+        if last_page > 1:
+            st.number_input(f"Page (of {last_page})", min_value=1, max_value=last_page, step=1, key="dash_page")
+
+    def open_page(self, page):
+        return self.store.query_issues(status="Open", limit=self.page_size, offset=(page - 1) * self.page_size)
+
+    def display_issue(self, row):
         st.subheader(f"Issue from {row['Name']} ({row['College']})")
         st.write(f"Email: {row['Email']}")
-        st.write(f"Description: {row['Description'] if 'Description' in row else row.get('Issue', '')}")
-        st.write(f"Response: {row.get('Response', 'No response yet')}")
-        st.write(f"Status: {'Solved' if row['Status'].lower() == 'solved' else 'Unsolved'}")
-
-        if row['Status'].lower() == 'unsolved':
-            response = st.text_area(f"Response to {row['Name']}", key=f"resp_{idx}")
-            if st.button(f"Mark as Solved for {row['Name']}", key=f"solve_{idx}"):
-                self.issues_df.at[idx, 'Response'] = response
-                self.issues_df.at[idx, 'Status'] = 'Solved'
-                save_issue(self.issues_df)
-                st.success("Issue marked as solved!")
\ No newline at end of file
+        st.write(f"Description: {row['Description']}")
+        st.write(f"Response: {row.get('Response') or 'No response yet'}")
+        st.write(f"Status: {row['Status']}")
+
+        if row['Status'] == 'Open':
+            response = st.text_area(f"Response to {row['Name']}", key=f"resp_{row['ID']}")
+            if st.button(f"Mark as Resolved for {row['Name']}", key=f"solve_{row['ID']}"):
+                try:
+                    self.store.resolve(row['ID'], self.lead_email, response, expected_version=row['Version'])
+                except ConflictError:
+                    st.error("Someone else updated this issue first. Refresh to see the latest version.")
+                except IssueNotFoundError:
+                    st.error("This issue no longer exists.")
+                else:
+                    st.success("Issue marked as resolved!")
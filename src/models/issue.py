@@ -1,5 +1,8 @@
+from datetime import datetime
+
+
 class Issue:
-    def __init__(self, name, college, email, title, description, urgency, response="", status="Unsolved"):
+    def __init__(self, name, college, email, title, description, urgency, response="", status="Open"):
         self.name = name
         self.college = college
         self.email = email
@@ -7,10 +10,27 @@ class Issue:
         self.description = description
         self.urgency = urgency
         self.response = response
-        self.status = status  # "Unsolved" or "Solved"
+        self.status = status  # "Open" or "Resolved"
 
     def update_response(self, response):
         self.response = response
 
-    def mark_as_solved(self):
-        self.status = "Solved"
\ No newline at end of file
+    def mark_as_resolved(self):
+        self.status = "Resolved"
+
+    def to_record(self):
+        """The issue as the store takes it (utils/storage.py ISSUE_COLUMNS), stamped now."""
+        now = datetime.now()
+        return {
+            "ID":          now.strftime("%Y%m%d%H%M%S%f"),
+            "Name":        self.name,
+            "Email":       self.email,
+            "College":     self.college,
+            "Title":       self.title,
+            "Description": self.description,
+            "Urgency":     self.urgency,
+            "Status":      self.status,
+            "Timestamp":   now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ResolvedBy":  "",
+            "Response":    self.response,
+        }
@@ -0,0 +1,142 @@
+"""
+Accounts: registration and login for both backends, apart from the issues.
+
+The login page only needs users, so it opens them through get_accounts()
+instead of the issue store: no issue file or table is read and pandas is
+never imported. The stores use the same classes for their get_user /
+add_user, so every registration is logged to the change feed the same way.
+
+    csv     FileAccounts: users.csv (utils/users.py), feed in issues.changes.db
+    sqlite  SqliteAccounts: the users table of HELPDESK_DB, same transaction as the feed
+"""
+import os
+import sqlite3
+import threading
+
+from utils.changes import ChangeLog, register_change, bulk_register_change
+from utils.users import UserDirectory, normalize_email
+
+USERS_CSV = "users.csv"
+CHANGES_DB = "issues.changes.db"  # FileStore's change feed, next to issues.csv
+
+USERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email    TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    role     TEXT NOT NULL
+);
+"""
+
+
+class FileAccounts:
+    def __init__(self, users_path=USERS_CSV, changes=None):
+        self.users = UserDirectory(users_path)
+        self.changes = changes or ChangeLog(CHANGES_DB)
+
+    def get_user(self, email):
+        """Returns {'email', 'password', 'role'} for a registered email, or None."""
+        return self.users.get(email)
+
+    def add_user(self, email, password, role):
+        """Returns False if the email is already registered."""
+        added = self.users.add(email, password, role)
+        if added:
+            self.changes.append([register_change(normalize_email(email), role)])
+        return added
+
+    def add_users(self, users):
+        """Registers a batch of {'email', 'password', 'role'}; returns the number added."""
+        n = self.users.add_many(users)
+        if n:
+            self.changes.append([bulk_register_change(n)])
+        return n
+
+    def iter_users(self, chunk_size=10000):
+        """Every user as lists of at most chunk_size {'email', 'password', 'role'} dicts."""
+        users = self.users.users()
+        for start in range(0, len(users), chunk_size):
+            yield users[start:start + chunk_size]
+
+
+class SqliteAccounts:
+    """
+    The users table: through the store's `connect` and change feed (SqliteStore),
+    or on a connection of its own to `path` (the login page).
+    """
+
+    def __init__(self, path=None, connect=None, changes=None):
+        self.path = path
+        self._connect = connect
+        self._local = threading.local()
+        self.connect().executescript(USERS_SCHEMA)
+        self.changes = changes or ChangeLog(connect=self.connect)
+
+    def connect(self):
+        if self._connect is not None:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_user(self, email):
+        cur = self.connect().execute(
+            "SELECT email, password, role FROM users WHERE email = ?", (normalize_email(email),)
+        )
+        row = cur.fetchone()
+        return None if row is None else dict(zip(["email", "password", "role"], row))
+
+    def add_user(self, email, password, role):
+        with self.connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (email, password, role) VALUES (?, ?, ?)",
+                (normalize_email(email), str(password).strip(), role),
+            )
+            if cur.rowcount == 1:
+                self.changes.append([register_change(normalize_email(email), role)], conn)
+        return cur.rowcount == 1
+
+    def add_users(self, users):
+        with self.connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (email, password, role) VALUES (?, ?, ?)",
+                [(normalize_email(u["email"]), str(u["password"]).strip(), u["role"]) for u in users],
+            )
+            n = conn.total_changes - before
+            if n:
+                self.changes.append([bulk_register_change(n)], conn)
+            return n
+
+    def iter_users(self, chunk_size=10000):
+        cur = self.connect().execute("SELECT email, password, role FROM users ORDER BY rowid")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [dict(zip(["email", "password", "role"], row)) for row in rows]
+
+
+def create_accounts(backend=None):
+    """Accounts of `backend` (default HELPDESK_BACKEND), opened without the issue store."""
+    backend = backend or os.environ.get("HELPDESK_BACKEND", "csv")
+    if backend == "csv":
+        return FileAccounts()
+    if backend == "sqlite":
+        return SqliteAccounts(os.environ.get("HELPDESK_DB", "helpdesk.db"))
+    raise ValueError(f"Unknown HELPDESK_BACKEND: {backend!r} (expected 'csv' or 'sqlite')")
+
+
+_accounts = None
+_accounts_lock = threading.Lock()
+
+def get_accounts():
+    """Process-wide accounts shared by every Streamlit session's login page."""
+    global _accounts
+    with _accounts_lock:
+        if _accounts is None:
+            _accounts = create_accounts()
+        return _accounts
@@ -0,0 +1,112 @@
+"""
+Materialized issue counts by Status, Urgency, College and ResolvedBy.
+
+The submit and resolve write paths apply deltas, so the dashboard reads
+counts in O(distinct values) instead of scanning every issue. If the counts
+ever drift (e.g. a crash between the data write and the stats write), rebuild
+them from the data:
+
+    PYTHONPATH=src python -m utils.aggregates --rebuild
+"""
+import argparse
+import json
+import os
+
+from utils.fields import field_text
+
+DIMENSIONS = ["Status", "Urgency", "College", "ResolvedBy"]
+
+
+def _value_counts(series):
+    """{value: count} with missing values counted as "" and unused categories left out."""
+    counts = {}
+    for value, n in series.value_counts(dropna=False).items():
+        if n:
+            key = field_text(value)
+            counts[key] = counts.get(key, 0) + int(n)
+    return counts
+
+
+def contributions(issue):
+    """(dimension, value) pairs that one issue counts towards."""
+    status = field_text(issue.get("Status"))
+    pairs = [
+        ("Status", status),
+        ("Urgency", field_text(issue.get("Urgency"))),
+        ("College", field_text(issue.get("College"))),
+    ]
+    resolved_by = field_text(issue.get("ResolvedBy"))
+    if status == "Resolved" and resolved_by:
+        pairs.append(("ResolvedBy", resolved_by))
+    return pairs
+
+
+def update_delta(before, after):
+    """{(dimension, value): change} for an issue going from `before` to `after`."""
+    delta = {}
+    for pair in contributions(before):
+        delta[pair] = delta.get(pair, 0) - 1
+    for pair in contributions(after):
+        delta[pair] = delta.get(pair, 0) + 1
+    return {pair: n for pair, n in delta.items() if n}
+
+
+class IssueAggregates:
+    def __init__(self, counts=None):
+        counts = counts or {}
+        self.counts = {d: dict(counts.get(d, {})) for d in DIMENSIONS}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Full rebuild from an issues frame (string or categorical columns)."""
+        agg = cls()
+        for d in ("Status", "Urgency", "College"):
+            agg.counts[d] = _value_counts(df[d])
+        resolved = df[(df["Status"] == "Resolved") & df["ResolvedBy"].notna() & (df["ResolvedBy"] != "")]
+        agg.counts["ResolvedBy"] = _value_counts(resolved["ResolvedBy"])
+        return agg
+
+    def apply(self, delta):
+        for (dimension, value), n in delta.items():
+            counts = self.counts[dimension]
+            counts[value] = counts.get(value, 0) + n
+            if counts[value] <= 0:
+                del counts[value]
+
+    def add(self, issue):
+        self.apply({pair: 1 for pair in contributions(issue)})
+
+    def by(self, dimension):
+        return dict(self.counts[dimension])
+
+    def total(self):
+        return sum(self.counts["Status"].values())
+
+    # Persistence
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.counts, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the materialized issue counts.")
+    parser.add_argument("--rebuild", action="store_true", help="recount from the issue data")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store()
+    if args.rebuild:
+        store.rebuild_aggregates()
+    print(json.dumps(store.aggregates().counts, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
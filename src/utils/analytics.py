@@ -0,0 +1,469 @@
+"""
+Resolution-time, backlog and SLA analytics from persisted daily rollups.
+
+Every issue adds to per-day counters, kept per dimension like the
+materialized counts in utils/aggregates.py:
+
+    dimension   All, Urgency, College, ResolvedBy (resolutions only)
+    opened      issues submitted that day (by Timestamp)
+    resolved    issues resolved that day (by ResolvedAt), with the total
+                `hours` they took and a histogram of them over HOUR_BUCKETS
+    breached    of those, resolved later than SLA_HOURS for their urgency
+
+The write paths apply deltas, so the dashboard reads O(days x values) rows
+however many issues there are: the backlog curve is the running sum of
+opened - resolved, and p50/p90/p99 are interpolated from the summed
+histograms (to within one bucket, about 20%). Issues resolved before
+ResolvedAt was recorded have no resolution time and are left out entirely.
+The CSV backend keeps the rollups in issues.rollups.db, SQLite in its own
+database (updated in the same transaction as the write).
+
+SLA targets in hours per urgency, HELPDESK_SLA_HOURS="High=24,Medium=72,Low=168"
+by default; changing them (or HOUR_BUCKETS) rebuilds the rollups on next read.
+
+    PYTHONPATH=src python -m utils.analytics report --by College --days 30
+    PYTHONPATH=src python -m utils.analytics report --by Urgency --exact
+    PYTHONPATH=src python -m utils.analytics backlog --days 14
+    PYTHONPATH=src python -m utils.analytics rebuild
+"""
+import argparse
+import math
+import os
+import sqlite3
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.fields import field_datetime, field_text
+from utils.cache import issue_cache
+
+
+def _parse_sla(spec):
+    return {level.strip(): float(hours) for level, hours in (part.split("=") for part in spec.split(",") if part)}
+
+
+SLA_HOURS = _parse_sla(os.environ.get("HELPDESK_SLA_HOURS", "High=24,Medium=72,Low=168"))
+
+# Upper bounds of the resolution-time histogram: 1 minute to 180 days, ~19% apart. A last
+# bucket holds anything longer
+HOUR_BUCKETS = np.geomspace(1 / 60, 180 * 24, 73)
+QUANTILES = (0.5, 0.9, 0.99)
+
+DIMENSIONS = ["All", "Urgency", "College", "ResolvedBy"]
+ROLLUP_COLUMNS = ["ID", "Urgency", "College", "Status", "Timestamp", "ResolvedBy", "ResolvedAt"]
+DAY_FORMAT = "%Y-%m-%d"
+
+# Stored with the rollups; counts written under another layout are rebuilt
+LAYOUT = f"{len(HOUR_BUCKETS)}:{HOUR_BUCKETS[0]:.6g}:{HOUR_BUCKETS[-1]:.6g}:" + ",".join(
+    f"{k}={v:g}" for k, v in sorted(SLA_HOURS.items()))
+
+COUNTERS = ["opened", "resolved", "breached", "hours"]
+N_BUCKETS = len(HOUR_BUCKETS) + 1  # The last one holds anything slower than HOUR_BUCKETS[-1]
+HIST_COLUMNS = [f"h{b}" for b in range(N_BUCKETS)]
+KEY_COLUMNS = ["dimension", "day", "value"]
+WIDTH = len(COUNTERS) + N_BUCKETS
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    dimension TEXT NOT NULL,
+    day       TEXT NOT NULL,  -- YYYY-MM-DD
+    value     TEXT NOT NULL,
+    opened    INTEGER NOT NULL DEFAULT 0,
+    resolved  INTEGER NOT NULL DEFAULT 0,
+    breached  INTEGER NOT NULL DEFAULT 0,
+    hours     REAL NOT NULL DEFAULT 0,
+    hist      BLOB NOT NULL DEFAULT x'',  -- int64 count per bucket; empty while nothing was resolved
+    PRIMARY KEY (dimension, day, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- Bumped by every change; keys the cached reads
+INSERT OR IGNORE INTO rollup_meta (key, value) VALUES ('version', 0);
+"""
+
+# ─── CONTRIBUTIONS ─────────────────────────────────────────────────────────────
+#
+# A rollup row is (dimension, day, value) plus WIDTH numbers: COUNTERS, then
+# the histogram. Deltas are {(dimension, day, value): vector}; bulk paths use
+# frames with KEY_COLUMNS + COUNTERS + HIST_COLUMNS.
+
+
+def contributions(issue):
+    """{(dimension, day, value): vector} that one issue adds to the rollups."""
+    opened = field_datetime(issue.get("Timestamp"))
+    resolved_at = field_datetime(issue.get("ResolvedAt"))
+    resolved = field_text(issue.get("Status")) == "Resolved"
+    if opened is None or (resolved and resolved_at is None):
+        return {}
+    urgency = field_text(issue.get("Urgency"))
+    groups = [("All", ""), ("Urgency", urgency), ("College", field_text(issue.get("College")))]
+    day = opened.strftime(DAY_FORMAT)
+    out = {}
+    for dimension, value in groups:
+        out[(dimension, day, value)] = vec = np.zeros(WIDTH)
+        vec[0] = 1
+    if resolved:
+        hours = max((resolved_at - opened).total_seconds() / 3600, 0.0)
+        lead = field_text(issue.get("ResolvedBy"))
+        day = resolved_at.strftime(DAY_FORMAT)
+        for dimension, value in groups + ([("ResolvedBy", lead)] if lead else []):
+            vec = out.setdefault((dimension, day, value), np.zeros(WIDTH))
+            vec[1] += 1
+            vec[2] += hours > SLA_HOURS.get(urgency, math.inf)
+            vec[3] += hours
+            vec[len(COUNTERS) + bisect_left(HOUR_BUCKETS, hours)] += 1
+    return out
+
+
+def update_delta(before, after):
+    """{key: change} for an issue going from `before` to `after`."""
+    delta = contributions(after)
+    for key, vec in contributions(before).items():
+        delta[key] = delta[key] - vec if key in delta else -vec
+    return {key: vec for key, vec in delta.items() if vec.any()}
+
+
+def _strings(series):
+    return series.astype(object).where(series.notna(), "").astype(str).to_numpy()
+
+
+def _accumulate(dimension, days, values, columns, amounts):
+    """Rollup frame summing `amounts` into `columns` per (day, value); days are datetime64[D]."""
+    value_codes, value_names = pd.factorize(values)
+    codes, keys = pd.factorize(days.astype("int64") * max(len(value_names), 1) + value_codes)
+    dense = np.bincount(codes * WIDTH + columns, weights=amounts, minlength=len(keys) * WIDTH)
+    out = pd.DataFrame(dense.reshape(len(keys), WIDTH), columns=COUNTERS + HIST_COLUMNS)
+    day_numbers, value_index = np.divmod(keys, max(len(value_names), 1))
+    out.insert(0, "dimension", dimension)
+    out.insert(1, "day", np.datetime_as_string(day_numbers.astype("datetime64[D]"), unit="D"))
+    out.insert(2, "value", np.asarray(value_names, dtype=object)[value_index] if len(keys) else [])
+    return out
+
+
+def frame_contributions(df):
+    """contributions() summed over every row of a typed frame (ROLLUP_COLUMNS), vectorized: a rollup frame."""
+    ts = df["Timestamp"].to_numpy()
+    resolved_at = df["ResolvedAt"].to_numpy()
+    is_resolved = (df["Status"] == "Resolved").to_numpy()
+    keep = ~np.isnat(ts) & ~(is_resolved & np.isnat(resolved_at))
+    urgency = _strings(df["Urgency"])
+    groups = {
+        "All":        np.full(len(df), "", dtype=object),
+        "Urgency":    urgency,
+        "College":    _strings(df["College"]),
+        "ResolvedBy": _strings(df["ResolvedBy"]),
+    }
+
+    r = keep & is_resolved
+    n = int(r.sum())
+    hours = np.maximum((resolved_at[r] - ts[r]) / np.timedelta64(1, "h"), 0.0)
+    sla = pd.Series(urgency[r]).map(SLA_HOURS).astype(float).fillna(np.inf).to_numpy()
+    # Per resolution: resolved, breached, hours and its histogram bucket
+    columns = np.concatenate([np.full(n, 1), np.full(n, 2), np.full(n, 3),
+                              len(COUNTERS) + np.searchsorted(HOUR_BUCKETS, hours, side="left")])
+    amounts = np.concatenate([np.ones(n), (hours > sla).astype(float), hours, np.ones(n)])
+    opened_day = ts[keep].astype("datetime64[D]")
+    resolved_day = np.tile(resolved_at[r].astype("datetime64[D]"), 4)
+
+    parts = []
+    for dimension, values in groups.items():
+        if dimension == "ResolvedBy":
+            led = np.tile(values[r] != "", 4)
+            parts.append(_accumulate(dimension, resolved_day[led], np.tile(values[r], 4)[led],
+                                     columns[led], amounts[led]))
+            continue
+        parts.append(_accumulate(
+            dimension,
+            np.concatenate([opened_day, resolved_day]),
+            np.concatenate([values[keep], np.tile(values[r], 4)]),
+            np.concatenate([np.zeros(len(opened_day), dtype=int), columns]),
+            np.concatenate([np.ones(len(opened_day)), amounts]),
+        ))
+    return combine(parts)
+
+
+def combine(frames):
+    """One rollup frame summing every row with the same key."""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS + COUNTERS + HIST_COLUMNS)
+    return pd.concat(frames, ignore_index=True).groupby(KEY_COLUMNS, sort=False).sum().reset_index()
+
+
+def batch_delta(issues):
+    """Summed contributions of new issues (dicts); vectorized for large batches."""
+    if len(issues) >= 100:
+        from utils.snapshot import typed_issues
+        frame = frame_contributions(typed_issues(pd.DataFrame(issues, columns=ROLLUP_COLUMNS)))
+        return dict(zip(zip(*(frame[c] for c in KEY_COLUMNS)), frame[COUNTERS + HIST_COLUMNS].to_numpy()))
+    delta = {}
+    for issue in issues:
+        for key, vec in contributions(issue).items():
+            delta[key] = delta[key] + vec if key in delta else vec
+    return delta
+
+# ─── PERSISTENCE ───────────────────────────────────────────────────────────────
+
+def _pack(vec):
+    """Column values for one rollup vector."""
+    hist = vec[len(COUNTERS):]
+    blob = np.rint(hist).astype("<i8").tobytes() if hist.any() else b""
+    opened, resolved, breached = np.rint(vec[:3]).astype(int).tolist()
+    return opened, resolved, breached, float(vec[3]), blob
+
+
+def _unpack(opened, resolved, breached, hours, hist):
+    vec = np.zeros(WIDTH)
+    vec[:len(COUNTERS)] = opened, resolved, breached, hours
+    if hist:
+        vec[len(COUNTERS):] = np.frombuffer(hist, dtype="<i8")
+    return vec
+
+
+class DailyRollups:
+    """
+    Rollup rows in SQLite: in a file of their own (`path`, CSV backend), or
+    in the store's database through its `connect` (SQLite backend, `name`
+    being its path), in which case writes take the caller's connection and
+    run in its transaction. Reads are cached until the next change.
+    """
+
+    def __init__(self, path=None, connect=None, name=None):
+        self.path = path
+        self._connect = connect
+        self._local = threading.local()
+        self._cache_name = "rollups:" + os.path.abspath(name or path)
+        if connect is not None:
+            connect().executescript(ROLLUP_SCHEMA)
+
+    def connect(self):
+        if self._connect is not None:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(ROLLUP_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def is_built(self, conn=None):
+        row = (conn or self.connect()).execute("SELECT value FROM rollup_meta WHERE key = 'layout'").fetchone()
+        return row is not None and row[0] == LAYOUT
+
+    def _write(self, conn, fn):
+        if conn is not None:
+            return fn(conn)
+        conn = self.connect()
+        with conn:
+            return fn(conn)
+
+    def apply(self, delta, conn=None):
+        """Adds a delta. A no-op until the rollups are built: the rebuild will count this write."""
+        def write(conn):
+            if not delta or not self.is_built(conn):
+                return
+            for key, change in delta.items():
+                row = conn.execute(
+                    "SELECT opened, resolved, breached, hours, hist FROM rollups "
+                    "WHERE dimension = ? AND day = ? AND value = ?", key).fetchone()
+                vec = change if row is None else _unpack(*row) + change
+                if np.abs(vec).max() < 1e-9:
+                    conn.execute("DELETE FROM rollups WHERE dimension = ? AND day = ? AND value = ?", key)
+                else:
+                    conn.execute("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (*key, *_pack(vec)))
+            self._bump_version(conn)
+        self._write(conn, write)
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE rollup_meta SET value = value + 1 WHERE key = 'version'")
+
+    def version(self):
+        return self.connect().execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone()[0]
+
+    def _cached(self, name, loader):
+        return issue_cache.get(f"{self._cache_name}:{name}", self.version(), loader)
+
+    def replace(self, frame, conn=None):
+        """Replaces every row with a rollup frame (from frame_contributions) and marks the rollups built."""
+        keys = zip(*(frame[c] for c in KEY_COLUMNS))
+        rows = [(*key, *_pack(vec)) for key, vec in zip(keys, frame[COUNTERS + HIST_COLUMNS].to_numpy())]
+
+        def write(conn):
+            conn.execute("DELETE FROM rollups")
+            conn.executemany("INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO rollup_meta (key, value) VALUES ('layout', ?)", (LAYOUT,))
+            self._bump_version(conn)
+        self._write(conn, write)
+
+    def totals(self, dimension, date_from=None, date_to=None, resolved_only=False):
+        """Frame indexed by value: COUNTERS and HIST_COLUMNS summed over the days in [date_from, date_to]. Read-only."""
+        return self._cached(f"totals:{dimension}:{date_from}:{date_to}:{resolved_only}",
+                            lambda: self._totals(dimension, date_from, date_to, resolved_only))
+
+    def _totals(self, dimension, date_from, date_to, resolved_only):
+        cur = self.connect().execute(
+            "SELECT value, opened, resolved, breached, hours, hist FROM rollups "
+            "WHERE dimension = ? AND day >= ? AND day <= ?" + (" AND resolved != 0" if resolved_only else ""),
+            (dimension, str(date_from or ""), str(date_to or "9999-12-31")),
+        )
+        rows = cur.fetchall()
+        dense = np.zeros((len(rows), WIDTH))
+        dense[:, :len(COUNTERS)] = np.array([row[1:5] for row in rows], dtype=float).reshape(len(rows), len(COUNTERS))
+        filled = [i for i, row in enumerate(rows) if row[5]]
+        if filled:
+            blobs = b"".join(rows[i][5] for i in filled)
+            dense[filled, len(COUNTERS):] = np.frombuffer(blobs, dtype="<i8").reshape(len(filled), N_BUCKETS)
+        frame = pd.DataFrame(dense, columns=COUNTERS + HIST_COLUMNS)
+        frame.insert(0, "value", [row[0] for row in rows])
+        return frame.groupby("value").sum()
+
+    def daily(self, dimension, value=""):
+        """Frame of day, opened, resolved for one value of `dimension`, every day with either. Read-only."""
+        def load():
+            cur = self.connect().execute(
+                "SELECT day, opened, resolved FROM rollups WHERE dimension = ? AND value = ? ORDER BY day",
+                (dimension, value),
+            )
+            return pd.DataFrame(cur.fetchall(), columns=["day", "opened", "resolved"])
+        return self._cached(f"daily:{dimension}:{value}", load)
+
+# ─── REPORTS ───────────────────────────────────────────────────────────────────
+
+def _percentiles(hist, quantiles):
+    """(groups x buckets) histogram counts -> (groups x quantiles) hours, interpolated within a bucket."""
+    lower = np.concatenate([[0.0], HOUR_BUCKETS])
+    upper = np.concatenate([HOUR_BUCKETS, HOUR_BUCKETS[-1:]])  # The overflow bucket reports its lower edge
+    cum = hist.cumsum(axis=1)
+    rows = np.arange(len(hist))
+    out = np.empty((len(hist), len(quantiles)))
+    for j, q in enumerate(quantiles):
+        target = q * cum[:, -1]
+        idx = np.minimum((cum < target[:, None]).sum(axis=1), hist.shape[1] - 1)
+        below = np.where(idx > 0, cum[rows, idx - 1], 0)
+        inside = hist[rows, idx]
+        frac = np.divide(target - below, inside, out=np.zeros(len(hist)), where=inside > 0)
+        out[:, j] = lower[idx] + frac * (upper[idx] - lower[idx])
+    out[cum[:, -1] == 0] = np.nan
+    return out
+
+
+def _stats_columns(by, quantiles):
+    return [by, "Resolved"] + [f"p{q * 100:g}" for q in quantiles] + ["Mean", "Breached", "Breach rate"]
+
+
+def resolution_stats(rollups, by="Urgency", date_from=None, date_to=None, quantiles=QUANTILES):
+    """
+    Per value of `by` (a DIMENSIONS name), over issues resolved in the date
+    range: Resolved, p50/p90/p99 and Mean resolution time in hours, Breached
+    (over the SLA for their urgency) and Breach rate. Most resolutions first.
+    """
+    wide = rollups.totals(by, date_from, date_to, resolved_only=True)
+    wide = wide[wide["resolved"] > 0]
+    if wide.empty:
+        return pd.DataFrame(columns=_stats_columns(by, quantiles))
+    pct = _percentiles(wide[HIST_COLUMNS].to_numpy(), quantiles)
+    resolved = wide["resolved"].round().astype(int)
+    out = pd.DataFrame({by: wide.index, "Resolved": resolved.to_numpy()})
+    for j, q in enumerate(quantiles):
+        out[f"p{q * 100:g}"] = pct[:, j].round(1)
+    out["Mean"] = (wide["hours"] / wide["resolved"]).round(1).to_numpy()
+    out["Breached"] = wide["breached"].round().astype(int).to_numpy()
+    out["Breach rate"] = (out["Breached"] / out["Resolved"]).round(3)
+    return out.sort_values(["Resolved", by], ascending=[False, True]).reset_index(drop=True)
+
+
+def backlog_curve(rollups, date_from=None, date_to=None):
+    """
+    Frame of Day, Opened, Resolved, Backlog (open at the end of the day) for
+    every day in the range, up to date_to or today.
+    """
+    wide = rollups.daily("All").set_index("day")
+    if wide.empty:
+        return pd.DataFrame(columns=["Day", "Opened", "Resolved", "Backlog"])
+    wide.index = pd.to_datetime(wide.index)
+    end = pd.Timestamp(date_to or max(date.today(), wide.index.max().date()))
+    wide = wide.reindex(pd.date_range(wide.index.min(), max(end, wide.index.min()), freq="D"), fill_value=0)
+    out = pd.DataFrame({
+        "Day":      wide.index,
+        "Opened":   wide["opened"].round().astype(int).to_numpy(),
+        "Resolved": wide["resolved"].round().astype(int).to_numpy(),
+    })
+    out["Backlog"] = (out["Opened"] - out["Resolved"]).cumsum()
+    out = out[out["Day"] <= end]
+    if date_from:
+        out = out[out["Day"] >= pd.Timestamp(date_from)]
+    return out.reset_index(drop=True)
+
+
+def exact_stats(frames, by="Urgency", date_from=None, date_to=None, quantiles=QUANTILES):
+    """
+    resolution_stats computed from the issues themselves (frames of at least
+    ROLLUP_COLUMNS, e.g. store.iter_issues()) with exact quantiles. O(issues);
+    for checking the rollups, not for pages.
+    """
+    parts = []
+    for df in frames:
+        resolved = df[(df["Status"] == "Resolved") & df["ResolvedAt"].notna() & df["Timestamp"].notna()]
+        if date_from:
+            resolved = resolved[resolved["ResolvedAt"] >= pd.Timestamp(date_from)]
+        if date_to:
+            resolved = resolved[resolved["ResolvedAt"] < pd.Timestamp(date_to) + timedelta(days=1)]
+        hours = ((resolved["ResolvedAt"] - resolved["Timestamp"]) / np.timedelta64(1, "h")).clip(lower=0)
+        sla = resolved["Urgency"].astype(object).map(SLA_HOURS).astype(float).fillna(np.inf)
+        key = "" if by == "All" else _strings(resolved[by])
+        parts.append(pd.DataFrame({by: key, "hours": hours.to_numpy(), "breached": (hours > sla).to_numpy()}))
+    frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=[by, "hours", "breached"])
+    if by == "ResolvedBy":
+        frame = frame[frame[by] != ""]
+    if frame.empty:
+        return pd.DataFrame(columns=_stats_columns(by, quantiles))
+    grouped = frame.groupby(by)
+    out = grouped["hours"].size().rename("Resolved").to_frame()
+    for q in quantiles:
+        out[f"p{q * 100:g}"] = grouped["hours"].quantile(q).round(1)
+    out["Mean"] = grouped["hours"].mean().round(1)
+    out["Breached"] = grouped["breached"].sum().astype(int)
+    out["Breach rate"] = (out["Breached"] / out["Resolved"]).round(3)
+    out = out.reset_index()
+    return out.sort_values(["Resolved", by], ascending=[False, True]).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolution-time and backlog reports from the daily rollups.")
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rep = sub.add_parser("report", help="resolution percentiles and SLA breach rate per value")
+    p_rep.add_argument("--by", choices=DIMENSIONS, default="Urgency")
+    p_rep.add_argument("--days", type=int, help="only issues resolved in the last N days")
+    p_rep.add_argument("--exact", action="store_true", help="compute from every issue instead of the rollups")
+    p_back = sub.add_parser("backlog", help="open issues at the end of each day")
+    p_back.add_argument("--days", type=int, default=30)
+    sub.add_parser("rebuild", help="recount the rollups from the issue data")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store(args.backend)
+    pd.set_option("display.width", 200)
+    if args.command == "rebuild":
+        store.rebuild_rollups()
+        print("Rebuilt the daily rollups")
+        return
+    since = date.today() - timedelta(days=args.days - 1) if args.days else None
+    if args.command == "backlog":
+        print(backlog_curve(store.daily_rollups(), date_from=since).to_string(index=False))
+    elif args.exact:
+        print(exact_stats(store.iter_issues(), args.by, date_from=since).to_string(index=False))
+    else:
+        print(resolution_stats(store.daily_rollups(), args.by, date_from=since).to_string(index=False))
+    print(f"(hours; SLA {', '.join(f'{k} {v:g}h' for k, v in SLA_HOURS.items())})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Cold tier for the CSV backend: resolved issues in monthly Parquet partitions.
+
+Compaction moves Resolved rows out of the hot snapshot (issues.parquet) into
+issues.archive/YYYY-MM.parquet, keyed off Timestamp, so the hot tier and
+everything that reads it (the Open tab, submits, resolves) scales with the
+open backlog rather than with total history. Queries over resolved issues
+open only the partitions inside the requested date range, and then only the
+index columns until they know which months hold the requested page.
+
+Partitions are rewritten whole under issues.archive.lock; readers need no
+lock because each partition is swapped in with os.replace. Which month holds
+an ID is kept in issues.archive.ids.db, updated under the same lock, so
+duplicate checks and lookups by ID touch one partition at most instead of
+scanning every month's ID column. To archive now instead of at the next
+compaction:
+
+    PYTHONPATH=src python -m utils.archive
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.cache import issue_cache, file_fingerprint
+from utils.filelock import file_lock
+from utils.metrics import ROWS_READ, timed
+from utils.schema import SCHEMA_VERSION, SchemaVersionError
+from utils.snapshot import concat_typed, read_any_snapshot, read_snapshot, snapshot_version, write_snapshot
+
+# Enough to filter, sort and count without reading the text columns
+INDEX_COLUMNS = ["ID", "Status", "Urgency", "College", "Timestamp"]
+UNDATED = "undated"  # Rows without a usable Timestamp; they sort last, like NaT
+
+_MONTH = re.compile(r"^\d{4}-\d{2}$")
+
+IDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archived (
+    issue_id TEXT PRIMARY KEY,
+    month    TEXT NOT NULL               -- partition holding the issue
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS archived_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+_CHUNK = 500  # IDs per IN (...) query, under SQLite's parameter limit
+
+
+def archive_dir(path):
+    """issues.csv -> issues.archive"""
+    return os.path.splitext(path)[0] + ".archive"
+
+
+def partition_keys(df):
+    """'YYYY-MM' of each row's Timestamp; UNDATED where it is missing, so month order is sort order."""
+    return df["Timestamp"].dt.strftime("%Y-%m").fillna(UNDATED)
+
+
+def _month_of(value):
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+class IssueArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock_path = directory + ".lock"
+        self._cache_prefix = os.path.abspath(directory)
+        self._positions = {}  # month -> (frame, {ID: row position})
+        self._ids_path = directory + ".ids.db"
+        self._local = threading.local()
+
+    def _path(self, month):
+        return os.path.join(self.directory, month + ".parquet")
+
+    def months(self):
+        """Partition names, oldest first ('undated' last)."""
+        try:
+            names = [n[:-len(".parquet")] for n in os.listdir(self.directory) if n.endswith(".parquet")]
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if _MONTH.match(n)) + [n for n in names if n == UNDATED]
+
+    def months_in_range(self, date_from=None, date_to=None):
+        """Partitions that can hold Timestamps in [date_from, date_to] (inclusive dates)."""
+        months = self.months()
+        if date_from is None and date_to is None:
+            return months
+        lo = _month_of(date_from) if date_from else "0000-00"
+        hi = _month_of(date_to) if date_to else "9999-99"
+        return [m for m in months if m != UNDATED and lo <= m <= hi]
+
+    def paths(self):
+        return [self._path(m) for m in self.months()]
+
+    def __len__(self):
+        return sum(pq.ParquetFile(self._path(m)).metadata.num_rows for m in self.months())
+
+    # Reads (cached per partition file version)
+
+    def read(self, month, columns=None):
+        """Typed frame for one partition. Read-only."""
+        path = self._path(month)
+        name = f"archive:{self._cache_prefix}/{month}:{','.join(columns or [])}"
+        return issue_cache.get(name, file_fingerprint(path), lambda: self._load(path, columns))
+
+    @timed("load")
+    def _load(self, path, columns):
+        df = read_snapshot(path, columns)
+        ROWS_READ.inc(len(df), source="archive")
+        return df
+
+    def index(self, month):
+        return self.read(month, INDEX_COLUMNS)
+
+    def frame(self, columns=None):
+        """Every archived issue (maintenance paths only: rebuilds, exports)."""
+        parts = [self.read(m, columns) for m in self.months()]
+        if not parts:
+            return None
+        df = parts[0]
+        for part in parts[1:]:
+            df = concat_typed(df, part)
+        return df
+
+    # ID -> month table. Until it is built, writes leave it alone; the first
+    # lookup builds it from the partitions' ID columns, once.
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._ids_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(IDS_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _ids_built(self):
+        return self._connect().execute("SELECT 1 FROM archived_meta WHERE key = 'built'").fetchone() is not None
+
+    def _build_ids(self, locked=False):
+        if self._ids_built():
+            return
+        if not locked:
+            with file_lock(self._lock_path):  # No partition changes while we read them
+                return self._build_ids(locked=True)
+        entries = [(i, month) for month in self.months()
+                   for i in read_snapshot(self._path(month), ["ID"])["ID"].tolist()]
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM archived")
+            conn.executemany("INSERT OR REPLACE INTO archived (issue_id, month) VALUES (?, ?)", entries)
+            conn.execute("INSERT OR REPLACE INTO archived_meta (key, value) VALUES ('built', '1')")
+
+    def _note(self, entries):
+        """Records (ID, month) pairs. Caller holds the archive lock."""
+        if entries and self._ids_built():
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO archived (issue_id, month) VALUES (?, ?)", entries)
+
+    def _forget(self, ids):
+        """Drops IDs from the table. Caller holds the archive lock."""
+        if ids and self._ids_built():
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM archived WHERE issue_id = ?", [(i,) for i in ids])
+
+    def months_of(self, ids, locked=False):
+        """{ID: month} for the archived subset of `ids`, one primary-key lookup each."""
+        ids = list({str(i) for i in ids})
+        if not ids:
+            return {}
+        self._build_ids(locked)
+        conn = self._connect()
+        found = {}
+        for start in range(0, len(ids), _CHUNK):
+            chunk = ids[start:start + _CHUNK]
+            found.update(conn.execute(
+                f"SELECT issue_id, month FROM archived WHERE issue_id IN ({','.join('?' * len(chunk))})",
+                chunk).fetchall())
+        return found
+
+    def find(self, issue_id):
+        """Month holding `issue_id`, or None."""
+        return self.months_of([issue_id]).get(str(issue_id))
+
+    def contains(self, ids):
+        """The subset of `ids` that is archived."""
+        return set(self.months_of(ids))
+
+    def get(self, issue_id):
+        month = self.find(issue_id)
+        if month is None or not os.path.exists(self._path(month)):
+            return None
+        found = self.lookup(month, [str(issue_id)])
+        return found[0] if found else None
+
+    def rows(self, month, ids):
+        """Full rows of one partition for the given IDs."""
+        df = self.read(month)
+        return df[df["ID"].isin(ids)]
+
+    def lookup(self, month, ids):
+        """
+        Issue dicts for `ids` from one partition, found by row position instead
+        of a scan; IDs not in it are skipped. The ID index is built once per
+        loaded version of the partition.
+        """
+        df = self.read(month)
+        cached = self._positions.get(month)
+        if cached is None or cached[0] is not df:
+            cached = (df, dict(zip(df["ID"].tolist(), range(len(df)))))
+            self._positions[month] = cached
+        positions = cached[1]
+        return [df.iloc[positions[i]].to_dict() for i in ids if i in positions]
+
+    # Writes
+
+    def _write(self, month, df):
+        path = self._path(month)
+        tmp = path + ".tmp"
+        write_snapshot(df.reset_index(drop=True), tmp)
+        os.replace(tmp, path)
+
+    def add(self, df):
+        """Merges typed rows into their monthly partitions; a row already archived is replaced."""
+        if df.empty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        keys = partition_keys(df)
+        with file_lock(self._lock_path):
+            # Noted before the partitions are written: a crash in between leaves
+            # an entry for a row that is still hot, which lookups skip
+            self._note(list(zip(df["ID"].astype(str).tolist(), keys.tolist())))
+            for month in sorted(keys.unique()):
+                part = df[keys == month]
+                if os.path.exists(self._path(month)):
+                    part = concat_typed(read_snapshot(self._path(month)), part)
+                    part = part.drop_duplicates(subset="ID", keep="last")
+                self._write(month, part)
+
+    def replace(self, df):
+        """Stores new versions of archived rows, moving any whose month changed."""
+        self.remove(df["ID"])
+        self.add(df)
+
+    def remove(self, ids):
+        """Drops issues from the archive (reopened, or re-imported)."""
+        ids = {str(i) for i in ids}
+        with file_lock(self._lock_path):
+            months = set(self.months_of(ids, locked=True).values())
+            for month in sorted(m for m in months if os.path.exists(self._path(m))):
+                full = read_snapshot(self._path(month))
+                kept = full[~full["ID"].isin(ids)]
+                if kept.empty:
+                    os.remove(self._path(month))
+                else:
+                    self._write(month, kept)
+            self._forget(ids)
+
+    def migrate(self, upgrade):
+        """Rewrites partitions stamped with an older schema as upgrade(raw frame). Returns how many."""
+        n = 0
+        with file_lock(self._lock_path):
+            for month in self.months():
+                found = snapshot_version(self._path(month))
+                if found > SCHEMA_VERSION:
+                    raise SchemaVersionError(self._path(month), found)
+                if found < SCHEMA_VERSION:
+                    self._write(month, upgrade(read_any_snapshot(self._path(month))))
+                    n += 1
+        return n
+
+    def clear(self):
+        with file_lock(self._lock_path):
+            for month in self.months():
+                os.remove(self._path(month))
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM archived")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move resolved issues into the monthly archive now.")
+    parser.parse_args(argv)
+
+    from utils.storage import ISSUES_CSV, compact_journal
+    compact_journal(ISSUES_CSV, force=True)
+    archive = IssueArchive(archive_dir(ISSUES_CSV))
+    for month in archive.months():
+        print(f"{month}: {pq.ParquetFile(archive._path(month)).metadata.num_rows} issues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""
+Reproducible benchmarks for the help desk at realistic data sizes.
+
+A seeded generator writes synthetic users.csv / issues.csv (realistic Title
+and Description lengths, urgency mix, resolved share, messy legacy emails);
+the runner then times the hot paths against each dataset and writes JSON
+with p50/p95 latency and peak memory per case:
+
+    PYTHONPATH=src python -m utils.bench run --sizes 1000 100000 1000000 --out bench-new.json
+    PYTHONPATH=src python -m utils.bench compare bench-base.json bench-new.json
+
+Cases: load (the typed snapshot), load_csv (the CSV import path) and
+load_legacy (the old Issue/TechLeadResponse headers),
+users_load and login, open_page and resolved_page (first Open page, a
+Resolved page from the archive), submit, resolve, stats (materialized counts),
+stats_recount (full scan), analytics (percentiles, SLA and backlog from the
+daily rollups), rollups_rebuild, triage_claim (lease the head of the triage
+queue and hand it back), triage_rebuild, my_issues (an intern's
+own issues through the Email index), report_export (every resolved
+issue as gzipped CSV through utils/reports.py), render_login (a rerun of the login
+page, which must not touch the issues) and render_techlead (a headless run
+of the Tech Lead page through Streamlit's AppTest). `compare` flags cases that got
+slower or hungrier than the threshold and exits non-zero if any did.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils import analytics, storage
+from utils.aggregates import IssueAggregates
+from utils.reports import build_report
+from utils.snapshot import snapshot_path, typed_issues, write_snapshot
+from utils.storage import (ISSUE_COLUMNS, ISSUES_CSV, USERS_CSV, compact_journal, load_and_normalize_issues,
+                           read_issues_csv)
+from utils.users import UserDirectory
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_SEED = 20250606
+
+# ─── SYNTHETIC DATA ────────────────────────────────────────────────────────────
+
+URGENCY_MIX = {"Low": 0.5, "Medium": 0.35, "High": 0.15}
+RESOLVED_SHARE = 0.7
+MESSY_EMAIL_SHARE = 0.05  # Leading spaces / capitals, as in old rows
+ISSUES_PER_INTERN = 20
+TECH_LEADS = 25
+RESOLUTION_HOURS = {"Low": 72, "Medium": 24, "High": 6}  # Median time to resolve; log-normally spread
+
+# Word counts: (median, max)
+TITLE_WORDS = (6, 16)
+DESCRIPTION_WORDS = (35, 250)
+RESPONSE_WORDS = (20, 150)
+
+COLLEGES = [
+    "MIT", "IIT Bombay", "IIT Delhi", "IIT Madras", "BITS Pilani", "NIT Trichy", "VIT", "Anna University",
+    "Stanford", "CMU", "Georgia Tech", "UIUC", "Waterloo", "Toronto", "ETH Zurich", "TU Munich",
+    "NUS", "NTU", "Tsinghua", "KAIST", "IISc", "DTU", "Jadavpur", "Manipal", "SRM", "Amity",
+]
+
+VOCABULARY = (
+    "install pip conda venv python pandas numpy streamlit docker kubernetes git branch merge rebase commit "
+    "push pull request review test pytest unittest mock fixture import module package version upgrade "
+    "downgrade dependency conflict error exception traceback stack overflow memory leak crash timeout "
+    "slow performance cache index query database sql sqlite postgres mysql migration schema column table "
+    "row join api endpoint request response json http https ssl certificate proxy firewall port network "
+    "login password token auth oauth permission denied access file path directory windows linux mac "
+    "ubuntu terminal shell bash script environment variable config yaml setting build compile deploy "
+    "server client browser chrome cors css html javascript react node npm frontend backend thread async "
+    "queue worker job cron log debug warning fails works unable cannot when after before during while "
+    "the a an my our this that with without on in for to from of and or not but it is was does "
+    "running trying getting using after update local remote production staging laptop notebook jupyter "
+    "kernel restart gpu cuda driver model training dataset csv excel upload download export report chart"
+).split()
+
+
+def _texts(rng, n, words):
+    """n strings of vocabulary words with log-normal lengths around the median, capped at max."""
+    median, cap = words
+    lengths = np.clip(rng.lognormal(np.log(median), 0.5, n).astype(np.int64), 1, cap)
+    vocab = np.array(VOCABULARY, dtype=object)
+    tokens = vocab[rng.integers(0, len(vocab), int(lengths.sum()))].tolist()
+    ends = np.cumsum(lengths).tolist()
+    out, start = [], 0
+    for end in ends:
+        out.append(" ".join(tokens[start:end]))
+        start = end
+    return out
+
+
+def generate_users(n_issues, seed=DEFAULT_SEED):
+    """Users frame: one intern per ISSUES_PER_INTERN issues plus TECH_LEADS leads."""
+    n_interns = max(1, n_issues // ISSUES_PER_INTERN)
+    interns = [f"intern{k}@gmail.com" for k in range(n_interns)]
+    leads = [f"lead{k}@gmail.com" for k in range(TECH_LEADS)]
+    return pd.DataFrame({
+        "email":    interns + leads,
+        "password": [f"pw{k}" for k in range(n_interns + TECH_LEADS)],
+        "role":     ["Developer Intern"] * n_interns + ["Tech Lead"] * TECH_LEADS,
+    })
+
+
+def generate_issues(n, seed=DEFAULT_SEED, start="2024-01-01"):
+    """Issues frame with ISSUE_COLUMNS, oldest first, spread over one year. Same seed -> same frame."""
+    rng = np.random.default_rng(seed)
+    n_interns = max(1, n // ISSUES_PER_INTERN)
+
+    # Strictly increasing microsecond offsets keep the timestamp-derived IDs unique
+    span_us = 365 * 24 * 3600 * 10**6
+    offsets = np.sort(rng.integers(0, span_us - n, n)) + np.arange(n)
+    stamps = pd.Series(pd.Timestamp(start) + pd.to_timedelta(offsets, unit="us"))
+
+    intern = rng.integers(0, n_interns, n)
+    emails = np.char.add(np.char.add("intern", intern.astype(str)), "@gmail.com").astype(object)
+    messy = rng.random(n) < MESSY_EMAIL_SHARE
+    emails[messy] = [" " + e.capitalize() for e in emails[messy]]
+
+    resolved = rng.random(n) < RESOLVED_SHARE
+    leads = np.char.add(np.char.add("lead", rng.integers(0, TECH_LEADS, n).astype(str)), "@gmail.com")
+
+    df = pd.DataFrame({
+        "ID":          stamps.dt.strftime("%Y%m%d%H%M%S%f"),
+        "Name":        np.char.add("Intern ", intern.astype(str)),
+        "Email":       emails,
+        "College":     np.array(COLLEGES)[intern % len(COLLEGES)],
+        "Title":       _texts(rng, n, TITLE_WORDS),
+        "Description": _texts(rng, n, DESCRIPTION_WORDS),
+        "Urgency":     rng.choice(list(URGENCY_MIX), n, p=list(URGENCY_MIX.values())),
+        "Status":      np.where(resolved, "Resolved", "Open"),
+        "Timestamp":   stamps.dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "ResolvedBy":  np.where(resolved, leads, ""),
+        "Response":    np.where(resolved, np.array(_texts(rng, n, RESPONSE_WORDS), dtype=object), ""),
+        "Version":     np.where(resolved, 1, 0),
+    })
+    # Drawn last, so every other column matches datasets generated before ResolvedAt existed
+    median = df["Urgency"].map(RESOLUTION_HOURS).to_numpy(dtype=float)
+    took = pd.to_timedelta(median * rng.lognormal(0.0, 1.0, n), unit="h")
+    df["ResolvedAt"] = np.where(resolved, (stamps + took).dt.strftime("%Y-%m-%d %H:%M:%S"), "")
+    return df[ISSUE_COLUMNS]
+
+
+def to_legacy(issues_df):
+    """The same issues with the old header names ('Issue', 'TechLeadResponse') and no Version or ResolvedAt."""
+    return issues_df.drop(columns=["Version", "ResolvedAt"]).rename(columns={"Title": "Issue", "Response": "TechLeadResponse"})
+
+
+def write_dataset(directory, n, seed=DEFAULT_SEED):
+    """
+    Writes users.csv, issues.csv, its typed snapshot issues.parquet and
+    legacy_issues.csv into `directory`. Returns the issues frame.
+    """
+    os.makedirs(directory, exist_ok=True)
+    issues = generate_issues(n, seed)
+    issues.to_csv(os.path.join(directory, ISSUES_CSV), index=False)
+    write_snapshot(typed_issues(issues), snapshot_path(os.path.join(directory, ISSUES_CSV)))
+    to_legacy(issues).to_csv(os.path.join(directory, "legacy_" + ISSUES_CSV), index=False)
+    generate_users(n, seed).to_csv(os.path.join(directory, USERS_CSV), index=False)
+    return issues
+
+# ─── MEASUREMENT ───────────────────────────────────────────────────────────────
+
+_STATM = "/proc/self/statm"
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss():
+    with open(_STATM) as f:
+        return int(f.read().split()[1]) * _PAGE
+
+
+class RssSampler:
+    """
+    Highest resident set size seen while active, sampled every few milliseconds.
+    Catches memory tracemalloc cannot see (Arrow string buffers, SQLite pages).
+    Linux only; elsewhere `growth_mb` is None.
+    """
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.available = os.path.exists(_STATM)
+        self._stop = threading.Event()
+        self._base = self._peak = 0
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._peak = max(self._peak, _rss())
+
+    def __enter__(self):
+        if self.available:
+            self._base = self._peak = _rss()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.available:
+            self._stop.set()
+            self._thread.join()
+            self._peak = max(self._peak, _rss())
+
+    @property
+    def growth_mb(self):
+        return round((self._peak - self._base) / 2**20, 2) if self.available else None
+
+
+def measure(fn, runs, warmup=1):
+    """
+    Times `runs` calls after `warmup` untimed ones, then makes one more call
+    under tracemalloc and the RSS sampler for peak memory:
+    - peak_mb: peak Python/NumPy allocations during the call
+    - rss_growth_mb: how far the process RSS rose above where it started
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    try:
+        with RssSampler() as rss:
+            fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "runs":          runs,
+        "p50_ms":        round(float(np.percentile(times, 50)), 3),
+        "p95_ms":        round(float(np.percentile(times, 95)), 3),
+        "mean_ms":       round(float(np.mean(times)), 3),
+        "peak_mb":       round(peak / 2**20, 2),
+        "rss_growth_mb": rss.growth_mb,
+    }
+
+
+def render_techlead(user="lead0@gmail.com"):
+    """One headless run of the Tech Lead page, as a logged-in lead."""
+    from streamlit.testing.v1 import AppTest
+
+    # Seeding session_state outside a script run logs a harmless warning per key
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.session_state["logged_in"] = True
+    at.session_state["role"] = "Tech Lead"
+    at.session_state["user"] = user
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Tech Lead page failed: {at.exception[0].message}")
+
+
+def render_login():
+    """Reruns of the login page in one AppTest session, as a visitor clicking around the form."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+
+    def rerun():
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"Login page failed: {at.exception[0].message}")
+    return rerun
+
+
+def _new_issue(k):
+    now = datetime.now()
+    return {
+        "ID": now.strftime("%Y%m%d%H%M%S%f") + f"{k:04d}", "Name": "Bench", "Email": "bench@gmail.com",
+        "College": "MIT", "Title": "Benchmark submit", "Description": "pip install fails behind the proxy",
+        "Urgency": "Medium", "Status": "Open", "Timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "ResolvedBy": "", "Response": "",
+    }
+
+
+def run_size(directory, n, backend="csv", seed=DEFAULT_SEED, repeat=5, ops=100, render=True):
+    """Generates one dataset in `directory` and times every case against it. Returns {case: stats}."""
+    t0 = time.perf_counter()
+    issues = write_dataset(directory, n, seed)
+    results = {"generate": {"seconds": round(time.perf_counter() - t0, 3)}}
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+    os.environ["HELPDESK_BACKEND"] = backend
+    os.environ["HELPDESK_DB"] = os.path.join(directory, "helpdesk.db")
+    try:
+        if backend == "sqlite":
+            from utils.migrate import migrate_csv_to_sqlite
+            t0 = time.perf_counter()
+            migrate_csv_to_sqlite(os.environ["HELPDESK_DB"])
+            results["migrate"] = {"seconds": round(time.perf_counter() - t0, 3)}
+
+        else:
+            # Move resolved issues into the monthly archive up front, as the first compaction would
+            t0 = time.perf_counter()
+            compact_journal(ISSUES_CSV, force=True)
+            results["archive"] = {"seconds": round(time.perf_counter() - t0, 3)}
+
+        # The app and the direct calls below share one fresh store for this dataset
+        storage._store = None
+        store = storage.get_store()
+
+        results["load"] = measure(lambda: load_and_normalize_issues(ISSUES_CSV), repeat)
+        results["load_csv"] = measure(lambda: read_issues_csv(ISSUES_CSV), repeat)
+        results["load_legacy"] = measure(lambda: load_and_normalize_issues("legacy_" + ISSUES_CSV), repeat)
+        results["users_load"] = measure(lambda: UserDirectory(USERS_CSV).get("lead0@gmail.com"), repeat)
+        users = UserDirectory(USERS_CSV)
+        emails = [f"intern{k}@gmail.com" for k in range(max(1, n // ISSUES_PER_INTERN))]
+        picks = iter(np.random.default_rng(seed).choice(emails, ops + 2).tolist())
+        results["login"] = measure(lambda: users.get(next(picks)), ops)
+
+        results["open_page"] = measure(lambda: store.query_issues(status="Open", limit=20), repeat)
+        results["resolved_page"] = measure(
+            lambda: store.query_issues(status="Resolved", sort="newest", limit=20, offset=100), repeat)
+
+        submitted = iter(range(ops + 2))
+        results["submit"] = measure(lambda: store.add_issue(_new_issue(next(submitted))), ops)
+
+        open_ids = iter(issues.loc[issues["Status"] == "Open", "ID"].tolist())
+        results["resolve"] = measure(lambda: store.resolve(next(open_ids), "lead0@gmail.com", "Fixed"), ops)
+
+        results["stats"] = measure(
+            lambda: (store.counts_by_status(), store.resolved_counts_by_lead(), store.colleges()), ops)
+        frame = store.load_issues()
+        results["stats_recount"] = measure(lambda: IssueAggregates.from_frame(frame), repeat)
+
+        results["rollups_rebuild"] = measure(store.rebuild_rollups, repeat)
+        rollups = store.daily_rollups()
+        results["analytics"] = measure(lambda: (analytics.resolution_stats(rollups, "All"),
+                                                analytics.resolution_stats(rollups, "College"),
+                                                analytics.backlog_curve(rollups)), ops)
+
+        results["triage_rebuild"] = measure(store.rebuild_triage, repeat)
+        queue = store.triage_queue()
+        results["triage_claim"] = measure(
+            lambda: queue.release(queue.claim("lead0@gmail.com"), "lead0@gmail.com"), ops)
+
+        picks = iter(np.random.default_rng(seed + 1).choice(emails, ops + 2).tolist())
+        results["my_issues"] = measure(lambda: store.issues_by_email(next(picks)), ops)
+
+        results["report_export"] = measure(lambda: build_report(store, "csv", compress=True).close(), repeat)
+
+        if render:
+            results["render_login"] = measure(render_login(), ops)
+            results["render_techlead"] = measure(render_techlead, repeat)
+    finally:
+        os.chdir(cwd)
+    return results
+
+# ─── RESULTS ───────────────────────────────────────────────────────────────────
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)  # bytes on macOS, KiB on Linux
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP_PATH), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(sizes=DEFAULT_SIZES, backend="csv", seed=DEFAULT_SEED, repeat=5, ops=100, render=True, workdir=None):
+    import streamlit
+
+    meta = {
+        "started":   datetime.now().isoformat(timespec="seconds"),
+        "backend":   backend,
+        "seed":      seed,
+        "repeat":    repeat,
+        "ops":       ops,
+        "commit":    _git_commit(),
+        "python":    platform.python_version(),
+        "platform":  platform.platform(),
+        "pandas":    pd.__version__,
+        "numpy":     np.__version__,
+        "streamlit": streamlit.__version__,
+    }
+    root = workdir or tempfile.mkdtemp(prefix="helpdesk-bench-")
+    results = {}
+    try:
+        for n in sizes:
+            print(f"[bench] {n} issues ({backend})", flush=True)
+            results[str(n)] = run_size(os.path.join(root, str(n)), n, backend, seed, repeat, ops, render)
+            for case, stats in results[str(n)].items():
+                if "p50_ms" in stats:
+                    print(f"  {case:<16} p50 {stats['p50_ms']:>10.2f} ms   p95 {stats['p95_ms']:>10.2f} ms"
+                          f"   peak {stats['peak_mb']:>8.1f} MB   rss +{stats['rss_growth_mb'] or 0:.1f} MB",
+                          flush=True)
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    meta["max_rss_mb"] = _max_rss_mb()
+    return {"meta": meta, "results": results}
+
+
+def compare(base, new, threshold=0.15, min_ms=1.0, min_mb=1.0):
+    """
+    Rows (size, case, metric, base, new, change, flag) for every timed case in both runs.
+    A case regresses when p50 or p95 grows by more than `threshold` (and by at least
+    `min_ms`, to ignore timer noise on sub-millisecond cases) or a peak memory
+    figure grows by more than `threshold` (and by at least `min_mb`).
+    """
+    rows = []
+    for size, cases in new["results"].items():
+        for case, stats in cases.items():
+            before = base["results"].get(size, {}).get(case)
+            if not before or "p50_ms" not in stats or "p50_ms" not in before:
+                continue
+            for metric in ("p50_ms", "p95_ms", "peak_mb", "rss_growth_mb"):
+                b, a = before.get(metric), stats.get(metric)
+                if b is None or a is None:
+                    continue
+                change = (a - b) / b if b else 0.0
+                floor = min_ms if metric.endswith("_ms") else min_mb
+                if change > threshold and a - b >= floor:
+                    flag = "REGRESSION"
+                elif change < -threshold and b - a >= floor:
+                    flag = "improved"
+                else:
+                    flag = ""
+                rows.append((size, case, metric, b, a, change, flag))
+    return rows
+
+# ─── CLI ───────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the help desk on synthetic data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="generate datasets and time every case")
+    p_run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    p_run.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    p_run.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    p_run.add_argument("--repeat", type=int, default=5, help="timed runs of the heavy cases (load, render)")
+    p_run.add_argument("--ops", type=int, default=100, help="timed runs of the per-request cases")
+    p_run.add_argument("--no-render", action="store_true", help="skip the AppTest page render")
+    p_run.add_argument("--workdir", help="keep the generated datasets here instead of a temp dir")
+    p_run.add_argument("--out", default="bench.json")
+
+    p_cmp = sub.add_parser("compare", help="flag regressions between two result files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.15, help="relative change that counts (0.15 = 15%%)")
+    p_cmp.add_argument("--min-ms", type=float, default=1.0, help="ignore timing changes smaller than this")
+    p_cmp.add_argument("--min-mb", type=float, default=1.0, help="ignore memory changes smaller than this")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.sizes, args.backend, args.seed, args.repeat, args.ops, not args.no_render, args.workdir)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold, args.min_ms, args.min_mb)
+    for size, case, metric, b, a, change, flag in rows:
+        print(f"{size:>9} {case:<16} {metric:<8} {b:>12.2f} -> {a:>12.2f}  {change:+7.1%}  {flag}")
+    regressions = sum(1 for row in rows if row[-1] == "REGRESSION")
+    print(f"{regressions} regression(s) over {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
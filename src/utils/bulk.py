@@ -0,0 +1,221 @@
+"""
+Streaming bulk import/export of issues and users.
+
+Files are read and written in fixed-size chunks (pandas chunksize on the way
+in, IssueStore.iter_issues on the way out), so memory stays flat however many
+rows a file holds. Each import chunk is cleaned like a form submission:
+
+- legacy headers renamed ('Issue' -> 'Title', 'TechLeadResponse' -> 'Response')
+- whitespace stripped from IDs and emails (" sample@gmail.com")
+- rows without an ID, or whose email is not a Gmail address, rejected
+  (written to --rejects with a Reason column when given)
+- IDs repeated in the file or already stored skipped, first one wins
+
+and written through the store as one batch (one transaction on SQLite, one
+journal append on the CSV backend). Progress and a final summary report rows
+per second and peak memory.
+
+    PYTHONPATH=src python -m utils.bulk import issues backlog.csv --rejects rejected.csv
+    PYTHONPATH=src python -m utils.bulk import users users.csv
+    PYTHONPATH=src python -m utils.bulk export issues --out issues-export.csv
+    PYTHONPATH=src python -m utils.bulk export users --out users-export.csv
+
+Large imports belong on the SQLite backend (HELPDESK_BACKEND=sqlite): it
+checks IDs against its primary key, while the CSV backend keeps every ID of
+its hot tier in memory.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils.snapshot import to_text
+from utils.storage import ISSUE_COLUMNS, normalize_issues
+from utils.users import ROLES, USER_COLUMNS, is_gmail
+
+CHUNK_SIZE = 10000
+PROGRESS_EVERY = 5.0  # Seconds between progress lines
+
+# ─── CLEANING ───────────────────────────────────────────────────────────────────
+
+def _split(chunk, reasons):
+    """(kept rows, rejected rows with a Reason column); `reasons` is a Series, "" where the row is fine."""
+    bad = reasons != ""
+    return chunk[~bad], chunk[bad].assign(Reason=reasons[bad])
+
+
+def clean_issues(chunk):
+    """Returns (issues to insert, rejected rows) for one raw CSV chunk of any vintage."""
+    chunk = normalize_issues(chunk.fillna("").astype(str)).copy()
+    chunk["ID"] = chunk["ID"].str.strip()
+    chunk["Email"] = chunk["Email"].str.strip()
+    reasons = pd.Series("", index=chunk.index)
+    reasons[~chunk["Email"].map(is_gmail)] = "not a Gmail address"
+    reasons[chunk["ID"] == ""] = "missing ID"
+    rows, rejected = _split(chunk, reasons)
+    return rows.drop_duplicates(subset="ID", keep="first"), rejected
+
+
+def clean_users(chunk):
+    """Returns (users to register, rejected rows) for one raw users CSV chunk."""
+    chunk = chunk.fillna("").astype(str).rename(columns=str.strip)
+    for c in USER_COLUMNS:
+        if c not in chunk.columns:
+            chunk[c] = ""
+    chunk = chunk[USER_COLUMNS].copy()
+    chunk["email"] = chunk["email"].str.strip()
+    chunk["password"] = chunk["password"].str.strip()
+    reasons = pd.Series("", index=chunk.index)
+    reasons[~chunk["role"].isin(ROLES)] = "unknown role"
+    reasons[chunk["password"] == ""] = "missing password"
+    reasons[~chunk["email"].map(is_gmail)] = "not a Gmail address"
+    return _split(chunk, reasons)
+
+# ─── IMPORT / EXPORT ────────────────────────────────────────────────────────────
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (2**20 if sys.platform == "darwin" else 2**10), 1)  # bytes on macOS, KiB on Linux
+
+
+class Throughput:
+    """Row counts and rate of one bulk run."""
+
+    def __init__(self, what):
+        self.what = what
+        self.read = self.written = self.duplicates = self.rejected = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    def rate(self):
+        return self.read / max(self.seconds(), 1e-9)
+
+    def summary(self):
+        line = f"{self.what}: {self.read} read, {self.written} written"
+        if self.duplicates or self.rejected:
+            line += f", {self.duplicates} duplicates skipped, {self.rejected} rejected"
+        line += f" in {self.seconds():.1f}s ({self.rate():,.0f} rows/s"
+        rss = _max_rss_mb()
+        return line + (f", peak RSS {rss} MB)" if rss is not None else ")")
+
+    def report(self, out, force=False):
+        now = time.perf_counter()
+        if out is not None and (force or now - self._last_report >= PROGRESS_EVERY):
+            print(self.summary(), file=out, flush=True)
+            self._last_report = now
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Raw all-string chunks of a CSV file; empty cells stay ""."""
+    try:
+        yield from pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    except pd.errors.EmptyDataError:
+        return
+
+
+def _records(df):
+    """df.to_dict("records") without boxing every Arrow string through pandas (~10x faster)."""
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[c].tolist() for c in columns))]
+
+
+def _import(path, clean, write, what, chunk_size, rejects, out):
+    stats = Throughput(what)
+    wrote_rejects = False
+    for chunk in read_chunks(path, chunk_size):
+        rows, rejected = clean(chunk)
+        written = write(_records(rows)) if len(rows) else 0
+        stats.read += len(chunk)
+        stats.written += written
+        stats.duplicates += len(chunk) - len(rejected) - written
+        stats.rejected += len(rejected)
+        if rejects and len(rejected):
+            rejected.to_csv(rejects, mode="a" if wrote_rejects else "w", header=not wrote_rejects, index=False)
+            wrote_rejects = True
+        stats.report(out)
+    return stats
+
+
+def import_issues(store, path, chunk_size=CHUNK_SIZE, rejects=None, out=None):
+    """Streams a CSV of issues (current or legacy headers) into `store`. Returns a Throughput."""
+    return _import(path, clean_issues, store.add_issues, "issues", chunk_size, rejects, out)
+
+
+def import_users(store, path, chunk_size=CHUNK_SIZE, rejects=None, out=None):
+    """Streams a users CSV (email, password, role) into `store`. Returns a Throughput."""
+    return _import(path, clean_users, store.add_users, "users", chunk_size, rejects, out)
+
+
+def export_issues(store, path, chunk_size=CHUNK_SIZE, out=None):
+    """Writes every issue to a CSV file chunk by chunk. Returns a Throughput."""
+    stats = Throughput("issues")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        header = True
+        for chunk in store.iter_issues(chunk_size):
+            to_text(chunk[ISSUE_COLUMNS]).to_csv(f, header=header, index=False)
+            header = False
+            stats.read += len(chunk)
+            stats.written += len(chunk)
+            stats.report(out)
+        if header:
+            f.write(",".join(ISSUE_COLUMNS) + "\n")
+    return stats
+
+
+def export_users(store, path, chunk_size=CHUNK_SIZE, out=None):
+    """Writes every user to a CSV file chunk by chunk. Returns a Throughput."""
+    stats = Throughput("users")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        header = True
+        for chunk in store.iter_users(chunk_size):
+            pd.DataFrame(chunk, columns=USER_COLUMNS).to_csv(f, header=header, index=False)
+            header = False
+            stats.read += len(chunk)
+            stats.written += len(chunk)
+            stats.report(out)
+        if header:
+            f.write(",".join(USER_COLUMNS) + "\n")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream issues or users into or out of the help desk store.")
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_imp = sub.add_parser("import", help="add the rows of a CSV file to the store")
+    p_imp.add_argument("kind", choices=["issues", "users"])
+    p_imp.add_argument("csv")
+    p_imp.add_argument("--rejects", help="write rejected rows, with a Reason column, to this CSV")
+    p_exp = sub.add_parser("export", help="write everything in the store to a CSV file")
+    p_exp.add_argument("kind", choices=["issues", "users"])
+    p_exp.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store(args.backend)
+    if args.command == "import":
+        if args.rejects and os.path.exists(args.rejects):
+            os.remove(args.rejects)
+        run = import_issues if args.kind == "issues" else import_users
+        stats = run(store, args.csv, args.chunk_size, args.rejects, out=sys.stderr)
+    else:
+        run = export_issues if args.kind == "issues" else export_users
+        stats = run(store, args.out, args.chunk_size, out=sys.stderr)
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_MAX_MB = float(os.environ.get("HELPDESK_CACHE_MAX_MB", 512))
+
+
+def file_fingerprint(*paths):
+    """(mtime_ns, size, inode) of each path; None for missing files. Changes whenever a file is rewritten or appended to."""
+    key = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            key.append((st.st_mtime_ns, st.st_size, st.st_ino))
+        except FileNotFoundError:
+            key.append(None)
+    return tuple(key)
+
+
+def _nbytes(value):
+    try:
+        return int(value.memory_usage(index=True, deep=True).sum())
+    except AttributeError:
+        return 0
+
+
+class SnapshotCache:
+    """
+    Process-wide cache of loaded frames, shared by every Streamlit session.
+    - Each entry is stored under a name and tagged with a version key (a file
+      fingerprint or a store version counter); a different key is a miss.
+    - Only one thread loads a given name at a time, so 30 sessions rerunning
+      after a change trigger a single parse.
+    - Entries are evicted least-recently-used once `max_bytes` is exceeded.
+    Cached frames are shared between sessions: callers must not mutate them.
+    """
+
+    def __init__(self, max_bytes=int(CACHE_MAX_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # name -> (key, value, nbytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, name, key, loader):
+        """Returns the cached value for `name` if its key matches, otherwise calls loader() and caches the result."""
+        with self._lock:
+            entry = self._lookup(name, key)
+            if entry is not None:
+                return entry
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another thread may have loaded it while we waited
+                entry = self._lookup(name, key)
+                if entry is not None:
+                    return entry
+                self.misses += 1
+            value = loader()
+            self.put(name, key, value)
+            return value
+
+    def peek(self, name, key):
+        """The cached value if its key matches, else None. Never loads and never waits on a loader."""
+        with self._lock:
+            return self._lookup(name, key)
+
+    def _lookup(self, name, key):
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != key:
+            return None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, name, key, value):
+        nbytes = _nbytes(value)
+        with self._lock:
+            self._entries.pop(name, None)
+            if nbytes > self.max_bytes:
+                return  # Too large to keep; the caller still gets the value
+            self._entries[name] = (key, value, nbytes)
+            while sum(e[2] for e in self._entries.values()) > self.max_bytes:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": sum(e[2] for e in self._entries.values()),
+            }
+
+
+# Shared by every store in the process
+issue_cache = SnapshotCache()
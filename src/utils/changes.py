@@ -0,0 +1,151 @@
+"""
+Change feed: every write gets the next sequence number in a change log.
+
+    seq   1, 2, 3... in commit order, never reused
+    op    submit    key = issue ID, data = the new issue
+          update    key = issue ID, data = the fields that changed (resolves included)
+          register  key = email,    data = {"role"}   (bulk imports: key "", data = {"count"})
+
+Readers remember the last seq they applied and ask for what came after it.
+latest() is a single rowid lookup, so polling an idle feed costs next to
+nothing. The log is kept for CHANGES_RETENTION_DAYS; a reader whose last
+seq has been pruned gets complete=False from since() and starts over from
+a full read. The CSV backend appends under the issues lock to
+issues.changes.db, SQLite in its own database in the same transaction as
+the write.
+
+    PYTHONPATH=src python -m utils.changes latest
+    PYTHONPATH=src python -m utils.changes tail --since 120 --limit 50
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CHANGES_RETENTION_DAYS = float(os.environ.get("HELPDESK_CHANGES_RETENTION_DAYS", 7))
+PRUNE_EVERY = 1000  # Appends between retention sweeps
+
+CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    seq  INTEGER PRIMARY KEY AUTOINCREMENT,  -- AUTOINCREMENT: never reused, even after pruning
+    at   REAL NOT NULL,
+    op   TEXT NOT NULL,
+    key  TEXT NOT NULL,
+    data TEXT NOT NULL                       -- JSON
+);
+CREATE INDEX IF NOT EXISTS idx_changes_at ON changes (at);
+"""
+
+
+def submit_change(issue):
+    from utils.snapshot import plain_issue  # Not at the top: the login page logs registrations without pandas
+    return "submit", str(issue["ID"]), plain_issue(issue)
+
+
+def update_change(issue_id, fields):
+    from utils.snapshot import plain_issue
+    return "update", str(issue_id), plain_issue(fields)
+
+
+def register_change(email, role):
+    return "register", email, {"role": role}
+
+
+def bulk_register_change(count):
+    return "register", "", {"count": count}
+
+
+class ChangeLog:
+    """
+    The log in SQLite: in a file of its own (`path`, CSV backend), or in the
+    store's database through its `connect` (SQLite backend), in which case
+    the store's writes pass their connection and append in their transaction.
+    """
+
+    def __init__(self, path=None, connect=None):
+        self.path = path
+        self._connect = connect
+        self._local = threading.local()
+        if connect is not None:
+            connect().executescript(CHANGES_SCHEMA)
+
+    def connect(self):
+        if self._connect is not None:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(CHANGES_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def append(self, changes, conn=None):
+        """Logs (op, key, data) changes in order. Returns the last seq, or None if there were none."""
+        if not changes:
+            return None
+        now = time.time()
+        rows = [(now, op, key, json.dumps(data, ensure_ascii=False)) for op, key, data in changes]
+
+        def write(conn):
+            conn.executemany("INSERT INTO changes (at, op, key, data) VALUES (?, ?, ?, ?)", rows)
+            seq = conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0]
+            if seq // PRUNE_EVERY != (seq - len(rows)) // PRUNE_EVERY:
+                conn.execute("DELETE FROM changes WHERE at < ?", (now - CHANGES_RETENTION_DAYS * 86400,))
+            return seq
+
+        if conn is not None:
+            return write(conn)
+        conn = self.connect()
+        with conn:
+            return write(conn)
+
+    def latest(self):
+        """Sequence number of the newest change, 0 if none was ever logged."""
+        row = self.connect().execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        return 0 if row is None else row[0]
+
+    def since(self, seq, limit=1000):
+        """
+        (changes after `seq` as dicts, oldest first and at most `limit`; complete).
+        complete is False when changes after `seq` were already pruned.
+        """
+        conn = self.connect()
+        rows = conn.execute("SELECT seq, at, op, key, data FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                            (int(seq), int(limit))).fetchall()
+        oldest = conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+        complete = seq >= self.latest() or (oldest is not None and oldest <= seq + 1)
+        changes = [{"seq": s, "at": at, "op": op, "key": key, "data": json.loads(data)}
+                   for s, at, op, key, data in rows]
+        return changes, complete
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read the change feed.")
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("latest", help="sequence number of the newest change")
+    p_tail = sub.add_parser("tail", help="changes after a sequence number")
+    p_tail.add_argument("--since", type=int, default=0)
+    p_tail.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    log = create_store(args.backend).changes
+    if args.command == "latest":
+        print(log.latest())
+        return
+    changes, complete = log.since(args.since, args.limit)
+    if not complete:
+        print(f"(changes after {args.since} were pruned; showing the oldest kept)")
+    for change in changes:
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(change["at"]))
+        print(f"{change['seq']:>8}  {when}  {change['op']:<8} {change['key']}  "
+              f"{json.dumps(change['data'], ensure_ascii=False)[:80]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Issue field values as the delta paths read them.
+
+Issues reach the aggregates, rollups and triage queue as dicts from any
+source: typed frame rows (Timestamps, NaN, NaT), journal records and
+SQLite rows (text). These helpers read a value the same way whichever it
+came from. No pandas import, so the lightweight modules can use them.
+"""
+import math
+from datetime import datetime
+
+
+def field_text(value):
+    """The value as text, with missing values (None, NaN) as ""."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def field_datetime(value):
+    """datetime from a Timestamp / ResolvedAt value (Timestamp, text, NaT or ""), else None."""
+    if value is None or value != value:  # NaT and NaN are not equal to themselves
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
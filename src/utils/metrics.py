@@ -0,0 +1,308 @@
+"""
+In-process timing and counters, exported in the Prometheus text format.
+
+- span("load") (or @timed("load")) times a named phase into
+  helpdesk_span_seconds{span="load"}; the storage layer times load,
+  normalize, filter, search, similar, write and compact, the app each
+  render.<section> of a page.
+- ROWS_READ / BYTES_WRITTEN count what the storage layer reads and writes.
+- `with rerun(session, page):` brackets one Streamlit script run (or
+  start_rerun() / finish_rerun()): its latency goes to
+  helpdesk_rerun_seconds{page=...}, and a run slower than
+  HELPDESK_SLOW_RERUN_MS (default 1000) is appended to the slow-rerun log
+  (HELPDESK_SLOW_LOG, default slow_reruns.jsonl) with every span it ran.
+
+Nothing is exported unless asked for:
+
+    HELPDESK_METRICS_PORT=9108   serve http://127.0.0.1:9108/metrics
+    HELPDESK_METRICS_FILE=helpdesk.prom   rewrite this file every HELPDESK_METRICS_INTERVAL s
+                                          (for node_exporter's textfile collector)
+
+Session IDs only appear in the slow-rerun log, never as metric labels, so
+the number of exported series stays bounded. The slowest logged reruns:
+
+    PYTHONPATH=src python -m utils.metrics slow --limit 10
+"""
+import argparse
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+SLOW_RERUN_MS = float(os.environ.get("HELPDESK_SLOW_RERUN_MS", 1000))
+SLOW_LOG = os.environ.get("HELPDESK_SLOW_LOG", "slow_reruns.jsonl")
+METRICS_PORT = os.environ.get("HELPDESK_METRICS_PORT")
+METRICS_FILE = os.environ.get("HELPDESK_METRICS_FILE")
+METRICS_INTERVAL = float(os.environ.get("HELPDESK_METRICS_INTERVAL", 15))
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_TRACE_SPANS = 200  # Spans kept per rerun for the slow log; totals still cover every span
+
+# ─── METRIC TYPES ──────────────────────────────────────────────────────────────
+
+_registry = []
+
+
+def _labels(names, values):
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, values)) + "}" if names else ""
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, n=1, **labels):
+        key = tuple(str(labels.get(l, "")) for l in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(l, "")) for l in self.labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, key)} {v}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram of seconds, as Prometheus expects."""
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, tuple(labels), buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, seconds, **labels):
+        key = tuple(str(labels.get(l, "")) for l in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, le in enumerate(self.buckets):
+                if seconds <= le:
+                    series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def count(self, **labels):
+        series = self._series.get(tuple(str(labels.get(l, "")) for l in self.labels))
+        return 0 if series is None else series[-1]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for le, n in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_labels(names, key + (le,))} {n}")
+                lines.append(f"{self.name}_bucket{_labels(names, key + ('+Inf',))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, key)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+
+SPAN_SECONDS = Histogram("helpdesk_span_seconds", "Time spent in a named phase.", ["span"])
+RERUN_SECONDS = Histogram("helpdesk_rerun_seconds", "Streamlit script run latency per page.", ["page"])
+SLOW_RERUNS = Counter("helpdesk_slow_reruns_total", "Script runs over the slow-rerun threshold.", ["page"])
+ROWS_READ = Counter("helpdesk_rows_read_total", "Issue rows read from storage.", ["source"])
+BYTES_WRITTEN = Counter("helpdesk_bytes_written_total", "Bytes written to storage files.", ["target"])
+
+
+def render():
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+# ─── SPANS AND RERUNS ──────────────────────────────────────────────────────────
+
+# The rerun being traced in this thread (each Streamlit session runs its script in its own thread)
+_trace = contextvars.ContextVar("helpdesk_trace", default=None)
+
+
+class _Trace:
+    def __init__(self, session):
+        self.session = session
+        self.started = time.perf_counter()
+        self.spans = []   # (name, ms, depth) in start order, first MAX_TRACE_SPANS
+        self.totals = {}  # name -> ms over every span
+        self.depth = 0
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block as phase `name`."""
+    trace = _trace.get()
+    if trace is not None:
+        index = len(trace.spans)
+        if index < MAX_TRACE_SPANS:
+            trace.spans.append((name, 0.0, trace.depth))
+        trace.depth += 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        SPAN_SECONDS.observe(elapsed, span=name)
+        if trace is not None:
+            trace.depth -= 1
+            ms = elapsed * 1000
+            if index < MAX_TRACE_SPANS:
+                trace.spans[index] = (name, ms, trace.depth)
+            trace.totals[name] = trace.totals.get(name, 0.0) + ms
+
+
+def timed(name):
+    """Decorator: every call of the function is a span `name`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_rerun(session):
+    """Begins tracing a script run for `session`; an unfinished earlier run in this thread is dropped."""
+    _trace.set(_Trace(session))
+
+
+def finish_rerun(page):
+    """Records the current script run (if one is being traced) under `page`. Safe to call twice."""
+    trace = _trace.get()
+    if trace is None:
+        return
+    _trace.set(None)
+    seconds = time.perf_counter() - trace.started
+    RERUN_SECONDS.observe(seconds, page=page)
+    if seconds * 1000 >= SLOW_RERUN_MS:
+        SLOW_RERUNS.inc(page=page)
+        _log_slow(trace, page, seconds * 1000)
+
+
+@contextmanager
+def rerun(session, page):
+    """
+    Times the script run inside the block, recorded under page() when the
+    block exits, however it exits: st.rerun() and st.stop() raise.
+    """
+    start_rerun(session)
+    try:
+        yield
+    finally:
+        finish_rerun(page())
+
+
+def _log_slow(trace, page, ms):
+    record = {
+        "time":    datetime.now().isoformat(timespec="seconds"),
+        "session": trace.session,
+        "page":    page,
+        "ms":      round(ms, 1),
+        "totals":  {k: round(v, 1) for k, v in sorted(trace.totals.items(), key=lambda kv: -kv[1])},
+        "spans":   [{"span": n, "ms": round(t, 1), "depth": d} for n, t, d in trace.spans],
+    }
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    try:
+        fd = os.open(SLOW_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:  # Never fail a page because the log is not writable
+        log.warning("cannot write %s", SLOW_LOG, exc_info=True)
+
+# ─── EXPORT ────────────────────────────────────────────────────────────────────
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the app's console
+
+
+def write_textfile(path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+def _textfile_loop(path, interval):
+    while True:
+        try:
+            write_textfile(path)
+        except OSError:
+            log.warning("cannot write %s", path, exc_info=True)
+        time.sleep(interval)
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Starts (once per process) the HTTP endpoint and/or the textfile writer that are configured."""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True  # Tried once per process, even if the port is taken
+        if port:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", int(port)), _MetricsHandler)
+            except OSError:  # Another process serves the port; pages carry on without the endpoint
+                log.exception("cannot serve metrics on port %s", port)
+            else:
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        if path:
+            threading.Thread(target=_textfile_loop, args=(path, interval), name="metrics-file", daemon=True).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the slowest reruns from the slow-rerun log.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_slow = sub.add_parser("slow", help="slowest logged reruns with their span breakdown")
+    p_slow.add_argument("--log", default=SLOW_LOG)
+    p_slow.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.log, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        records = []
+    if not records:
+        print(f"No slow reruns logged in {args.log}")
+        return
+    for rec in sorted(records, key=lambda r: -r["ms"])[:args.limit]:
+        print(f"{rec['ms']:>9.1f} ms  {rec['page']:<18} session {rec['session']}  {rec['time']}")
+        for name, ms in list(rec["totals"].items())[:6]:
+            print(f"{'':13}{name:<24}{ms:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
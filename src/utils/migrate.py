@@ -0,0 +1,49 @@
+"""
+One-shot migration of issues.csv / users.csv into the SQLite backend.
+
+    PYTHONPATH=src python -m utils.migrate --db helpdesk.db
+
+Safe to re-run: rows whose ID (or user email) already exists are skipped.
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from utils.snapshot import to_text
+from utils.storage import FileStore, ISSUES_CSV, USERS_CSV
+from utils.sqlite_store import SqliteStore
+
+
+def migrate_csv_to_sqlite(db_path, issues_path=ISSUES_CSV, users_path=USERS_CSV):
+    """Copies every issue and user into the database at `db_path`. Returns (issues, users) counts."""
+    store = SqliteStore(db_path)
+
+    # Hot tier and archive alike, a chunk at a time
+    n_issues = 0
+    for chunk in FileStore(issues_path, users_path).iter_issues():
+        store.add_issues(to_text(chunk).to_dict("records"))
+        n_issues += len(chunk)
+
+    n_users = 0
+    if os.path.exists(users_path):
+        users = pd.read_csv(users_path, dtype=str).fillna("")
+        for user in users.to_dict("records"):
+            n_users += store.add_user(user["email"], user["password"], user["role"])
+
+    return n_issues, n_users
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate the CSV help desk data into SQLite.")
+    parser.add_argument("--db", default=os.environ.get("HELPDESK_DB", "helpdesk.db"))
+    parser.add_argument("--issues", default=ISSUES_CSV)
+    parser.add_argument("--users", default=USERS_CSV)
+    args = parser.parse_args(argv)
+
+    n_issues, n_users = migrate_csv_to_sqlite(args.db, args.issues, args.users)
+    print(f"Read {n_issues} issues into {args.db}; added {n_users} new users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Durable notification outbox, drained by a background SMTP worker.
+
+Resolving an issue only inserts a row into the outbox, so the resolve path
+never waits on the network. The row is written with the resolve itself: in
+the same transaction on SQLite (an outbox table in helpdesk.db), and under
+the issues lock on the CSV backend (issues.outbox.db), so a resolve queues
+exactly one email and a failed or conflicting one queues none. A daemon
+thread per process claims due rows in batches, sends them over one SMTP
+connection that stays open between batches, and records the outcome:
+
+- sent: kept for OUTBOX_RETENTION_DAYS, then pruned
+- temporary failure (4xx, dropped connection): retried with exponential
+  backoff, up to OUTBOX_MAX_ATTEMPTS
+- permanent failure (5xx) or attempts exhausted: dead-lettered
+
+Claims are leases, so several app processes can share one outbox and a
+crashed worker's batch is picked up again once its lease expires.
+Notifications are on when HELPDESK_SMTP_HOST is set (see SMTP settings
+below). For local testing, any debugging SMTP server will do, e.g.
+`python -m aiosmtpd -n -l localhost:8025` with HELPDESK_SMTP_PORT=8025.
+
+    PYTHONPATH=src python -m utils.outbox status
+    PYTHONPATH=src python -m utils.outbox requeue     # dead letters back to pending
+    PYTHONPATH=src python -m utils.outbox drain       # deliver everything due now
+"""
+import argparse
+import logging
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+
+from utils.metrics import Counter, span
+
+log = logging.getLogger(__name__)
+
+SMTP_HOST = os.environ.get("HELPDESK_SMTP_HOST")
+SMTP_PORT = int(os.environ.get("HELPDESK_SMTP_PORT", 25))
+SMTP_USER = os.environ.get("HELPDESK_SMTP_USER")
+SMTP_PASSWORD = os.environ.get("HELPDESK_SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("HELPDESK_SMTP_STARTTLS", "") not in ("", "0", "false")
+MAIL_FROM = os.environ.get("HELPDESK_MAIL_FROM", "resolvehub@localhost")
+
+BATCH_SIZE = int(os.environ.get("HELPDESK_OUTBOX_BATCH", 100))
+POLL_INTERVAL = 5.0            # Seconds the worker sleeps when nothing is due (enqueue wakes it sooner)
+LEASE_SECONDS = 120            # A claimed batch not finished by then is claimed again
+OUTBOX_MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30.0            # Seconds before the first retry, doubled per attempt
+BACKOFF_MAX = 3600.0
+OUTBOX_RETENTION_DAYS = 7
+SMTP_MAX_IDLE = 60.0           # Reconnect rather than reuse a connection idle this long
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id        INTEGER PRIMARY KEY,
+    created   REAL NOT NULL,
+    issue_id  TEXT NOT NULL DEFAULT '',
+    recipient TEXT NOT NULL,
+    subject   TEXT NOT NULL,
+    body      TEXT NOT NULL,
+    status    TEXT NOT NULL DEFAULT 'pending',  -- pending | sending | sent | dead
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    due       REAL NOT NULL,                    -- next attempt, or lease expiry while sending
+    error     TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, due);
+"""
+
+NOTIFICATIONS = Counter("helpdesk_notifications_total", "Notification delivery outcomes.", ["outcome"])
+
+
+def notifications_enabled():
+    return bool(SMTP_HOST)
+
+
+def outbox_path(data_path):
+    """issues.csv -> issues.outbox.db (helpdesk.db keeps its outbox table in the database itself)"""
+    return os.path.splitext(data_path)[0] + ".outbox.db"
+
+
+def resolved_notification(issue):
+    """(recipient, subject, body) telling the intern their issue was resolved."""
+    subject = f"Your issue “{issue.get('Title', '')}” was resolved"
+    body = (
+        f"Hi {issue.get('Name') or 'there'},\n\n"
+        f"Your issue “{issue.get('Title', '')}” has been resolved by {issue.get('ResolvedBy') or 'a tech lead'}.\n\n"
+        f"Response:\n{issue.get('Response') or '(no response text)'}\n\n"
+        "Log in to ResolveHub to see all your issues.\n"
+    )
+    return str(issue.get("Email", "")).strip(), subject, body
+
+
+def _backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay * random.uniform(0.9, 1.1)  # Jitter, so retries after an outage do not arrive together
+
+# ─── OUTBOX TABLE ──────────────────────────────────────────────────────────────
+
+def _dicts(cur):
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur.fetchall()]
+
+
+class Outbox:
+    """
+    The outbox table in a file of its own (`path`, CSV backend), or in the
+    store's database through its `connect` (SQLite backend), in which case
+    the resolve passes its connection and enqueues in its transaction.
+    `name` keys the worker thread (default: path).
+    """
+
+    def __init__(self, path=None, connect=None, name=None):
+        self.path = path
+        self.name = name or path
+        self._connect = connect
+        self._local = threading.local()
+        self.wakeup = threading.Event()  # Set by enqueue so this process's worker does not wait a full poll
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self):
+        if self._connect is not None:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, recipient, subject, body, issue_id="", conn=None):
+        """
+        One local insert; delivery happens on the worker thread. With `conn`
+        the row joins the caller's transaction, and the caller calls
+        wakeup.set() once it commits.
+        """
+        now = time.time()
+        row = (now, str(issue_id), recipient, subject, body, now)
+        sql = "INSERT INTO outbox (created, issue_id, recipient, subject, body, due) VALUES (?, ?, ?, ?, ?, ?)"
+        if conn is not None:
+            conn.execute(sql, row)
+            return
+        with self.connect() as conn:
+            conn.execute(sql, row)
+        self.wakeup.set()
+
+    def adopt(self, path):
+        """
+        Moves the undelivered rows of a stand-alone outbox file (helpdesk.outbox.db
+        from before the table lived in the database) into this outbox, once:
+        the file is renamed to <path>.adopted in the same write transaction.
+        """
+        if not os.path.exists(path):
+            return 0
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")  # Only one process adopts; the others then find no file
+            if not os.path.exists(path):
+                return 0
+            old = sqlite3.connect(path, timeout=30)
+            try:
+                rows = old.execute("SELECT created, issue_id, recipient, subject, body, status, attempts, due, error "
+                                   "FROM outbox WHERE status <> 'sent'").fetchall()
+            finally:
+                old.close()
+            conn.executemany("INSERT INTO outbox (created, issue_id, recipient, subject, body, status, attempts, "
+                             "due, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            os.replace(path, path + ".adopted")
+        self.wakeup.set()
+        return len(rows)
+
+    def claim(self, limit=BATCH_SIZE, lease=LEASE_SECONDS):
+        """Leases up to `limit` due messages (pending, or sending with an expired lease), oldest first."""
+        now = time.time()
+        with self.connect() as conn:
+            rows = _dicts(conn.execute(
+                "UPDATE outbox SET status = 'sending', due = ? WHERE id IN ("
+                "  SELECT id FROM outbox WHERE status IN ('pending', 'sending') AND due <= ? ORDER BY due LIMIT ?"
+                ") RETURNING id, issue_id, recipient, subject, body, attempts",
+                (now + lease, now, limit),
+            ))
+        return sorted(rows, key=lambda r: r["id"])
+
+    def mark_sent(self, ids):
+        if ids:
+            with self.connect() as conn:
+                conn.executemany("UPDATE outbox SET status = 'sent', error = '' WHERE id = ?", [(i,) for i in ids])
+
+    def mark_failed(self, message, error, permanent=False):
+        """Schedules a retry with backoff, or dead-letters the message. Returns 'retry' or 'dead'."""
+        attempts = message["attempts"] + 1
+        outcome = "dead" if permanent or attempts >= OUTBOX_MAX_ATTEMPTS else "retry"
+        status = "dead" if outcome == "dead" else "pending"
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, due = ?, error = ? WHERE id = ?",
+                (status, attempts, time.time() + _backoff(attempts), str(error)[:500], message["id"]),
+            )
+        return outcome
+
+    def counts(self):
+        rows = self.connect().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def dead_letters(self, limit=20):
+        return _dicts(self.connect().execute(
+            "SELECT id, issue_id, recipient, subject, attempts, error FROM outbox "
+            "WHERE status = 'dead' ORDER BY id DESC LIMIT ?", (limit,)))
+
+    def requeue_dead(self):
+        with self.connect() as conn:
+            cur = conn.execute("UPDATE outbox SET status = 'pending', attempts = 0, due = ? WHERE status = 'dead'",
+                               (time.time(),))
+        self.wakeup.set()
+        return cur.rowcount
+
+    def prune(self, days=OUTBOX_RETENTION_DAYS):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM outbox WHERE status = 'sent' AND created < ?", (time.time() - days * 86400,))
+
+# ─── SMTP ──────────────────────────────────────────────────────────────────────
+
+class SmtpConnection:
+    """
+    One SMTP session reused across messages and batches. Reconnects when the
+    server dropped it or it sat idle longer than SMTP_MAX_IDLE.
+    """
+
+    def __init__(self, host=None, port=None, user=None, password=None, starttls=None, timeout=30):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.user = SMTP_USER if user is None else user
+        self.password = SMTP_PASSWORD if password is None else password
+        self.starttls = SMTP_STARTTLS if starttls is None else starttls
+        self.timeout = timeout
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.user:
+            smtp.login(self.user, self.password or "")
+        return smtp
+
+    def send(self, msg):
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_MAX_IDLE:
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._open()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped between messages: one fresh connection, then let the error count
+            self._smtp = self._open()
+            self._smtp.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+# ─── WORKER ────────────────────────────────────────────────────────────────────
+
+def _email(message, sender):
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = message["recipient"]
+    msg["Subject"] = message["subject"]
+    msg.set_content(message["body"])
+    return msg
+
+
+def deliver_batch(outbox, connection, limit=BATCH_SIZE, sender=MAIL_FROM):
+    """Claims and sends one batch. Returns the number of messages claimed."""
+    batch = outbox.claim(limit)
+    if not batch:
+        return 0
+    sent = []
+    with span("notify"):
+        for i, message in enumerate(batch):
+            try:
+                connection.send(_email(message, sender))
+                sent.append(message["id"])
+            except smtplib.SMTPResponseException as exc:
+                # 5xx: the server will never take it; 4xx: try again later
+                NOTIFICATIONS.inc(outcome=outbox.mark_failed(message, exc, permanent=exc.smtp_code >= 500))
+            except smtplib.SMTPRecipientsRefused as exc:
+                NOTIFICATIONS.inc(outcome=outbox.mark_failed(message, exc, permanent=True))
+            except (smtplib.SMTPException, OSError) as exc:
+                # The server is unreachable: the rest of the batch would fail the same way
+                connection.close()
+                for rest in batch[i:]:
+                    NOTIFICATIONS.inc(outcome=outbox.mark_failed(rest, exc))
+                break
+    outbox.mark_sent(sent)
+    NOTIFICATIONS.inc(len(sent), outcome="sent")
+    return len(batch)
+
+
+def _worker_loop(outbox, connection, batch_size, interval):
+    last_prune = 0.0
+    while True:
+        try:
+            if time.time() - last_prune > 3600:
+                outbox.prune()
+                last_prune = time.time()
+            if deliver_batch(outbox, connection, batch_size) == batch_size:
+                continue  # More may be due right away
+        except Exception:  # Keep the thread alive; the leases bring the batch back
+            log.exception("notification delivery failed")
+            connection.close()
+        outbox.wakeup.wait(interval)
+        outbox.wakeup.clear()
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def start_worker(outbox, connection=None, batch_size=BATCH_SIZE, interval=POLL_INTERVAL):
+    """Starts (once per process and outbox file) the daemon thread that delivers notifications."""
+    with _workers_lock:
+        if outbox.name in _workers:
+            return
+        t = threading.Thread(target=_worker_loop, args=(outbox, connection or SmtpConnection(), batch_size, interval),
+                             name=f"outbox:{outbox.name}", daemon=True)
+        t.start()
+        _workers[outbox.name] = t
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or drain the notification outbox.")
+    parser.add_argument("command", choices=["status", "requeue", "drain"])
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    outbox = create_store().outbox
+    if args.command == "status":
+        print(outbox.counts() or "empty")
+        for dead in outbox.dead_letters():
+            print(f"  dead #{dead['id']} to {dead['recipient']} after {dead['attempts']} attempts: {dead['error']}")
+    elif args.command == "requeue":
+        print(f"Requeued {outbox.requeue_dead()} dead letters")
+    else:
+        connection, n = SmtpConnection(), 0
+        try:
+            while True:
+                claimed = deliver_batch(outbox, connection)
+                n += claimed
+                if claimed < BATCH_SIZE:
+                    break
+        finally:
+            connection.close()
+        print(f"Processed {n} notifications: {outbox.counts()}")
+
+
+if __name__ == "__main__":
+    main()
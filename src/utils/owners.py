@@ -0,0 +1,127 @@
+"""
+Owner index for the CSV backend: which issues each intern submitted, for
+their "My Issues" tab.
+
+Issues are stored with a normalized Email (trimmed, lower case; see
+normalize_email in utils/users.py), so the index is a B-tree on
+(email, issue ID) and a lookup reads the intern's own k entries instead of
+scanning every issue. Each entry also records the archive month of the
+issue (utils/archive.py), so archived issues are read from their own
+partitions only. It lives in issues.owners.db and is updated under the
+issues lock with each write. The SQLite backend needs no side index: its
+issues table is indexed on Email.
+
+    PYTHONPATH=src python -m utils.owners lookup sample@gmail.com
+    PYTHONPATH=src python -m utils.owners rebuild
+"""
+import argparse
+import sqlite3
+import threading
+
+import pandas as pd
+
+from utils.archive import UNDATED, partition_keys
+from utils.users import normalize_email
+
+OWNERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS owners (
+    email    TEXT NOT NULL,              -- normalized
+    issue_id TEXT NOT NULL,
+    month    TEXT NOT NULL,              -- archive partition, from Timestamp
+    PRIMARY KEY (email, issue_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_owners_issue ON owners (issue_id);
+
+CREATE TABLE IF NOT EXISTS owners_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def owner_entry(issue):
+    """(email, ID, month) of an issue dict."""
+    when = pd.to_datetime(issue.get("Timestamp"), errors="coerce")
+    month = UNDATED if pd.isna(when) else when.strftime("%Y-%m")
+    return normalize_email(issue.get("Email", "")), str(issue["ID"]), month
+
+
+def frame_owners(df):
+    """[(email, ID, month)] for every row of a typed issues frame (rebuilds)."""
+    emails = df["Email"].astype(str).str.strip().str.lower()
+    return list(zip(emails.tolist(), df["ID"].astype(str).tolist(), partition_keys(df).tolist()))
+
+
+def owner_delta(before, after):
+    """The entry an update makes to the index, or None if Email and Timestamp are unchanged."""
+    if before and before.get("Email") == after.get("Email") and before.get("Timestamp") == after.get("Timestamp"):
+        return None
+    return owner_entry(after)
+
+
+class OwnerIndex:
+    """
+    The index in issues.owners.db. Until it is built, writes leave it alone;
+    the first lookup builds it from the issue data.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(OWNERS_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def is_built(self):
+        return self.connect().execute("SELECT 1 FROM owners_meta WHERE key = 'built'").fetchone() is not None
+
+    def apply(self, entries):
+        """Files issues under their (email, month), replacing earlier entries for the same IDs."""
+        entries = [e for e in entries if e is not None]
+        if not entries or not self.is_built():
+            return
+        conn = self.connect()
+        with conn:
+            conn.executemany("DELETE FROM owners WHERE issue_id = ?", [(issue_id,) for _, issue_id, _ in entries])
+            conn.executemany("INSERT INTO owners (email, issue_id, month) VALUES (?, ?, ?)", entries)
+
+    def replace(self, entries):
+        conn = self.connect()
+        with conn:
+            conn.execute("DELETE FROM owners")
+            conn.executemany("INSERT OR REPLACE INTO owners (email, issue_id, month) VALUES (?, ?, ?)", entries)
+            conn.execute("INSERT OR REPLACE INTO owners_meta (key, value) VALUES ('built', '1')")
+
+    def lookup(self, email):
+        """[(ID, month)] of the issues filed under `email`."""
+        return self.connect().execute("SELECT issue_id, month FROM owners WHERE email = ?",
+                                      (normalize_email(email),)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up or rebuild the CSV backend's owner index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_lookup = sub.add_parser("lookup", help="issues submitted from an email")
+    p_lookup.add_argument("email")
+    sub.add_parser("rebuild", help="re-index every issue from the issue data")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store("csv")
+    if args.command == "rebuild":
+        store.rebuild_owners()
+        print("Rebuilt the owner index")
+        return
+    for issue in store.issues_by_email(args.email):
+        print(f"{issue['ID']}  {issue['Timestamp']}  {issue['Status']:<8}  {issue['Title'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
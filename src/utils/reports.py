@@ -0,0 +1,175 @@
+"""
+Reports of resolved issues: CSV, JSON Lines or Excel, optionally gzipped.
+
+A report is a pipeline of generators. IssueStore.iter_resolved reads the
+store a chunk at a time (a cursor on SQLite, one month of the archive on
+the CSV backend), each chunk is serialized as soon as it arrives, and the
+bytes pass through an incremental gzip compressor into a spooled temporary
+file that stays in memory while small and moves to disk past SPOOL_BYTES.
+No step ever holds more than one chunk of rows. Excel needs openpyxl
+(optional); its write-only mode adds rows the same way, starting a new sheet
+every EXCEL_MAX_ROWS, and is not gzipped: .xlsx is already a zip archive.
+
+The Tech Lead panel builds reports when the download button is clicked, on
+Streamlit's download thread rather than in the page script. Streamlit keeps
+the finished file in memory to serve it, which gzip keeps small.
+
+    PYTHONPATH=src python -m utils.reports --month 2025-01 --gzip --out resolved-2025-01.csv.gz
+    PYTHONPATH=src python -m utils.reports --from 2025-01-01 --to 2025-03-31 --format jsonl --out q1.jsonl
+    PYTHONPATH=src python -m utils.reports --resolved-by lead@gmail.com --format xlsx --out lead.xlsx
+"""
+import argparse
+import calendar
+import importlib.util
+import shutil
+import sys
+import tempfile
+import zlib
+from datetime import date
+
+from utils.metrics import ROWS_READ, timed
+from utils.snapshot import to_text
+
+CHUNK_SIZE = 2000  # Rows serialized per step; smaller steps let other sessions' threads in sooner
+SPOOL_BYTES = 16 * 2**20  # Reports larger than this are spooled to a temporary file
+GZIP_LEVEL = 1  # ~4x faster than the default 6 for ~10% larger files
+EXCEL_MAX_ROWS = 1_048_575  # Per sheet, below the header row
+
+REPORT_COLUMNS = [
+    "ID", "Title", "Description", "Name", "Email", "College", "Urgency",
+    "Timestamp", "ResolvedBy", "ResolvedAt", "Response",
+]
+
+# Format -> (file extension, MIME type)
+FORMATS = {
+    "csv":   ("csv", "text/csv"),
+    "jsonl": ("jsonl", "application/x-ndjson"),
+    "xlsx":  ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def excel_available():
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def month_range(month):
+    """'YYYY-MM' -> (first day, last day) of that month."""
+    year, mon = (int(part) for part in month.split("-"))
+    return date(year, mon, 1), date(year, mon, calendar.monthrange(year, mon)[1])
+
+
+def file_name(fmt, compress=False, date_from=None, date_to=None):
+    """resolved-2025-01-01_2025-01-31.csv.gz, resolved-all.jsonl, ..."""
+    span = f"{date_from or 'start'}_{date_to or 'now'}" if date_from or date_to else "all"
+    return f"resolved-{span}.{FORMATS[fmt][0]}" + (".gz" if compress and fmt != "xlsx" else "")
+
+
+def mime_type(fmt, compress=False):
+    return "application/gzip" if compress and fmt != "xlsx" else FORMATS[fmt][1]
+
+# ─── PIPELINE ───────────────────────────────────────────────────────────────────
+
+def report_chunks(store, chunk_size=CHUNK_SIZE, **filters):
+    """Report rows as all-text frames of REPORT_COLUMNS; filters as in IssueStore.iter_resolved."""
+    for chunk in store.iter_resolved(chunk_size=chunk_size, **filters):
+        ROWS_READ.inc(len(chunk), source="report")
+        yield to_text(chunk[REPORT_COLUMNS])
+
+
+def csv_parts(chunks):
+    """UTF-8 CSV, header first (also when there are no rows)."""
+    yield (",".join(REPORT_COLUMNS) + "\n").encode("utf-8")
+    for chunk in chunks:
+        yield chunk.to_csv(header=False, index=False).encode("utf-8")
+
+
+def jsonl_parts(chunks):
+    """One JSON object per line."""
+    for chunk in chunks:
+        yield chunk.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n").encode("utf-8") + b"\n"
+
+
+def gzip_parts(parts, level=GZIP_LEVEL):
+    """Compresses a byte stream into one gzip member as it goes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 16 + 15: gzip header and trailer
+    for part in parts:
+        out = compressor.compress(part)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def write_xlsx(chunks, f):
+    """Writes the rows to `f` with openpyxl's write-only workbook, EXCEL_MAX_ROWS per sheet."""
+    from openpyxl import Workbook  # Optional: only Excel reports need it
+
+    wb = Workbook(write_only=True)
+    sheet, rows = None, EXCEL_MAX_ROWS
+    for chunk in chunks:
+        for row in zip(*(chunk[c].tolist() for c in REPORT_COLUMNS)):
+            if rows == EXCEL_MAX_ROWS:
+                sheet = wb.create_sheet("Resolved" if sheet is None else f"Resolved {len(wb.worksheets) + 1}")
+                sheet.append(REPORT_COLUMNS)
+                rows = 0
+            sheet.append(row)
+            rows += 1
+    if sheet is None:
+        wb.create_sheet("Resolved").append(REPORT_COLUMNS)
+    wb.save(f)
+
+
+@timed("report")
+def build_report(store, fmt="csv", compress=False, chunk_size=CHUNK_SIZE, **filters):
+    """
+    The whole report in a spooled temporary file, rewound for reading.
+    filters: date_from, date_to, college, resolved_by (IssueStore.iter_resolved).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r}; expected one of {sorted(FORMATS)}")
+    chunks = report_chunks(store, chunk_size, **filters)
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    if fmt == "xlsx":
+        write_xlsx(chunks, out)
+    else:
+        parts = csv_parts(chunks) if fmt == "csv" else jsonl_parts(chunks)
+        for part in gzip_parts(parts) if compress else parts:
+            out.write(part)
+    out.seek(0)
+    return out
+
+
+def report_bytes(store, fmt="csv", compress=False, **filters):
+    """build_report() read out, for st.download_button, which serves downloads from memory."""
+    with build_report(store, fmt, compress, **filters) as report:
+        return report.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a report of resolved issues.")
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    parser.add_argument("--month", help="YYYY-MM: issues resolved in that month")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="resolved on or after (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="resolved on or before (YYYY-MM-DD)")
+    parser.add_argument("--college")
+    parser.add_argument("--resolved-by")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+    if args.month:
+        args.date_from, args.date_to = month_range(args.month)
+    if args.format == "xlsx" and not excel_available():
+        parser.error("Excel reports need openpyxl (pip install openpyxl)")
+
+    from utils.storage import create_store
+    store = create_store(args.backend)
+    report = build_report(store, args.format, args.gzip, args.chunk_size, date_from=args.date_from,
+                          date_to=args.date_to, college=args.college, resolved_by=args.resolved_by)
+    with report, open(args.out, "wb") as f:
+        shutil.copyfileobj(report, f)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
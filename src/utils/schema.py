@@ -0,0 +1,59 @@
+"""
+Schema version of the stored issue data.
+
+Both backends stamp the version they were written with: the CSV backend in
+the Parquet footer of issues.parquet and of every archive partition, SQLite
+in PRAGMA user_version. Reads trust a matching stamp and load the data as
+is, with no legacy renames, missing-column fills or type coercion; a
+mismatch fails as soon as the store is opened. Old data is rewritten once:
+
+    PYTHONPATH=src python -m utils.schema check
+    PYTHONPATH=src python -m utils.schema migrate
+
+A CSV install with no issues.parquet yet is migrated on first start.
+
+Versions:
+    1  ISSUE_COLUMNS in order, typed snapshot (utils/snapshot.py), Version column
+    2  ResolvedAt column (empty for issues resolved before it existed)
+    3  Email stored normalized: trimmed, lower case (indexed for "My Issues")
+    4  ResolvedBy stored normalized like Email, so each lead is counted once
+"""
+import argparse
+import sys
+
+SCHEMA_VERSION = 4
+SCHEMA_KEY = b"helpdesk.schema"  # Parquet footer metadata key
+
+
+class SchemaVersionError(Exception):
+    """Stored data was written with a different schema version than this code reads."""
+
+    def __init__(self, where, found):
+        self.where = where
+        self.found = found
+        if found > SCHEMA_VERSION:
+            hint = "it was written by a newer version of the app; upgrade the app"
+        else:
+            hint = "run `PYTHONPATH=src python -m utils.schema migrate` once"
+        super().__init__(f"{where} has schema version {found}, this app reads version {SCHEMA_VERSION}: {hint}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or migrate the stored issue data's schema version.")
+    parser.add_argument("command", choices=["check", "migrate"])
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store(args.backend, check_schema=False)
+    if args.command == "check":
+        found = store.schema_version()
+        print(f"schema version {found} (current {SCHEMA_VERSION})")
+        sys.exit(0 if found == SCHEMA_VERSION else 1)
+    migrated = store.migrate_schema()
+    print(f"Migrated {migrated} to schema version {SCHEMA_VERSION}" if migrated
+          else f"Already at schema version {SCHEMA_VERSION}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Full-text search over issue Title, Description and Response.
+
+The index is an SQLite FTS5 table in its own file next to the data
+(issues.search.db / helpdesk.search.db), so queries never load the issues
+into pandas. Ranking is BM25 with Title weighted above the body fields,
+every query term matches as a prefix, and results can be filtered by
+urgency, status and college. The first search builds it from the issue
+data; from then on the stores update it on submit and resolve (until it is
+built, those writes leave it alone). Rebuild it from the data with
+
+    PYTHONPATH=src python -m utils.search --rebuild
+"""
+import argparse
+import re
+import sqlite3
+import threading
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue_docs (
+    rid     INTEGER PRIMARY KEY,
+    ID      TEXT NOT NULL UNIQUE,
+    Name    TEXT NOT NULL DEFAULT '',
+    College TEXT NOT NULL DEFAULT '',
+    Urgency TEXT NOT NULL DEFAULT '',
+    Status  TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_docs_filters ON issue_docs (Status, Urgency, College);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS issue_fts USING fts5(
+    Title, Description, Response,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TABLE IF NOT EXISTS search_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# bm25() column weights, in issue_fts column order
+TITLE_WEIGHT = 3.0
+BODY_WEIGHT = 1.0
+
+RESULT_COLUMNS = ["ID", "Name", "College", "Urgency", "Status", "Title", "Description", "Response", "Score"]
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(text):
+    """Free text -> FTS5 query: every word is a quoted prefix term, all must match."""
+    return " ".join(f'"{tok}"*' for tok in _TOKEN.findall(text))
+
+
+def _text(value):
+    return "" if value is None or (isinstance(value, float) and value != value) else str(value)
+
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def is_built(self):
+        return self.connect().execute("SELECT 1 FROM search_meta WHERE key = 'built'").fetchone() is not None
+
+    def _writable(self, conn):
+        """True once built. A build holds the write lock while it runs: wait for it, then look again."""
+        if self.is_built():
+            return True
+        conn.execute("BEGIN IMMEDIATE")
+        return self.is_built()
+
+    def __len__(self):
+        return self.connect().execute("SELECT COUNT(*) FROM issue_docs").fetchone()[0]
+
+    # Writes
+
+    def _add(self, conn, issue):
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO issue_docs (ID, Name, College, Urgency, Status) VALUES (?, ?, ?, ?, ?)",
+            tuple(_text(issue.get(c)) for c in ("ID", "Name", "College", "Urgency", "Status")),
+        )
+        if cur.rowcount == 1:
+            conn.execute(
+                "INSERT INTO issue_fts (rowid, Title, Description, Response) VALUES (?, ?, ?, ?)",
+                (cur.lastrowid, _text(issue.get("Title")), _text(issue.get("Description")),
+                 _text(issue.get("Response"))),
+            )
+
+    def add(self, issue):
+        self.add_many([issue])
+
+    def add_many(self, issues):
+        conn = self.connect()
+        with conn:
+            if not self._writable(conn):
+                return
+            for issue in issues:
+                self._add(conn, issue)
+
+    def update(self, issue_id, fields):
+        """Applies changed issue fields (e.g. Status, Response after a resolve)."""
+        conn = self.connect()
+        with conn:
+            if not self._writable(conn):
+                return
+            row = conn.execute("SELECT rid FROM issue_docs WHERE ID = ?", (str(issue_id),)).fetchone()
+            if row is None:
+                return
+            rid = row[0]
+            doc_fields = {k: _text(v) for k, v in fields.items() if k in ("Name", "College", "Urgency", "Status")}
+            if doc_fields:
+                sets = ", ".join(f"{k} = ?" for k in doc_fields)
+                conn.execute(f"UPDATE issue_docs SET {sets} WHERE rid = ?", (*doc_fields.values(), rid))
+            fts_fields = {k: _text(v) for k, v in fields.items() if k in ("Title", "Description", "Response")}
+            if fts_fields:
+                sets = ", ".join(f"{k} = ?" for k in fts_fields)
+                conn.execute(f"UPDATE issue_fts SET {sets} WHERE rowid = ?", (*fts_fields.values(), rid))
+
+    def build(self, load_issues):
+        """Indexes every issue (`load_issues` returns them as a frame) unless the index is already built."""
+        self.rebuild(load_issues, force=False)
+
+    def rebuild(self, load_issues, force=True):
+        """
+        Reindexes every issue from `load_issues()`, which runs inside the write
+        lock: a submit or resolve racing the build waits for it and then
+        applies its change on top, so nothing written meanwhile is missed.
+        """
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if not force and self.is_built():
+                return  # Another session built it while we waited
+            issues_df = load_issues()
+            conn.execute("DELETE FROM issue_docs")
+            conn.execute("DELETE FROM issue_fts")
+            for issue in issues_df.to_dict("records"):
+                self._add(conn, issue)
+            conn.execute("INSERT OR REPLACE INTO search_meta (key, value) VALUES ('built', '1')")
+            conn.execute("INSERT INTO issue_fts (issue_fts) VALUES ('optimize')")
+
+    # Queries
+
+    def search(self, text, limit=10, urgency=None, status=None, college=None):
+        """Top `limit` issues for `text` ranked by BM25, as a frame with RESULT_COLUMNS (best first)."""
+        match = to_match_query(text)
+        if not match:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+
+        where, params = ["f.issue_fts MATCH ?"], [match]
+        if urgency:
+            where.append(f"d.Urgency IN ({', '.join('?' for _ in urgency)})")
+            params.extend(urgency)
+        if status:
+            where.append("d.Status = ?")
+            params.append(status)
+        if college:
+            where.append("d.College = ?")
+            params.append(college)
+
+        sql = (
+            "SELECT d.ID, d.Name, d.College, d.Urgency, d.Status, "
+            "       f.Title, f.Description, f.Response, "
+            f"      bm25(issue_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}, {BODY_WEIGHT}) AS Score "
+            "FROM issue_fts AS f JOIN issue_docs AS d ON d.rid = f.rowid "
+            f"WHERE {' AND '.join(where)} "
+            "ORDER BY Score LIMIT ?"
+        )
+        params.append(limit)
+        return pd.read_sql_query(sql, self.connect(), params=params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query or rebuild the full-text issue index.")
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--rebuild", action="store_true", help="reindex every issue from the store")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store()
+    if args.rebuild:
+        store.search_index.rebuild(store.load_issues)
+        print(f"Indexed {len(store.search_index)} issues")
+    if args.query:
+        print(store.search(args.query, limit=args.limit).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Near-duplicate detection for new issues.
+
+Every issue is reduced to a MinHash signature over its word unigrams and
+bigrams (Title + Description), keeping the low 8 bits of each of the
+NUM_PERM minima (b-bit MinHash). Signatures live in one NumPy matrix stored
+permutation-major, shape (NUM_PERM, capacity), grown in place as issues are
+submitted. Checking a new issue compares one contiguous row per permutation
+against the query and accumulates matches, which estimates the Jaccard
+similarity with every existing issue at once (~64 bytes per issue).
+
+The matrix is persisted to <data>.minhash.npz together with the change-log
+seq (utils/changes.py) it is current to. Before a check the detector reads
+the changes after that seq and hashes only the submits and Title or
+Description edits among them; a restart resumes from the saved seq. The
+issues are read in full only when there is no seq yet (first use, a file
+from before the seq was saved) or the changes after it were pruned.
+"""
+import os
+import re
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64
+DUPLICATE_THRESHOLD = 0.35  # Estimated Jaccard similarity
+SAVE_EVERY = 1000           # Re-save the matrix after this many new signatures
+FEED_PAGE = 1000            # Changes read per step while catching up
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20250606)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_EMPTY = np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+_COLLISION = 1 / 256  # Chance that two different 8-bit minima agree
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text):
+    words = _TOKEN.findall(str(text).lower())
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def signature(text):
+    """b-bit MinHash signature (NUM_PERM uint8 values) of the text's shingle set."""
+    features = shingles(text)
+    if not features:
+        minima = _EMPTY
+    else:
+        h = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint64, count=len(features))
+        # (a*h + b) mod p for every (feature, permutation) pair; a < 2^31 and h < 2^32 so nothing overflows
+        minima = ((np.outer(h, _A) + _B) % _PRIME).min(axis=0)
+    return (minima & 0xFF).astype(np.uint8)
+
+
+def issue_text(issue):
+    return f"{issue.get('Title', '') or ''} {issue.get('Description', '') or ''}"
+
+
+class DuplicateDetector:
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = []
+        self._pos = {}    # ID -> column
+        self._seq = None  # Change-log seq the matrix is current to; None: unknown, rebuild
+        self._sigs = np.empty((NUM_PERM, 0), dtype=np.uint8)
+        self._n = 0
+        self._unsaved = 0
+        self._loaded = False
+
+    def __len__(self):
+        return self._n
+
+    def _append(self, issue_id, sig):
+        if self._n == self._sigs.shape[1]:
+            grown = np.empty((NUM_PERM, max(1024, 2 * self._sigs.shape[1])), dtype=np.uint8)
+            grown[:, :self._n] = self._sigs[:, :self._n]
+            self._sigs = grown
+        self._sigs[:, self._n] = sig
+        self._ids.append(issue_id)
+        self._pos[issue_id] = self._n
+        self._n += 1
+        self._unsaved += 1
+
+    def _put(self, issue_id, sig):
+        pos = self._pos.get(issue_id)
+        if pos is None:
+            self._append(issue_id, sig)
+        else:
+            self._sigs[:, pos] = sig
+            self._unsaved += 1
+
+    def _reset(self):
+        self._ids, self._pos, self._n = [], {}, 0
+        self._sigs = np.empty((NUM_PERM, 0), dtype=np.uint8)
+
+    def _load(self):
+        self._loaded = True
+        if self.path and os.path.exists(self.path):
+            data = np.load(self.path, allow_pickle=False)
+            ids, sigs = data["ids"].tolist(), data["sigs"]
+            self._sigs = np.array(sigs, dtype=np.uint8)
+            self._ids, self._pos, self._n = ids, {i: pos for pos, i in enumerate(ids)}, len(ids)
+            self._seq = int(data["seq"]) if "seq" in data.files else None
+
+    def _save(self):
+        if not self.path:
+            return
+        arrays = dict(ids=np.array(self._ids, dtype=str), sigs=self._sigs[:, :self._n])
+        if self._seq is not None:
+            arrays["seq"] = np.int64(self._seq)
+        # A temp file of our own, so processes saving at once never write into each other's
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp.npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._unsaved = 0
+
+    def refresh(self, changes, get, load_issues):
+        """
+        Brings the matrix up to the store's change log (a ChangeLog). Replays
+        the changes after the saved seq, reading edited issues with `get`;
+        `load_issues` (every issue as a frame) is called only to rebuild when
+        there is nothing to replay from. Costs one seq lookup when nothing changed.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            latest = changes.latest()
+            if self._seq == latest:
+                return
+            edited = None if self._seq is None else self._replay(changes)
+            if edited is not None:
+                for issue_id in edited:
+                    issue = get(issue_id)
+                    if issue is not None:
+                        self._put(issue_id, signature(issue_text(issue)))
+                if self._unsaved >= SAVE_EVERY:
+                    self._save()
+                return
+            self._reset()
+            for issue in load_issues().to_dict("records"):
+                self._append(str(issue["ID"]), signature(issue_text(issue)))
+            self._seq = latest  # Read before the issues: changes in between are replayed next time
+            self._save()
+
+    def _replay(self, changes):
+        """
+        Hashes the issues submitted after self._seq and advances it. Returns
+        the IDs whose Title or Description was edited since, or None if some
+        of those changes were already pruned.
+        """
+        edited = set()
+        while True:
+            page, complete = changes.since(self._seq, FEED_PAGE)
+            if not complete:
+                return None
+            if not page:
+                return edited
+            for change in page:
+                if change["op"] == "submit":
+                    if change["key"] not in self._pos:
+                        self._append(change["key"], signature(issue_text(change["data"])))
+                elif change["op"] == "update" and ("Title" in change["data"] or "Description" in change["data"]):
+                    edited.add(change["key"])  # The change holds only the edited field; get() has both
+            self._seq = page[-1]["seq"]
+
+    def add(self, issue):
+        """Incremental update from the submit path; ignored until the matrix has been loaded."""
+        with self._lock:
+            issue_id = str(issue["ID"])
+            if not self._loaded or issue_id in self._pos:
+                return
+            self._append(issue_id, signature(issue_text(issue)))
+            if self._unsaved >= SAVE_EVERY:
+                self._save()
+
+    def query(self, text, limit=3, threshold=DUPLICATE_THRESHOLD):
+        """[(issue_id, similarity)] for the most similar issues at or above threshold, best first."""
+        q = signature(text)
+        with self._lock:
+            n = self._n
+            if n == 0:
+                return []
+            matches = np.zeros(n, dtype=np.uint8)
+            equal = np.empty(n, dtype=bool)
+            for j in range(NUM_PERM):
+                np.equal(self._sigs[j, :n], q[j], out=equal)
+                np.add(matches, equal, out=matches, casting="unsafe")
+            # Undo the 1/256 chance of unrelated 8-bit minima agreeing
+            scores = np.clip((matches / NUM_PERM - _COLLISION) / (1 - _COLLISION), 0, 1)
+            k = min(limit, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top if scores[i] >= threshold]
@@ -0,0 +1,191 @@
+"""
+Typed, columnar issue snapshot (Parquet via pyarrow).
+
+The CSV backend keeps its compacted snapshot in issues.parquet with a fixed
+schema instead of re-inferring types from issues.csv on every load:
+
+    ID, Name, Email, Title, Description, Response   strings ("" when empty)
+    College, Urgency, Status, ResolvedBy            categoricals
+    Timestamp, ResolvedAt                           datetime64 (NaT if unparseable / not resolved)
+    Version                                         int64
+
+Reads can project columns (the aggregate recount reads four of twelve).
+Every file is stamped with SCHEMA_VERSION (utils/schema.py) in its footer;
+a file with the current stamp is loaded as stored, anything else raises
+SchemaVersionError. issues.csv remains the import/export format: a store
+with only issues.csv converts it when it is opened.
+
+    PYTHONPATH=src python -m utils.snapshot export --out issues.csv
+    PYTHONPATH=src python -m utils.snapshot import issues.csv
+"""
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.metrics import BYTES_WRITTEN
+from utils.schema import SCHEMA_KEY, SCHEMA_VERSION, SchemaVersionError
+
+TEXT_COLUMNS = ["ID", "Name", "Email", "Title", "Description", "Response"]
+CATEGORY_COLUMNS = ["College", "Urgency", "Status", "ResolvedBy"]
+DATETIME_COLUMNS = ["Timestamp", "ResolvedAt"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def snapshot_path(path):
+    """issues.csv -> issues.parquet"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def _is_category(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _text(series):
+    return series.fillna("").astype(str)
+
+
+def typed_issues(df):
+    """
+    Returns `df` with the snapshot schema applied to whichever issue columns it has.
+    Columns already of the right type are left alone, so this is cheap on typed frames.
+    """
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in TEXT_COLUMNS:
+            if not pd.api.types.is_string_dtype(s.dtype) or s.hasnans:
+                s = _text(s)
+        elif c in CATEGORY_COLUMNS:
+            if not _is_category(s):
+                s = _text(s).astype("category")
+        elif c in DATETIME_COLUMNS:
+            if not pd.api.types.is_datetime64_any_dtype(s.dtype):
+                s = pd.to_datetime(s, errors="coerce", format="ISO8601")
+        elif c == "Version":
+            if s.dtype != "int64":
+                s = pd.to_numeric(s, errors="coerce").fillna(0).astype("int64")
+        out[c] = s
+    return pd.DataFrame(out, index=df.index)
+
+
+def to_text(df):
+    """All-string copy for CSV export / SQLite: datetimes as TIMESTAMP_FORMAT, "" for missing values."""
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s.dtype):
+            s = s.dt.strftime(TIMESTAMP_FORMAT)
+        out[c] = _text(s)
+    return pd.DataFrame(out, index=df.index)
+
+
+def plain_issue(issue):
+    """JSON-ready copy of an issue dict: datetimes as TIMESTAMP_FORMAT text, missing values as ""."""
+    out = {}
+    for k, v in issue.items():
+        if v is None or v is pd.NaT or (isinstance(v, float) and v != v):
+            v = ""
+        elif isinstance(v, pd.Timestamp):
+            v = v.strftime(TIMESTAMP_FORMAT)
+        elif hasattr(v, "item"):
+            v = v.item()  # NumPy scalar
+        out[k] = v
+    return out
+
+
+def coerce_values(field, values):
+    """Converts raw journal values (strings, ints) for one column to the snapshot type."""
+    if field in DATETIME_COLUMNS:
+        return pd.to_datetime(pd.Series(values, dtype=object), errors="coerce", format="ISO8601")
+    if field == "Version":
+        return pd.Series(values).astype("int64")
+    return pd.Series(values, dtype=object).fillna("").astype(str)
+
+
+def align_categories(df, values, field):
+    """Adds any categories `values` needs to df[field] (a new ResolvedBy, College...). Mutates df."""
+    if field in df.columns and _is_category(df[field]):
+        missing = pd.Index(pd.unique(pd.Series(values, dtype=object))).difference(df[field].cat.categories)
+        if len(missing):
+            df[field] = df[field].cat.add_categories(missing)
+
+
+def concat_typed(df, new):
+    """Appends typed rows to a typed frame, keeping categoricals categorical."""
+    df = df.copy()
+    new = new.copy()
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns and _is_category(df[c]) and _is_category(new[c]):
+            categories = df[c].cat.categories.union(new[c].cat.categories)
+            if len(categories) != len(df[c].cat.categories):
+                df[c] = df[c].cat.set_categories(categories)
+            new[c] = new[c].cat.set_categories(df[c].cat.categories)
+    return pd.concat([df, new], ignore_index=True)
+
+# ─── FILES ─────────────────────────────────────────────────────────────────────
+
+def _stamp(schema):
+    return int((schema.metadata or {}).get(SCHEMA_KEY, 0))
+
+
+def snapshot_version(f):
+    """Schema version stamped on a Parquet file; 0 if it predates versioning."""
+    return _stamp(pq.read_schema(f))
+
+
+def read_snapshot(f, columns=None):
+    """
+    Typed frame from a Parquet file (path or open binary file), optionally only
+    `columns`. The stamp guarantees the schema, so nothing is renamed or coerced.
+    """
+    pf = pq.ParquetFile(f)
+    found = _stamp(pf.schema_arrow)
+    if found != SCHEMA_VERSION:
+        raise SchemaVersionError(f if isinstance(f, str) else getattr(f, "name", "snapshot"), found)
+    return pf.read(columns=columns).to_pandas()
+
+
+def read_any_snapshot(path):
+    """A Parquet file of any schema version, exactly as stored (migrations only)."""
+    return pq.read_table(path).to_pandas()
+
+
+def write_snapshot(df, path):
+    """Writes a typed frame stamped with SCHEMA_VERSION to `path` (callers write to a temp name and swap)."""
+    table = pa.Table.from_pandas(typed_issues(df), preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, SCHEMA_KEY: str(SCHEMA_VERSION).encode()})
+    pq.write_table(table, path, compression="zstd")
+    BYTES_WRITTEN.inc(os.path.getsize(path), target="parquet")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export issues to CSV or replace them from a CSV file.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_exp = sub.add_parser("export", help="write every issue (snapshot + journal) as CSV")
+    p_exp.add_argument("--out", default="issues-export.csv")
+    p_imp = sub.add_parser("import", help="replace the issue data with a CSV file")
+    p_imp.add_argument("csv")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store, read_issues_csv, save_issue
+    store = create_store("csv")
+    if args.command == "export":
+        df = store.load_issues()
+        to_text(df).to_csv(args.out, index=False)
+        print(f"Exported {len(df)} issues to {args.out}")
+    else:
+        df = read_issues_csv(args.csv)
+        save_issue(df, store.issues_path)
+        store.rebuild_aggregates()
+        store.rebuild_rollups()
+        store.rebuild_triage()
+        store.rebuild_owners()
+        store.search_index.rebuild(store.load_issues)
+        print(f"Imported {len(df)} issues from {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+
+from utils.accounts import SqliteAccounts
+from utils.aggregates import IssueAggregates, DIMENSIONS, update_delta
+from utils import analytics
+from utils.analytics import DailyRollups
+from utils.cache import issue_cache
+from utils.changes import ChangeLog, submit_change, update_change
+from utils.metrics import ROWS_READ, timed
+from utils.outbox import Outbox, outbox_path
+from utils.schema import SCHEMA_VERSION, SchemaVersionError
+from utils.search import SearchIndex
+from utils.similarity import DuplicateDetector
+from utils.snapshot import typed_issues, TIMESTAMP_FORMAT
+from utils.storage import (IssueStore, ISSUE_COLUMNS, URGENCY_RANK, ConflictError, IssueNotFoundError,
+                           _check_fields)
+from utils.triage import TriageQueue, frame_priorities, queue_delta
+from utils.users import normalize_email
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    ID          TEXT PRIMARY KEY,
+    Name        TEXT NOT NULL DEFAULT '',
+    Email       TEXT NOT NULL DEFAULT '',
+    College     TEXT NOT NULL DEFAULT '',
+    Title       TEXT NOT NULL DEFAULT '',
+    Description TEXT NOT NULL DEFAULT '',
+    Urgency     TEXT NOT NULL DEFAULT '',
+    Status      TEXT NOT NULL DEFAULT 'Open',
+    Timestamp   TEXT NOT NULL DEFAULT '',
+    ResolvedBy  TEXT NOT NULL DEFAULT '',
+    ResolvedAt  TEXT NOT NULL DEFAULT '',
+    Response    TEXT NOT NULL DEFAULT '',
+    Version     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_issues_status_ts ON issues (Status, Timestamp);
+CREATE INDEX IF NOT EXISTS idx_issues_email     ON issues (Email);
+CREATE INDEX IF NOT EXISTS idx_issues_resolved  ON issues (ResolvedBy);
+CREATE INDEX IF NOT EXISTS idx_issues_timestamp ON issues (Timestamp);
+CREATE INDEX IF NOT EXISTS idx_issues_college   ON issues (College);
+
+-- Bumped by every write; keys the shared snapshot cache
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+
+-- Materialized counts, updated in the same transaction as each write
+CREATE TABLE IF NOT EXISTS aggregates (
+    dimension TEXT NOT NULL,
+    value     TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value)
+);
+"""
+
+_COLS = ", ".join(ISSUE_COLUMNS)
+_PLACEHOLDERS = ", ".join("?" for _ in ISSUE_COLUMNS)
+
+_URGENCY_ORDER = "CASE Urgency " + " ".join(
+    f"WHEN '{level}' THEN {rank}" for level, rank in URGENCY_RANK.items()
+) + f" ELSE {len(URGENCY_RANK)} END"
+
+_ORDER_BY = {
+    "newest":  "Timestamp DESC, ID DESC",
+    "oldest":  "Timestamp, ID",
+    "urgency": f"{_URGENCY_ORDER}, Timestamp, ID",
+}
+
+
+def _day_start(day):
+    """Midnight of a `date`, as stored timestamps are written (TIMESTAMP_FORMAT)."""
+    return datetime.combine(day, time()).strftime(TIMESTAMP_FORMAT)
+
+
+class SqliteStore(IssueStore):
+    """
+    SQLite backend. Every query is served by an index, so pages, lookups and
+    counts never scan the whole table. Each thread (Streamlit session) gets
+    its own connection; WAL mode lets readers run alongside a writer.
+    """
+
+    def __init__(self, path="helpdesk.db", check_schema=True):
+        self.path = path
+        self._local = threading.local()
+        self._cache_name = "issues:sqlite:" + path
+        self.search_index = SearchIndex(os.path.splitext(path)[0] + ".search.db")
+        self.duplicates = DuplicateDetector(os.path.splitext(path)[0] + ".minhash.npz")
+        conn = self.connect()
+        if not self._columns(conn):
+            conn.executescript(SCHEMA)  # New database
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif check_schema and self.schema_version() != SCHEMA_VERSION:
+            raise SchemaVersionError(path, self.schema_version())
+        self.rollups = DailyRollups(connect=self.connect, name=path)  # Tables in this database, same transactions
+        self.triage = TriageQueue(connect=self.connect)
+        self.changes = ChangeLog(connect=self.connect)
+        self.outbox = Outbox(connect=self.connect, name=path)  # Enqueued in the resolve's transaction
+        self.outbox.adopt(outbox_path(path))
+        self.accounts = SqliteAccounts(connect=self.connect, changes=self.changes)  # Table: utils/accounts.py
+
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @timed("load")
+    def _frame(self, sql, params=()):
+        """Query result with the same column types as the CSV backend's typed snapshot."""
+        df = pd.read_sql_query(sql, self.connect(), params=params)
+        ROWS_READ.inc(len(df), source="sqlite")
+        return typed_issues(df)
+
+    # Schema (stamped in PRAGMA user_version)
+
+    def _columns(self, conn):
+        return {row[1] for row in conn.execute("PRAGMA table_info(issues)")}
+
+    def schema_version(self):
+        return self.connect().execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate_schema(self):
+        found = self.schema_version()
+        if found > SCHEMA_VERSION:
+            raise SchemaVersionError(self.path, found)
+        if found == SCHEMA_VERSION:
+            return 0
+        conn = self.connect()
+        with conn:
+            if "Version" not in self._columns(conn):
+                # Databases created before optimistic concurrency
+                conn.execute("ALTER TABLE issues ADD COLUMN Version INTEGER NOT NULL DEFAULT 0")
+            if "ResolvedAt" not in self._columns(conn):
+                # Schema version 2
+                conn.execute("ALTER TABLE issues ADD COLUMN ResolvedAt TEXT NOT NULL DEFAULT ''")
+            if found < 3:
+                # Schema version 3: Email normalized like normalize_email
+                conn.execute("UPDATE issues SET Email = lower(trim(Email, char(32, 9, 10, 13))) "
+                             "WHERE Email <> lower(trim(Email, char(32, 9, 10, 13)))")
+            if found < 4:
+                # Schema version 4: ResolvedBy normalized the same way
+                conn.execute("UPDATE issues SET ResolvedBy = lower(trim(ResolvedBy, char(32, 9, 10, 13))) "
+                             "WHERE ResolvedBy <> lower(trim(ResolvedBy, char(32, 9, 10, 13)))")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._recount_leads()
+        return 1
+
+    def version(self):
+        cur = self.connect().execute("SELECT value FROM meta WHERE key = 'version'")
+        return cur.fetchone()[0]
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        issue_cache.invalidate(self._cache_name)
+
+    # Issues
+
+    def load_issues(self):
+        """Full issues frame, cached until the next write. Read-only."""
+        return issue_cache.get(self._cache_name, self.version(),
+                               lambda: self._frame(f"SELECT {_COLS} FROM issues ORDER BY Timestamp, ID"))
+
+    def add_issue(self, issue):
+        self.add_issues([issue])
+
+    @timed("write")
+    def insert_issues(self, issues):
+        """Inserts a batch in one transaction; IDs already present are skipped. Returns the IDs inserted."""
+        delta = {}
+        inserted = []
+        with self.connect() as conn:
+            for issue in issues:
+                row = {c: str(issue.get(c, "") or "") for c in ISSUE_COLUMNS}
+                row["Email"] = normalize_email(row["Email"])
+                row["ResolvedBy"] = normalize_email(row["ResolvedBy"])
+                row["Status"] = row["Status"] or "Open"  # As on the CSV backend (_submit_record)
+                row["Version"] = int(issue.get("Version") or 0)  # Kept when migrating, else a new issue's 0
+                cur = conn.execute(f"INSERT OR IGNORE INTO issues ({_COLS}) VALUES ({_PLACEHOLDERS})",
+                                   [row[c] for c in ISSUE_COLUMNS])
+                if cur.rowcount == 1:
+                    inserted.append(row)
+                    for pair, n in update_delta({}, row).items():
+                        delta[pair] = delta.get(pair, 0) + n
+            self._apply_aggregates(conn, delta)
+            self.rollups.apply(analytics.batch_delta(inserted), conn)
+            self.triage.apply([queue_delta({}, row) for row in inserted], conn)
+            self.changes.append([submit_change(row) for row in inserted], conn)
+            self._bump_version(conn)
+        self.search_index.add_many(inserted)
+        for row in inserted:
+            self.duplicates.add(row)
+        return [row["ID"] for row in inserted]
+
+    def iter_issues(self, chunk_size=10000):
+        """Streams the table through one cursor, so only a chunk is in memory at a time."""
+        cur = self.connect().execute(f"SELECT {_COLS} FROM issues ORDER BY Timestamp, ID")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield typed_issues(pd.DataFrame(rows, columns=ISSUE_COLUMNS))
+
+    def iter_resolved(self, date_from=None, date_to=None, college=None, resolved_by=None, chunk_size=10000):
+        """One cursor walking idx_issues_status_ts, so rows arrive in Timestamp order with no sort."""
+        where, params = ["Status = 'Resolved'"], []
+        if college:
+            where.append("College = ?")
+            params.append(college)
+        if resolved_by:
+            where.append("ResolvedBy = ?")
+            params.append(normalize_email(resolved_by))
+        # Both sides as TIMESTAMP_FORMAT text: datetime() also reads ISO "T" forms, and is NULL for ""
+        if date_from:
+            where.append("datetime(ResolvedAt) >= ?")
+            params.append(_day_start(date_from))
+        if date_to:
+            where.append("datetime(ResolvedAt) < ?")
+            params.append(_day_start(date_to + timedelta(days=1)))
+        cur = self.connect().execute(
+            f"SELECT {_COLS} FROM issues WHERE {' AND '.join(where)} ORDER BY Timestamp, ID", params
+        )
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield typed_issues(pd.DataFrame(rows, columns=ISSUE_COLUMNS))
+
+    def get(self, issue_id):
+        cur = self.connect().execute(f"SELECT {_COLS} FROM issues WHERE ID = ?", (str(issue_id),))
+        row = cur.fetchone()
+        return None if row is None else dict(zip(ISSUE_COLUMNS, row))
+
+    def issues_by_email(self, email):
+        # Emails are stored normalized, so this is a lookup on idx_issues_email
+        cur = self.connect().execute(
+            f"SELECT {_COLS} FROM issues WHERE Email = ? ORDER BY Timestamp DESC, ID DESC", (normalize_email(email),)
+        )
+        return [dict(zip(ISSUE_COLUMNS, row)) for row in cur.fetchall()]
+
+    @timed("filter")
+    def query_issues(self, status=None, urgency=None, college=None, date_from=None,
+                     date_to=None, sort="oldest", limit=None, offset=0):
+        where, params = [], []
+        if status:
+            where.append("Status = ?")
+            params.append(status)
+        if urgency:
+            where.append(f"Urgency IN ({', '.join('?' for _ in urgency)})")
+            params.extend(urgency)
+        if college:
+            where.append("College = ?")
+            params.append(college)
+        if date_from:
+            where.append("datetime(Timestamp) >= ?")
+            params.append(_day_start(date_from))
+        if date_to:
+            where.append("datetime(Timestamp) < ?")
+            params.append(_day_start(date_to + timedelta(days=1)))
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+        total = self.connect().execute(f"SELECT COUNT(*) FROM issues{where_sql}", params).fetchone()[0]
+        sql = f"SELECT {_COLS} FROM issues{where_sql} ORDER BY {_ORDER_BY.get(sort, _ORDER_BY['oldest'])}"
+        sql += " LIMIT ? OFFSET ?"
+        page = self._frame(sql, params + [-1 if limit is None else limit, offset])
+        return page, total
+
+    @timed("write")
+    def update_issue(self, issue_id, expected_version, **fields):
+        fields = _check_fields(fields)
+        conn = self.connect()
+        with conn:
+            # Take the write lock up front so the row cannot change between the read and the update
+            conn.execute("BEGIN IMMEDIATE")
+            before = self.get(issue_id)
+            if before is None:
+                raise IssueNotFoundError(issue_id)
+            sets = ", ".join(f"{k} = ?" for k in fields)
+            cur = conn.execute(
+                f"UPDATE issues SET {sets}, Version = Version + 1 WHERE ID = ? AND Version = ?",
+                (*fields.values(), str(issue_id), int(expected_version)),
+            )
+            if cur.rowcount == 0:
+                raise ConflictError(issue_id, expected_version, before)
+            after = {**before, **fields, "Version": before["Version"] + 1}
+            self._apply_aggregates(conn, update_delta(before, after))
+            self.rollups.apply(analytics.update_delta(before, after), conn)
+            self.triage.apply([queue_delta(before, after)], conn)
+            self.changes.append([update_change(issue_id, fields)], conn)
+            self._notify(before, after, conn)
+            self._bump_version(conn)
+        self.outbox.wakeup.set()
+        self.search_index.update(issue_id, fields)
+        return after
+
+    # Aggregates
+
+    def _apply_aggregates(self, conn, delta):
+        conn.executemany(
+            "INSERT INTO aggregates (dimension, value, count) VALUES (?, ?, ?) "
+            "ON CONFLICT (dimension, value) DO UPDATE SET count = count + excluded.count",
+            [(d, v, n) for (d, v), n in delta.items()],
+        )
+        conn.execute("DELETE FROM aggregates WHERE count <= 0")
+
+    def aggregates(self):
+        cur = self.connect().execute("SELECT dimension, value, count FROM aggregates")
+        counts = {d: {} for d in DIMENSIONS}
+        for dimension, value, count in cur.fetchall():
+            counts.setdefault(dimension, {})[value] = count
+        return IssueAggregates(counts)
+
+    def rebuild_aggregates(self):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM aggregates")
+            for dimension in ("Status", "Urgency", "College"):
+                conn.execute(
+                    f"INSERT INTO aggregates (dimension, value, count) "
+                    f"SELECT '{dimension}', {dimension}, COUNT(*) FROM issues GROUP BY {dimension}"
+                )
+            conn.execute(
+                "INSERT INTO aggregates (dimension, value, count) "
+                "SELECT 'ResolvedBy', ResolvedBy, COUNT(*) FROM issues "
+                "WHERE Status = 'Resolved' AND ResolvedBy != '' GROUP BY ResolvedBy"
+            )
+        return self.aggregates()
+
+    def rebuild_rollups(self, chunk_size=100000):
+        columns = analytics.ROLLUP_COLUMNS
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")  # No write can slip in between the scan and the replace
+            cur = conn.execute(f"SELECT {', '.join(columns)} FROM issues")
+            parts = []
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                parts.append(analytics.frame_contributions(typed_issues(pd.DataFrame(rows, columns=columns))))
+            self.rollups.replace(analytics.combine(parts), conn)
+
+    def rebuild_triage(self):
+        columns = ["ID", "Urgency", "Status", "Timestamp"]
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM issues WHERE Status = 'Open'").fetchall()
+            self.triage.replace(frame_priorities(pd.DataFrame(rows, columns=columns)), conn)
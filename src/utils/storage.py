@@ -1,18 +1,1150 @@
-import pandas as pd
+import json
+import logging
 import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.accounts import FileAccounts, USERS_CSV
+from utils.aggregates import IssueAggregates, DIMENSIONS, update_delta
+from utils import analytics
+from utils.analytics import DailyRollups
+from utils.archive import IssueArchive, archive_dir, partition_keys, UNDATED
+from utils.cache import issue_cache, file_fingerprint
+from utils.changes import ChangeLog, submit_change, update_change
+from utils.filelock import file_lock, try_file_lock, release_file_lock
+from utils.metrics import BYTES_WRITTEN, ROWS_READ, span, timed
+from utils.outbox import Outbox, notifications_enabled, outbox_path, resolved_notification, start_worker
+from utils.owners import OwnerIndex, frame_owners, owner_delta, owner_entry
+from utils.schema import SCHEMA_VERSION, SchemaVersionError
+from utils.search import SearchIndex
+from utils.similarity import DuplicateDetector, DUPLICATE_THRESHOLD
+from utils.snapshot import (snapshot_path, typed_issues, coerce_values, align_categories, concat_typed,
+                            read_snapshot, read_any_snapshot, snapshot_version, write_snapshot, plain_issue,
+                            TIMESTAMP_FORMAT)
+from utils.triage import TriageQueue, frame_priorities, queue_delta
+from utils.users import normalize_email
+
+log = logging.getLogger(__name__)
 
 ISSUES_CSV = "issues.csv"
 
-def save_issue(issues_df):
-    # issues_df: pandas DataFrame with all issues
-    issues_df.to_csv(ISSUES_CSV, index=False)
+ISSUE_COLUMNS = [
+    "ID", "Name", "Email", "College", "Title", "Description",
+    "Urgency", "Status", "Timestamp", "ResolvedBy", "ResolvedAt", "Response", "Version"
+]
 
-def get_all_issues():
-    if os.path.exists(ISSUES_CSV):
-        return pd.read_csv(ISSUES_CSV)
+# Fields update_issue() may change; ID and Version are managed by the store
+UPDATABLE_COLUMNS = [c for c in ISSUE_COLUMNS if c not in ("ID", "Version")]
+
+# Enough to pick the rows of a resolved-issue report without reading the text columns
+RESOLVED_COLUMNS = ["ID", "Status", "College", "ResolvedBy", "ResolvedAt"]
+
+class ConflictError(Exception):
+    """An update carried a stale expected_version: someone else changed the issue first."""
+
+    def __init__(self, issue_id, expected_version, current):
+        self.issue_id = issue_id
+        self.expected_version = expected_version
+        self.current = current  # The issue as it is now (dict)
+        super().__init__(
+            f"Issue {issue_id} is at version {current.get('Version')}, expected {expected_version}"
+        )
+
+
+class IssueNotFoundError(LookupError):
+    pass
+
+# Journal is folded into the snapshot once it grows past this many bytes
+COMPACT_MIN_BYTES = int(os.environ.get("HELPDESK_COMPACT_MIN_BYTES", 64 * 1024))
+COMPACT_INTERVAL = float(os.environ.get("HELPDESK_COMPACT_INTERVAL", 30))
+
+# ─── FILE LAYOUT ────────────────────────────────────────────────────────────────
+#
+#   issues.parquet     typed snapshot of the hot tier (utils/snapshot.py), rewritten only by the compactor
+#   issues.archive/    cold tier: resolved issues in monthly partitions (utils/archive.py)
+#   issues.archive.ids.db  archived issue IDs and their partition month
+#   issues.csv         import/export format; read as the snapshot only until the
+#                      first compaction has written issues.parquet
+#   issues.journal     one JSON record per line, appended by submit / resolve
+#   issues.lock        writers take it exclusive, readers shared
+#   issues.stats.json  materialized counts (utils/aggregates.py), updated with each write
+#   issues.rollups.db  daily analytics rollups (utils/analytics.py), updated with each write
+#   issues.triage.db   triage queue of open issues and their leases (utils/triage.py)
+#   issues.changes.db  change feed: every write with its sequence number (utils/changes.py)
+#   issues.owners.db   issue IDs by submitter email, for "My Issues" (utils/owners.py)
+#   issues.search.db   full-text index (utils/search.py), updated after each write
+#   issues.minhash.npz near-duplicate signatures (utils/similarity.py)
+#
+# Readers open the snapshot and the journal together under the shared lock and
+# replay the journal on top of the snapshot, so a compaction swapping both files
+# can never be observed half-way.
+
+def journal_path(path=ISSUES_CSV):
+    return os.path.splitext(path)[0] + ".journal"
+
+def _lock_path(path):
+    return os.path.splitext(path)[0] + ".lock"
+
+def _compact_lock_path(path):
+    return os.path.splitext(path)[0] + ".compact.lock"
+
+def stats_path(path=ISSUES_CSV):
+    return os.path.splitext(path)[0] + ".stats.json"
+
+# ─── NORMALIZATION ──────────────────────────────────────────────────────────────
+
+def normalize_issues(df):
+    """
+    - Renames old columns 'Issue' -> 'Title', 'TechLeadResponse' -> 'Response' if present.
+    - Fills missing final columns with empty strings and drops extras.
+    - Normalizes Email and ResolvedBy (trimmed, lower case) as the stores write them.
+    """
+    if "Issue" in df.columns and "Title" not in df.columns:
+        df = df.rename(columns={"Issue": "Title"})
+    if "TechLeadResponse" in df.columns and "Response" not in df.columns:
+        df = df.rename(columns={"TechLeadResponse": "Response"})
+
+    for c in ISSUE_COLUMNS:
+        if c not in df.columns:
+            df[c] = ""
+
+    df = df[ISSUE_COLUMNS]
+    for column in ("Email", "ResolvedBy"):
+        text = df[column].astype(str)
+        normalized = text.str.strip().str.lower()
+        if not normalized.equals(text):
+            df = df.assign(**{column: normalized})
+    return df
+
+def read_issues_csv(f):
+    """Issues from a CSV path or file of any vintage, normalized and typed. Empty cells stay ""."""
+    try:
+        df = pd.read_csv(f, dtype=str, keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame(columns=ISSUE_COLUMNS)
+    ROWS_READ.inc(len(df), source="csv")
+    with span("normalize"):
+        return typed_issues(normalize_issues(df))
+
+def _read_snapshot(f, columns=None):
+    """Typed frame from an open snapshot: issues.parquet, or issues.csv before the first compaction."""
+    if f is None:
+        df = typed_issues(pd.DataFrame(columns=ISSUE_COLUMNS))
+    elif f.name.endswith(".parquet"):
+        return read_snapshot(f, columns)
     else:
-        # Return an empty DataFrame with expected columns
-        return pd.DataFrame(columns=[
-            "ID", "Name", "Email", "College", "Title", "Description",
-            "Urgency", "Status", "Timestamp", "ResolvedBy", "Response"
-        ])
\ No newline at end of file
+        df = read_issues_csv(f)
+    return df if columns is None else df[columns]
+
+def _read_records(data):
+    """Parse journal bytes. A trailing line without newline is a write still in flight and is skipped."""
+    end = data.rfind(b"\n") + 1
+    return [json.loads(line) for line in data[:end].splitlines() if line.strip()], end
+
+def _replay(df, records):
+    """
+    Applies journal records on top of a snapshot frame.
+    Replay is idempotent: a submit whose ID is already present is ignored, and
+    updates just overwrite fields, so replaying a record twice is harmless.
+    """
+    new_rows = []
+    updates = {}
+    for rec in records:
+        if rec["op"] == "submit":
+            new_rows.append(rec["issue"])
+        elif rec["op"] == "update":
+            updates.setdefault(str(rec["ID"]), {}).update(rec["fields"])
+
+    if new_rows:
+        new = typed_issues(pd.DataFrame(new_rows, columns=ISSUE_COLUMNS)[list(df.columns)])
+        df = concat_typed(df, new)
+        df = df.drop_duplicates(subset="ID", keep="first").reset_index(drop=True)
+
+    if updates:
+        if not new_rows:
+            df = df.copy()  # Never write into the frame we were given; it may be a shared cached one
+        mask = df["ID"].isin(updates.keys())
+        ids = df.loc[mask, "ID"]
+        fields = {f for u in updates.values() for f in u if f in df.columns}
+        for field in fields:
+            new_values = ids.map(lambda i: updates[i].get(field))
+            keep = new_values.notna()
+            if keep.any():
+                values = coerce_values(field, new_values[keep].tolist())
+                align_categories(df, values, field)
+                df.loc[new_values[keep].index, field] = values.values
+
+    return df
+
+def _file_id(f):
+    st = os.fstat(f.fileno())
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+def _open_or_none(path):
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+# ─── READ PATH ──────────────────────────────────────────────────────────────────
+
+def _open_pair(path):
+    snap = _open_or_none(snapshot_path(path)) or _open_or_none(path)
+    return snap, _open_or_none(journal_path(path))
+
+def _read_pair(snap, jour, columns=None):
+    """Snapshot plus journal; `columns` (which must include ID) limits what is read from a Parquet snapshot."""
+    try:
+        df = _read_snapshot(snap, columns)
+        if jour is not None:
+            records, _ = _read_records(jour.read())
+            df = _replay(df, records)
+    finally:
+        for f in (snap, jour):
+            if f is not None:
+                f.close()
+    return df
+
+def load_and_normalize_issues(path=ISSUES_CSV):
+    """
+    - Reads the snapshot at `path` (if it exists) and replays its journal on top,
+      then adds the resolved issues archived under it (utils/archive.py).
+    - Ensures columns: ['ID','Name','Email','College','Title','Description',
+      'Urgency','Status','Timestamp','ResolvedBy','ResolvedAt','Response','Version']
+    """
+    with file_lock(_lock_path(path), shared=True):
+        snap, jour = _open_pair(path)
+    hot = _read_pair(snap, jour)
+    # Compaction writes the archive before it swaps the snapshot, so reading in
+    # this order can see an issue in both tiers but never in neither
+    cold = IssueArchive(archive_dir(path)).frame()
+    if cold is None:
+        return hot
+    return concat_typed(hot, cold).drop_duplicates(subset="ID", keep="first").reset_index(drop=True)
+
+def get_all_issues():
+    return load_and_normalize_issues(ISSUES_CSV)
+
+# ─── WRITE PATH ─────────────────────────────────────────────────────────────────
+
+def _write_record(path, record):
+    """Appends one journal line. Caller holds the exclusive lock."""
+    _write_records(path, [record])
+
+def _write_records(path, records):
+    """Appends journal lines in a single write. Caller holds the exclusive lock."""
+    data = b"".join((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in records)
+    fd = os.open(journal_path(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    BYTES_WRITTEN.inc(len(data), target="journal")
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def _submit_record(issue):
+    issue = {c: issue.get(c, "") for c in ISSUE_COLUMNS}
+    issue["ID"] = str(issue["ID"])
+    issue["Email"] = normalize_email(issue["Email"])
+    issue["ResolvedBy"] = normalize_email(issue["ResolvedBy"])
+    issue["Status"] = issue["Status"] or "Open"
+    issue["Version"] = 0
+    return {"op": "submit", "issue": issue}
+
+def _resolve_fields(resolved_by, response):
+    return {
+        "Status":     "Resolved",
+        "ResolvedBy": resolved_by,
+        "ResolvedAt": datetime.now().strftime(TIMESTAMP_FORMAT),
+        "Response":   response,
+    }
+
+def save_issue(issues_df, path=ISSUES_CSV):
+    # issues_df: pandas DataFrame with all issues; replaces snapshot and journal
+    with file_lock(_compact_lock_path(path)):
+        snap = snapshot_path(path)
+        tmp = snap + ".tmp"
+        write_snapshot(normalize_issues(issues_df), tmp)
+        with file_lock(_lock_path(path)):
+            os.replace(tmp, snap)
+            open(journal_path(path), "wb").close()
+            IssueArchive(archive_dir(path)).clear()  # Everything is hot again until the next compaction
+            if os.path.exists(stats_path(path)):
+                os.remove(stats_path(path))  # Recounted on next read
+            minhash = os.path.splitext(path)[0] + ".minhash.npz"
+            if os.path.exists(minhash):
+                os.remove(minhash)  # Rewritten outside the change log: rehashed on next use
+
+# ─── COMPACTION ─────────────────────────────────────────────────────────────────
+
+@timed("compact")
+def compact_journal(path=ISSUES_CSV, min_bytes=0, force=False):
+    """
+    Folds the journal into a new Parquet snapshot and moves Resolved issues to
+    the monthly archive. Returns True if a compaction happened.
+    - Runs once the journal passes min_bytes; with force=True, or while only
+      issues.csv exists (converting it to Parquet), it runs regardless.
+    The expensive part (replay, archiving, writing the new snapshot) runs
+    without blocking writers; only the final swap and the copy of records
+    appended meanwhile hold the exclusive lock.
+    """
+    compact_fd = try_file_lock(_compact_lock_path(path))
+    if compact_fd is None:
+        return False  # Another process is compacting
+    try:
+        jpath = journal_path(path)
+        snap_path = snapshot_path(path)
+        converting = not os.path.exists(snap_path) and os.path.exists(path)
+        if not (converting or force):
+            try:
+                if os.path.getsize(jpath) <= max(min_bytes, 0):
+                    return False
+            except FileNotFoundError:
+                return False
+
+        with file_lock(_lock_path(path), shared=True):
+            snap, jour = _open_pair(path)
+        try:
+            df = _read_snapshot(snap)
+            records, offset = _read_records(jour.read() if jour is not None else b"")
+        finally:
+            for f in (snap, jour):
+                if f is not None:
+                    f.close()
+        df = _replay(df, records)
+        resolved = (df["Status"] == "Resolved").to_numpy()
+        if offset == 0 and not converting and not resolved.any():
+            return False
+
+        archive = IssueArchive(archive_dir(path))
+        archived = set(df.loc[resolved, "ID"])
+        archive.add(df[resolved])  # Until the swap they are in both tiers; readers prefer the hot copy
+        tmp = snap_path + ".tmp"
+        write_snapshot(df[~resolved], tmp)
+
+        with file_lock(_lock_path(path)):
+            if os.path.exists(jpath):
+                with open(jpath, "rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                if archived:
+                    tail = _settle_archived(tail, archived, archive)
+                with open(jpath + ".tmp", "wb") as f:
+                    f.write(tail)
+                os.replace(jpath + ".tmp", jpath)
+            os.replace(tmp, snap_path)
+        return True
+    finally:
+        release_file_lock(compact_fd)
+
+def _settle_archived(tail, archived, archive):
+    """
+    Journal records written during a compaction may update issues it just
+    archived. Those updates are applied to the archive instead; an update that
+    reopens an issue becomes a submit of the whole issue, back in the hot tier.
+    Returns the journal tail to keep.
+    """
+    records, end = _read_records(tail)
+    kept, reopened = [], set()
+    for rec in records:
+        issue_id = str(rec.get("ID", ""))
+        if rec["op"] != "update" or issue_id not in archived or issue_id in reopened:
+            kept.append(rec)
+            continue
+        issue = {**archive.get(issue_id), **rec["fields"]}
+        if issue.get("Status") == "Resolved":
+            archive.replace(typed_issues(pd.DataFrame([plain_issue(issue)], columns=ISSUE_COLUMNS)))
+        else:
+            archive.remove([issue_id])
+            kept.append({"op": "submit", "issue": plain_issue(issue)})
+            reopened.add(issue_id)
+    lines = b"".join((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in kept)
+    return lines + tail[end:]
+
+_compactors = {}
+_compactors_lock = threading.Lock()
+
+def _compactor_loop(path, interval):
+    force = True  # First pass converts issues.csv and archives resolved issues left in the hot tier
+    while True:
+        try:
+            compact_journal(path, COMPACT_MIN_BYTES, force=force)
+            force = False
+        except Exception:  # Keep the thread alive; the next tick retries
+            log.exception("journal compaction failed for %s", path)
+        time.sleep(interval)
+
+def start_compactor(path=ISSUES_CSV, interval=COMPACT_INTERVAL):
+    """Starts (once per process) a daemon thread that periodically compacts the journal."""
+    with _compactors_lock:
+        if path in _compactors:
+            return
+        t = threading.Thread(target=_compactor_loop, args=(path, interval),
+                             name=f"compactor:{path}", daemon=True)
+        t.start()
+        _compactors[path] = t
+
+# ─── PLUGGABLE STORE ────────────────────────────────────────────────────────────
+#
+# The app talks to an IssueStore instead of reading files itself. Two backends:
+#   csv     FileStore: hot snapshot + journal, monthly archive, users.csv (small installs)
+#   sqlite  SqliteStore: one indexed SQLite database (see utils/sqlite_store.py)
+# Pick one with HELPDESK_BACKEND; HELPDESK_DB sets the SQLite path.
+
+URGENCY_LEVELS = ["Low", "Medium", "High"]
+URGENCY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+# sort key -> meaning
+SORT_ORDERS = {
+    "newest":  "Timestamp, newest first",
+    "oldest":  "Timestamp, oldest first",
+    "urgency": "High urgency first, then oldest",
+}
+
+class IssueStore:
+    """Interface shared by the storage backends. Frames use ISSUE_COLUMNS."""
+
+    def start_background(self):
+        """Starts backend maintenance threads, and the notification worker if SMTP is configured."""
+        if notifications_enabled():
+            start_worker(self.outbox)
+
+    def schema_version(self):
+        """Schema version the stored data carries (see utils/schema.py)."""
+        raise NotImplementedError
+
+    def migrate_schema(self):
+        """Rewrites stored data older than SCHEMA_VERSION. Returns the number of files or databases rewritten."""
+        raise NotImplementedError
+
+    def load_issues(self):
+        raise NotImplementedError
+
+    def add_issue(self, issue):
+        raise NotImplementedError
+
+    def add_issues(self, issues):
+        """
+        Inserts a batch in one write; IDs already stored, or repeated in the
+        batch, are skipped. Returns the number inserted.
+        """
+        return len(self.insert_issues(issues))
+
+    def insert_issues(self, issues):
+        """add_issues() that returns the IDs it inserted, in batch order."""
+        raise NotImplementedError
+
+    def iter_issues(self, chunk_size=10000):
+        """Every issue as typed frames of at most chunk_size rows (exports)."""
+        df = self.load_issues()
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size].reset_index(drop=True)
+
+    def iter_resolved(self, date_from=None, date_to=None, college=None, resolved_by=None, chunk_size=10000):
+        """
+        Resolved issues for reports (utils/reports.py), as typed frames of at
+        most chunk_size rows, oldest submitted first.
+        - date_from / date_to: inclusive `date` bounds on ResolvedAt
+        - college, resolved_by: exact match
+        """
+        for chunk in self.iter_issues(chunk_size):
+            chunk = _resolved_filter(chunk, date_from, date_to, college, resolved_by)
+            if len(chunk):
+                yield chunk.reset_index(drop=True)
+
+    def get(self, issue_id):
+        """Returns the issue as a dict, or None."""
+        raise NotImplementedError
+
+    def issues_by_email(self, email):
+        """
+        Issue dicts submitted from `email` (compared normalized), newest first,
+        for the intern's "My Issues" tab. Served by an index on Email, so it
+        costs the number of matches rather than the number of issues.
+        """
+        raise NotImplementedError
+
+    def query_issues(self, status=None, urgency=None, college=None, date_from=None,
+                     date_to=None, sort="oldest", limit=None, offset=0):
+        """
+        Filters, sorts and pages issues in the backend, before anything is rendered.
+        - urgency: list of levels to keep; college: exact match
+        - date_from / date_to: inclusive `date` bounds on Timestamp
+        - sort: one of SORT_ORDERS
+        Returns (page_df, total_matching).
+        """
+        raise NotImplementedError
+
+    def open_issues(self, limit=None, offset=0):
+        return self.query_issues(status="Open", limit=limit, offset=offset)[0]
+
+    def resolved_issues(self, limit=None, offset=0):
+        return self.query_issues(status="Resolved", limit=limit, offset=offset)[0]
+
+    def colleges(self):
+        """Distinct colleges, sorted, for filter widgets."""
+        return sorted(c for c in self.aggregates().by("College") if c)
+
+    def resolvers(self):
+        """Tech leads who resolved at least one issue, sorted, for filter widgets."""
+        return sorted(lead for lead in self.aggregates().by("ResolvedBy") if lead)
+
+    def update_issue(self, issue_id, expected_version, **fields):
+        """
+        Changes `fields` of one issue if it is still at `expected_version` (the
+        Version the caller read), and bumps its Version. Only that record is
+        written. Raises ConflictError if someone else changed the issue first,
+        IssueNotFoundError if the ID is unknown. Returns the updated issue dict.
+        """
+        raise NotImplementedError
+
+    def _notify(self, before, after, conn=None):
+        """
+        Queues the intern's email when an update resolves their issue (self.outbox,
+        utils/outbox.py). Called by the write itself, before it commits or
+        releases the issues lock; `conn` is the write's SQLite transaction.
+        """
+        if notifications_enabled() and after.get("Status") == "Resolved" and before.get("Status") != "Resolved":
+            recipient, subject, body = resolved_notification(after)
+            if recipient:
+                self.outbox.enqueue(recipient, subject, body, issue_id=after["ID"], conn=conn)
+
+    def resolve(self, issue_id, resolved_by, response, expected_version=None):
+        """
+        Marks an issue Resolved. Without expected_version the current version is
+        used (last writer wins). Returns the resolved issue typed like a load_issues() row.
+        """
+        if expected_version is None:
+            current = self.get(issue_id)
+            if current is None:
+                raise IssueNotFoundError(issue_id)
+            expected_version = current["Version"]
+        after = self.update_issue(issue_id, expected_version, **_resolve_fields(resolved_by, response))
+        return _typed_issue(after)
+
+    def aggregates(self):
+        """Materialized IssueAggregates, maintained by the write paths."""
+        raise NotImplementedError
+
+    def rebuild_aggregates(self):
+        """Recounts the aggregates from the issue data (recovery)."""
+        raise NotImplementedError
+
+    def _recount_leads(self):
+        """After a migration rewrote ResolvedBy: recounts what is keyed by it."""
+        self.rebuild_aggregates()
+        if self.rollups.is_built():
+            self.rebuild_rollups()
+
+    def daily_rollups(self):
+        """DailyRollups (utils/analytics.py), maintained by the write paths; built on first read."""
+        if not self.rollups.is_built():
+            self.rebuild_rollups()
+        return self.rollups
+
+    def rebuild_rollups(self):
+        """Recomputes the daily rollups from the issue data (first use, recovery)."""
+        raise NotImplementedError
+
+    def triage_queue(self):
+        """TriageQueue of open issues (utils/triage.py), maintained by the write paths; built on first use."""
+        if not self.triage.is_built():
+            self.rebuild_triage()
+        return self.triage
+
+    def rebuild_triage(self):
+        """Requeues every open issue, keeping current leases (first use, recovery)."""
+        raise NotImplementedError
+
+    def counts_by_status(self):
+        """Returns {status: count}."""
+        return self.aggregates().by("Status")
+
+    def resolved_counts_by_lead(self):
+        """Returns a frame with columns ResolvedBy, Count sorted by Count descending."""
+        counts = self.aggregates().by("ResolvedBy")
+        return (
+            pd.DataFrame({"ResolvedBy": list(counts), "Count": list(counts.values())})
+            .sort_values("Count", ascending=False)
+            .reset_index(drop=True)
+        )
+
+    @timed("search")
+    def search(self, text, limit=10, urgency=None, status=None, college=None):
+        """Top-k full-text matches from self.search_index (see utils/search.py)."""
+        if not self.search_index.is_built():
+            self.search_index.build(self.load_issues)  # First search: index what is already stored
+        return self.search_index.search(text, limit=limit, urgency=urgency, status=status, college=college)
+
+    @timed("similar")
+    def similar_issues(self, title, description, limit=3, threshold=DUPLICATE_THRESHOLD):
+        """
+        Existing issues (open or resolved) that look like a new submission, best
+        first, with a Similarity column. Uses self.duplicates (utils/similarity.py).
+        """
+        self.duplicates.refresh(self.changes, self.get, self.load_issues)
+        rows = []
+        for issue_id, score in self.duplicates.query(f"{title} {description}", limit, threshold):
+            issue = self.get(issue_id)
+            if issue is not None:
+                rows.append({**issue, "Similarity": score})
+        return pd.DataFrame(rows, columns=ISSUE_COLUMNS + ["Similarity"])
+
+    # Users live in self.accounts (utils/accounts.py), which the login page also opens on its own
+
+    def get_user(self, email):
+        """Returns {'email', 'password', 'role'} for a registered email, or None."""
+        return self.accounts.get_user(email)
+
+    def add_user(self, email, password, role):
+        """Returns False if the email is already registered."""
+        return self.accounts.add_user(email, password, role)
+
+    def add_users(self, users):
+        """Registers a batch of {'email', 'password', 'role'}; returns the number added."""
+        return self.accounts.add_users(users)
+
+    def iter_users(self, chunk_size=10000):
+        """Every user as lists of at most chunk_size {'email', 'password', 'role'} dicts."""
+        return self.accounts.iter_users(chunk_size)
+
+def _check_fields(fields):
+    """The fields an update may write, with Email and ResolvedBy normalized as they are stored. Raises ValueError on others."""
+    unknown = set(fields) - set(UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot update {sorted(unknown)}; updatable fields are {UPDATABLE_COLUMNS}")
+    return {**fields, **{c: normalize_email(fields[c]) for c in ("Email", "ResolvedBy") if c in fields}}
+
+def _typed_issue(issue):
+    """An issue dict with the column types of the typed frames (Timestamps, int Version)."""
+    row = typed_issues(pd.DataFrame([plain_issue(issue)], columns=ISSUE_COLUMNS)).iloc[0].to_dict()
+    row["Version"] = int(row["Version"])
+    return row
+
+def _filter(df, status=None, urgency=None, college=None, date_from=None, date_to=None):
+    mask = pd.Series(True, index=df.index)
+    if status:
+        mask &= df["Status"] == status
+    if urgency:
+        mask &= df["Urgency"].isin(urgency)
+    if college:
+        mask &= df["College"] == college
+    if date_from:
+        mask &= df["Timestamp"] >= pd.Timestamp(date_from)
+    if date_to:
+        mask &= df["Timestamp"] < pd.Timestamp(date_to + timedelta(days=1))
+    return df[mask]
+
+def _resolved_filter(df, date_from=None, date_to=None, college=None, resolved_by=None):
+    mask = df["Status"] == "Resolved"
+    if college:
+        mask &= df["College"] == college
+    if resolved_by:
+        mask &= df["ResolvedBy"] == normalize_email(resolved_by)
+    if date_from:
+        mask &= df["ResolvedAt"] >= pd.Timestamp(date_from)
+    if date_to:
+        mask &= df["ResolvedAt"] < pd.Timestamp(date_to + timedelta(days=1))
+    return df[mask]
+
+def _sort(df, sort):
+    if sort == "newest":
+        return df.sort_values(["Timestamp", "ID"], ascending=False, kind="stable")
+    if sort == "urgency":
+        rank = df["Urgency"].map(URGENCY_RANK).astype(float).fillna(len(URGENCY_RANK))
+        return df.assign(_rank=rank).sort_values(["_rank", "Timestamp", "ID"], kind="stable").drop(columns="_rank")
+    return df.sort_values(["Timestamp", "ID"], kind="stable")
+
+def _newest_first(issues):
+    """Issue dicts in "newest" order (Timestamp, then ID, descending; undated last)."""
+    def key(issue):
+        when = issue["Timestamp"]
+        return "" if pd.isna(when) else str(when), str(issue["ID"])
+    return sorted(issues, key=key, reverse=True)
+
+def _not_in(ids, known):
+    """Mask of `ids` (a Series) not in the set `known`; Arrow-backed isin boxes every value it is given."""
+    return ~ids.astype(object).isin(known).to_numpy()
+
+def _page(df, limit, offset):
+    df = df.reset_index(drop=True)
+    if limit is None:
+        return df.iloc[offset:].reset_index(drop=True)
+    return df.iloc[offset:offset + limit].reset_index(drop=True)
+
+class FileStore(IssueStore):
+    def __init__(self, issues_path=ISSUES_CSV, users_path=USERS_CSV, check_schema=True):
+        self.issues_path = issues_path
+        self.users_path = users_path
+        self.stats_path = stats_path(issues_path)
+        self._positions = None  # (frame, {ID: row position})
+        self._tail = None       # (snapshot id, journal inode, journal offset, frame)
+        self._ids = None        # (snapshot id, journal inode, journal offset, set of hot IDs)
+        self._tail_lock = threading.Lock()
+        self.search_index = SearchIndex(os.path.splitext(issues_path)[0] + ".search.db")
+        self.duplicates = DuplicateDetector(os.path.splitext(issues_path)[0] + ".minhash.npz")
+        self.archive = IssueArchive(archive_dir(issues_path))
+        self.outbox = Outbox(outbox_path(issues_path))
+        self.rollups = DailyRollups(os.path.splitext(issues_path)[0] + ".rollups.db")
+        self.triage = TriageQueue(os.path.splitext(issues_path)[0] + ".triage.db")
+        self.changes = ChangeLog(os.path.splitext(issues_path)[0] + ".changes.db")
+        self.accounts = FileAccounts(users_path, self.changes)
+        self.owners = OwnerIndex(os.path.splitext(issues_path)[0] + ".owners.db")
+        self._lock_path = _lock_path(issues_path)
+        self._cache_name = "issues:" + os.path.abspath(issues_path)
+        self._stats_cache_name = "stats:" + os.path.abspath(self.stats_path)
+        if check_schema:
+            self._open_schema()
+
+    def start_background(self):
+        super().start_background()
+        start_compactor(self.issues_path)
+
+    # Schema
+
+    def _open_schema(self):
+        """Converts a CSV-only install on first start; fails fast on any other version mismatch."""
+        if not os.path.exists(snapshot_path(self.issues_path)) and os.path.exists(self.issues_path):
+            compact_journal(self.issues_path, force=True)
+            if not os.path.exists(snapshot_path(self.issues_path)):
+                return  # Another process is converting it; reads use issues.csv meanwhile
+        for path, found in self._stamps():
+            if found != SCHEMA_VERSION:
+                raise SchemaVersionError(path, found)
+
+    def _stamps(self):
+        """[(path, schema version)] of the snapshot and archive partitions; issues.csv alone counts as 0."""
+        snap = snapshot_path(self.issues_path)
+        if not os.path.exists(snap):
+            return [(self.issues_path, 0)] if os.path.exists(self.issues_path) else []
+        return [(p, snapshot_version(p)) for p in [snap] + self.archive.paths()]
+
+    def schema_version(self):
+        """The first stamp differing from SCHEMA_VERSION, else SCHEMA_VERSION."""
+        return next((v for _, v in self._stamps() if v != SCHEMA_VERSION), SCHEMA_VERSION)
+
+    def migrate_schema(self):
+        """
+        Rewrites the snapshot and archive partitions at SCHEMA_VERSION (legacy
+        headers renamed, missing columns such as Version built, types applied),
+        or converts issues.csv if there is no snapshot yet.
+        """
+        def upgrade(df):
+            return typed_issues(normalize_issues(df))
+
+        snap = snapshot_path(self.issues_path)
+        with file_lock(_compact_lock_path(self.issues_path)), file_lock(self._lock_path):
+            n = 0
+            if os.path.exists(snap):
+                found = snapshot_version(snap)
+                if found > SCHEMA_VERSION:
+                    raise SchemaVersionError(snap, found)
+                if found < SCHEMA_VERSION:
+                    write_snapshot(upgrade(read_any_snapshot(snap)), snap + ".tmp")
+                    os.replace(snap + ".tmp", snap)
+                    n += 1
+            elif os.path.exists(self.issues_path):
+                write_snapshot(read_issues_csv(self.issues_path), snap + ".tmp")
+                os.replace(snap + ".tmp", snap)
+                n += 1
+            n += self.archive.migrate(upgrade)
+        issue_cache.invalidate(self._cache_name)
+        if n:
+            self._recount_leads()
+        return n
+
+    # Issues
+
+    def load_issues(self):
+        """
+        Every issue, hot and archived. For maintenance paths (index rebuilds,
+        exports); pages and lookups go through query_issues and get.
+        """
+        hot, cold = self._hot(), self.archive.frame()
+        if cold is None:
+            return hot
+        return concat_typed(hot, cold).drop_duplicates(subset="ID", keep="first").reset_index(drop=True)
+
+    def _hot(self, locked=False):
+        """
+        Hot tier (open and not yet archived issues), rebuilt once per change of the
+        snapshot or journal. Read-only. Pass locked=True when already holding the
+        exclusive issues lock.
+        """
+        key = self._fingerprint()
+        if not locked:
+            return issue_cache.get(self._cache_name, key, lambda: self._load_tail(False))
+        # Under the exclusive lock we must not wait for the cache's single-flight
+        # loader: it may itself be waiting for our lock
+        df = issue_cache.peek(self._cache_name, key)
+        if df is None:
+            df = self._load_tail(True)
+            issue_cache.put(self._cache_name, key, df)
+        return df
+
+    def _fingerprint(self):
+        return file_fingerprint(snapshot_path(self.issues_path), self.issues_path, journal_path(self.issues_path))
+
+    @timed("load")
+    def _load_tail(self, locked):
+        """
+        Cache loader. While the snapshot stays the same file, only the journal
+        bytes appended since the last load are parsed and replayed onto the
+        previous frame; the CSV is re-read only after a compaction or rewrite.
+        """
+        if locked:
+            snap, jour = _open_pair(self.issues_path)
+        else:
+            with file_lock(self._lock_path, shared=True):
+                snap, jour = _open_pair(self.issues_path)
+        try:
+            with self._tail_lock:
+                return self._replay_tail(snap, jour)
+        finally:
+            for f in (snap, jour):
+                if f is not None:
+                    f.close()
+
+    def _replay_tail(self, snap, jour):
+        snap_id = None if snap is None else _file_id(snap)
+        jour_id = None if jour is None else os.fstat(jour.fileno()).st_ino
+        tail = self._tail
+        if tail is not None and tail[:2] == (snap_id, jour_id):
+            prev, offset = tail[3], tail[2]
+            records, end = [], 0
+            if jour is not None:
+                jour.seek(offset)
+                records, end = _read_records(jour.read())
+                ROWS_READ.inc(len(records), source="journal")
+            df = _replay(prev, records) if records else prev
+            self._extend_positions(prev, df)
+        else:
+            df, offset, end = _read_snapshot(snap), 0, 0
+            ROWS_READ.inc(len(df), source="snapshot")
+            if jour is not None:
+                records, end = _read_records(jour.read())
+                ROWS_READ.inc(len(records), source="journal")
+                df = _replay(df, records)
+        self._tail = (snap_id, jour_id, offset + end, df)
+        return df
+
+    def _hot_ids(self):
+        """
+        IDs in the hot tier, for the duplicate check on insert; caller holds the
+        exclusive issues lock. Kept like the tail frame, but cheaper: a new
+        snapshot costs its ID column, and otherwise only journal bytes appended
+        since the last call are parsed. No frame is built.
+        """
+        snap, jour = _open_pair(self.issues_path)
+        try:
+            snap_id = None if snap is None else _file_id(snap)
+            jour_id = None if jour is None else os.fstat(jour.fileno()).st_ino
+            cached = self._ids
+            if cached is not None and cached[:2] == (snap_id, jour_id):
+                offset, ids = cached[2], cached[3]
+            else:
+                offset, ids = 0, set(_read_snapshot(snap, ["ID"])["ID"].astype(str).tolist())
+            if jour is not None:
+                jour.seek(offset)
+                records, end = _read_records(jour.read())
+                ids.update(str(rec["issue"]["ID"]) for rec in records if rec["op"] == "submit")
+                offset += end
+            self._ids = (snap_id, jour_id, offset, ids)
+            return ids
+        finally:
+            for f in (snap, jour):
+                if f is not None:
+                    f.close()
+
+    def _extend_positions(self, prev, df):
+        """
+        Carries the ID index over to a frame produced by replaying onto `prev`:
+        replay keeps existing rows in place and appends new IDs at the end.
+        """
+        cached = self._positions
+        if cached is None or cached[0] is not prev:
+            return
+        positions = cached[1]
+        for pos, issue_id in enumerate(df["ID"].iloc[len(prev):].astype(str), start=len(prev)):
+            positions[issue_id] = pos
+        self._positions = (df, positions)
+
+    def _row_positions(self, df):
+        """ID -> row position for a cached frame, built once per frame."""
+        cached = self._positions
+        if cached is not None and cached[0] is df:
+            return cached[1]
+        positions = dict(zip(df["ID"].astype(str), range(len(df))))
+        self._positions = (df, positions)
+        return positions
+
+    def _lookup(self, df, issue_id):
+        pos = self._row_positions(df).get(str(issue_id))
+        # The index may already know IDs appended after this frame was loaded
+        return None if pos is None or pos >= len(df) else df.iloc[pos].to_dict()
+
+    def add_issue(self, issue):
+        # Same existing-ID check as a batch, so a double submit is stored once
+        self.add_issues([issue])
+
+    @timed("write")
+    def insert_issues(self, issues):
+        records, seen = [], set()
+        for issue in issues:
+            record = _submit_record(issue)
+            if record["issue"]["ID"] not in seen:
+                seen.add(record["issue"]["ID"])
+                records.append(record)
+        if not records:
+            return []
+        with file_lock(self._lock_path):
+            known = self._hot_ids()
+            archived = self.archive.contains(i for i in seen if i not in known)
+            records = [r for r in records if r["issue"]["ID"] not in known and r["issue"]["ID"] not in archived]
+            if records:
+                _write_records(self.issues_path, records)
+                delta = {}
+                for record in records:
+                    for pair, n in update_delta({}, record["issue"]).items():
+                        delta[pair] = delta.get(pair, 0) + n
+                self._apply_aggregates(delta)
+                self.rollups.apply(analytics.batch_delta([r["issue"] for r in records]))
+                self.triage.apply([queue_delta({}, r["issue"]) for r in records])
+                self.changes.append([submit_change(r["issue"]) for r in records])
+                self.owners.apply([owner_entry(r["issue"]) for r in records])
+        issue_cache.invalidate(self._cache_name)
+        inserted = [r["issue"] for r in records]
+        self.search_index.add_many(inserted)
+        for issue in inserted:
+            self.duplicates.add(issue)
+        return [issue["ID"] for issue in inserted]
+
+    def iter_issues(self, chunk_size=10000):
+        """The hot tier, then the archive one month at a time."""
+        hot = self._hot()
+        for start in range(0, len(hot), chunk_size):
+            yield hot.iloc[start:start + chunk_size].reset_index(drop=True)
+        hot_ids = set(hot["ID"].tolist())
+        for month in self.archive.months():
+            part = self.archive.read(month)
+            part = part[_not_in(part["ID"], hot_ids)]  # In both tiers while a compaction swaps
+            for start in range(0, len(part), chunk_size):
+                yield part.iloc[start:start + chunk_size].reset_index(drop=True)
+
+    def iter_resolved(self, date_from=None, date_to=None, college=None, resolved_by=None, chunk_size=10000):
+        """
+        One month of Timestamp at a time, hot and archived rows merged, so the
+        report comes out in submission order. An issue resolved by date_to was
+        submitted by then, so later partitions are skipped; the rest are
+        filtered on RESOLVED_COLUMNS first, and full rows are read only from
+        months with matches (and filtered again there: cheaper than an isin).
+        """
+        filters = dict(date_from=date_from, date_to=date_to, college=college, resolved_by=resolved_by)
+        hot = self._hot()
+        hot_ids = set(hot["ID"].tolist())  # In both tiers while a compaction swaps
+        hot = _resolved_filter(hot, **filters)
+        hot_months = dict(tuple(hot.groupby(partition_keys(hot), sort=False))) if len(hot) else {}
+        archived = set(self.archive.months_in_range(None, date_to)) | ({UNDATED} & set(self.archive.months()))
+        for month in sorted(archived | set(hot_months), key=lambda m: (m == UNDATED, m)):
+            part = hot_months.get(month)
+            if month in archived and len(_resolved_filter(self.archive.read(month, RESOLVED_COLUMNS), **filters)):
+                rows = _resolved_filter(self.archive.read(month), **filters)
+                rows = rows[_not_in(rows["ID"], hot_ids)] if hot_ids else rows
+                part = rows if part is None else concat_typed(part, rows)
+            if part is None or not len(part):
+                continue
+            part = _sort(part, "oldest")
+            for start in range(0, len(part), chunk_size):
+                yield part.iloc[start:start + chunk_size].reset_index(drop=True)
+
+    def get(self, issue_id):
+        issue = self._lookup(self._hot(), issue_id)
+        return issue if issue is not None else self.archive.get(issue_id)
+
+    def issues_by_email(self, email):
+        """
+        Hot issues come from the cached tier by ID; archived ones from the
+        partitions the owner index names. No frame is scanned or built.
+        """
+        hot = self._hot()
+        issues, cold = [], {}
+        for issue_id, month in self.owner_index().lookup(email):
+            issue = self._lookup(hot, issue_id)
+            if issue is not None:
+                issues.append(issue)
+            else:
+                cold.setdefault(month, []).append(issue_id)
+        months = set(self.archive.months())
+        for month, ids in cold.items():
+            if month in months:
+                issues += self.archive.lookup(month, ids)
+        return _newest_first(issues)
+
+    @timed("filter")
+    def query_issues(self, status=None, urgency=None, college=None, date_from=None,
+                     date_to=None, sort="oldest", limit=None, offset=0):
+        filters = dict(status=status, urgency=urgency, college=college, date_from=date_from, date_to=date_to)
+        hot = _sort(_filter(self._hot(), **filters), sort)
+        if status == "Open":
+            return _page(hot, limit, offset), len(hot)  # Only resolved issues are archived
+
+        need = None if limit is None else offset + limit
+        cold, cold_total = self._query_archive(filters, sort, need)
+        if cold is None:
+            return _page(hot, limit, offset), len(hot)
+        top = hot if need is None else hot.head(need)
+        merged = concat_typed(top, cold).drop_duplicates(subset="ID", keep="first")
+        return _page(_sort(merged, sort), limit, offset), len(hot) + cold_total
+
+    def _query_archive(self, filters, sort, need):
+        """
+        (first `need` matching archived issues in `sort` order, total matching).
+        Counting reads only the index columns of the partitions in the date
+        range; full rows are read only from the months holding those issues.
+        For time sorts the months are walked in order and stop once `need`
+        rows are found.
+        """
+        months = self.archive.months_in_range(filters["date_from"], filters["date_to"])
+        if sort == "newest":
+            months = [m for m in reversed(months) if m != UNDATED] + [m for m in months if m == UNDATED]
+        candidates, total = [], 0
+        for month in months:
+            idx = _filter(self.archive.index(month), **filters)
+            if idx.empty:
+                continue
+            if need is None or sort == "urgency" or total < need:
+                candidates.append(idx.assign(_month=month))
+            total += len(idx)
+        if not candidates:
+            return None, total
+
+        picked = _sort(pd.concat(candidates, ignore_index=True), sort)
+        if need is not None:
+            picked = picked.head(need)
+        cold = None
+        for month, ids in picked.groupby("_month", sort=False)["ID"]:
+            rows = self.archive.rows(month, ids)
+            cold = rows if cold is None else concat_typed(cold, rows)
+        return cold, total
+
+    @timed("write")
+    def update_issue(self, issue_id, expected_version, **fields):
+        fields = _check_fields(fields)
+        with file_lock(self._lock_path):
+            # No writer can run while we hold the lock, so this frame is current
+            before = self._lookup(self._hot(locked=True), issue_id)
+            archived = before is None
+            if archived:
+                before = self.archive.get(issue_id)
+            if before is None:
+                raise IssueNotFoundError(issue_id)
+            if int(before["Version"]) != int(expected_version):
+                raise ConflictError(issue_id, expected_version, before)
+            fields = {**fields, "Version": int(before["Version"]) + 1}
+            after = {**before, **fields}
+            if not archived:
+                _write_record(self.issues_path, {"op": "update", "ID": str(issue_id), "fields": fields})
+            elif after["Status"] == "Resolved":
+                self.archive.replace(typed_issues(pd.DataFrame([plain_issue(after)], columns=ISSUE_COLUMNS)))
+            else:
+                # Reopened: back to the hot tier
+                _write_record(self.issues_path, {"op": "submit", "issue": plain_issue(after)})
+                self.archive.remove([issue_id])
+            self._apply_aggregates(update_delta(before, after))
+            self.rollups.apply(analytics.update_delta(before, after))
+            self.triage.apply([queue_delta(before, after)])
+            self.changes.append([update_change(issue_id, fields)])
+            self.owners.apply([owner_delta(before, after)])
+            self._notify(before, after)
+        issue_cache.invalidate(self._cache_name)
+        self.search_index.update(issue_id, fields)
+        return after
+
+    # Aggregates (issues.stats.json, updated under the issues lock)
+
+    def aggregates(self):
+        if not os.path.exists(self.stats_path):
+            return self.rebuild_aggregates()
+        return issue_cache.get(self._stats_cache_name, file_fingerprint(self.stats_path),
+                               lambda: IssueAggregates.load(self.stats_path))
+
+    def _apply_aggregates(self, delta):
+        """Caller holds the exclusive issues lock."""
+        if not os.path.exists(self.stats_path):
+            return  # Rebuilt from the data on next read, which includes this write
+        agg = IssueAggregates.load(self.stats_path)
+        agg.apply(delta)
+        agg.save(self.stats_path)
+
+    def rebuild_aggregates(self):
+        with file_lock(self._lock_path):
+            # Only the counted columns are read from the Parquet files
+            columns = ["ID"] + DIMENSIONS
+            frame = _read_pair(*_open_pair(self.issues_path), columns=columns)
+            cold = self.archive.frame(columns)
+            if cold is not None:
+                frame = pd.concat([frame, cold[~cold["ID"].isin(frame["ID"])]], ignore_index=True)
+            agg = IssueAggregates.from_frame(frame)
+            agg.save(self.stats_path)
+        issue_cache.invalidate(self._stats_cache_name)
+        return agg
+
+    def rebuild_rollups(self):
+        with file_lock(self._lock_path):
+            hot = self._hot(locked=True)
+            hot_ids = set(hot["ID"].tolist())
+            parts = [analytics.frame_contributions(hot)]
+            for month in self.archive.months():
+                part = self.archive.read(month, analytics.ROLLUP_COLUMNS)
+                parts.append(analytics.frame_contributions(part[_not_in(part["ID"], hot_ids)]))
+            self.rollups.replace(analytics.combine(parts))
+
+    def rebuild_triage(self):
+        with file_lock(self._lock_path):
+            # Only resolved issues are archived, so the hot tier holds every open one
+            self.triage.replace(frame_priorities(self._hot(locked=True)))
+
+    def owner_index(self):
+        """OwnerIndex of issue IDs by email (utils/owners.py), maintained by the write paths; built on first use."""
+        if not self.owners.is_built():
+            self.rebuild_owners()
+        return self.owners
+
+    def rebuild_owners(self):
+        with file_lock(self._lock_path):
+            hot = self._hot(locked=True)
+            hot_ids = set(hot["ID"].tolist())
+            entries = frame_owners(hot)
+            for month in self.archive.months():
+                part = self.archive.read(month, ["ID", "Email", "Timestamp"])
+                entries += frame_owners(part[_not_in(part["ID"], hot_ids)])
+            self.owners.replace(entries)
+
+_store = None
+_store_lock = threading.Lock()
+
+def create_store(backend=None, check_schema=True):
+    """
+    A new store for `backend` (default HELPDESK_BACKEND). Raises
+    SchemaVersionError if the stored data needs `python -m utils.schema migrate`,
+    unless check_schema=False (the migration command itself).
+    """
+    backend = backend or os.environ.get("HELPDESK_BACKEND", "csv")
+    if backend == "csv":
+        return FileStore(check_schema=check_schema)
+    if backend == "sqlite":
+        from utils.sqlite_store import SqliteStore
+        return SqliteStore(os.environ.get("HELPDESK_DB", "helpdesk.db"), check_schema=check_schema)
+    raise ValueError(f"Unknown HELPDESK_BACKEND: {backend!r} (expected 'csv' or 'sqlite')")
+
+def get_store():
+    """Process-wide store shared by every Streamlit session."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_store()
+            _store.start_background()
+        return _store
@@ -0,0 +1,296 @@
+"""
+Triage queue: hands open issues to tech leads, most urgent and oldest first.
+
+Every open issue has a priority, its virtual arrival time:
+
+    priority = submitted at - TRIAGE_BOOST_HOURS[urgency]
+
+so a High issue queues as if it had arrived 48 hours earlier than it did, a
+Medium one 12 hours earlier (HELPDESK_TRIAGE_BOOST_HOURS, "High=48,Medium=12,Low=0"
+by default). Urgent work goes first, and a Low issue that has waited longer
+than the boost still overtakes a fresh High one, so nothing starves. The
+priority never changes while an issue waits, so the queue is an SQLite table
+indexed on it: the B-tree does a heap's job (push, pop and remove in
+O(log n)) and is shared by every session and process. The CSV backend keeps
+it in issues.triage.db, SQLite in its own database (updated in the same
+transaction as each write).
+
+A lead claims the head of the queue with a lease of TRIAGE_LEASE_MINUTES,
+renewed each time their page runs. Leases a lead abandons (logged out, closed
+the tab) expire and the issue goes back to its place in the queue. Leads hold
+at most TRIAGE_MAX_LEASES issues, and fewer when there is not enough work for
+every lead seen in the last lease period, so the backlog is shared out
+instead of collected by whoever asks first.
+
+    PYTHONPATH=src python -m utils.triage status
+    PYTHONPATH=src python -m utils.triage next --limit 10
+    PYTHONPATH=src python -m utils.triage rebuild
+"""
+import argparse
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from utils.fields import field_datetime
+
+
+def _parse_hours(spec):
+    return {level.strip(): float(hours) for level, hours in (part.split("=") for part in spec.split(",") if part)}
+
+
+TRIAGE_BOOST_HOURS = _parse_hours(os.environ.get("HELPDESK_TRIAGE_BOOST_HOURS", "High=48,Medium=12,Low=0"))
+TRIAGE_LEASE_MINUTES = float(os.environ.get("HELPDESK_TRIAGE_LEASE_MINUTES", 30))
+TRIAGE_MAX_LEASES = int(os.environ.get("HELPDESK_TRIAGE_MAX_LEASES", 3))
+TRIAGE_CHECKIN_SECONDS = TRIAGE_LEASE_MINUTES * 60 / 2  # A lead's check-ins write at most this often
+
+EPOCH = datetime(1970, 1, 1)  # Timestamps are naive local times; priorities stay in that clock
+
+# Stored with the queue; priorities computed under other boosts are rebuilt
+LAYOUT = ",".join(f"{k}={v:g}" for k, v in sorted(TRIAGE_BOOST_HOURS.items()))
+
+TRIAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage (
+    issue_id    TEXT PRIMARY KEY,
+    priority    REAL NOT NULL,               -- virtual arrival, seconds; lowest is served first
+    lead        TEXT NOT NULL DEFAULT '',
+    lease_until REAL NOT NULL DEFAULT 0      -- time.time() the lease runs out; 0 when queued
+);
+CREATE INDEX IF NOT EXISTS idx_triage_priority ON triage (priority, issue_id);
+CREATE INDEX IF NOT EXISTS idx_triage_lead     ON triage (lead, lease_until);
+
+-- Leads that ran their page recently share out the queue
+CREATE TABLE IF NOT EXISTS triage_leads (
+    lead TEXT PRIMARY KEY,
+    seen REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS triage_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def priority(issue):
+    """Virtual arrival time of an issue dict, in seconds (no Timestamp: arrives now)."""
+    submitted = field_datetime(issue.get("Timestamp")) or datetime.now()
+    boost = TRIAGE_BOOST_HOURS.get(str(issue.get("Urgency", "")), 0.0)
+    return (submitted - EPOCH).total_seconds() - boost * 3600
+
+
+def frame_priorities(df):
+    """[(ID, priority)] for the Open rows of a typed issues frame (rebuilds)."""
+    df = df[(df["Status"] == "Open").to_numpy()]
+    submitted = pd.to_datetime(df["Timestamp"], errors="coerce").fillna(pd.Timestamp(datetime.now()))
+    boost = df["Urgency"].astype(object).map(TRIAGE_BOOST_HOURS).astype(float).fillna(0.0)
+    seconds = (submitted - pd.Timestamp(EPOCH)).dt.total_seconds() - boost * 3600
+    return list(zip(df["ID"].astype(str).tolist(), seconds.tolist()))
+
+
+def queue_delta(before, after):
+    """(ID, priority or None) an update makes to the queue: queued while Open, removed otherwise."""
+    if after.get("Status") != "Open":
+        return str(after["ID"]), None
+    if before.get("Status") == "Open" and before.get("Urgency") == after.get("Urgency"):
+        return None
+    return str(after["ID"]), priority(after)
+
+# ─── QUEUE TABLE ───────────────────────────────────────────────────────────────
+
+class TriageQueue:
+    """
+    The queue in SQLite: in a file of its own (`path`, CSV backend), or in the
+    store's database through its `connect` (SQLite backend), in which case
+    the store's writes pass their connection and update it in their
+    transaction. Until the queue is built, writes leave it alone; the first
+    read builds it from the open issues.
+    """
+
+    def __init__(self, path=None, connect=None):
+        self.path = path
+        self._connect = connect
+        self._local = threading.local()
+        self._checkins = {}  # lead -> time.time() of this process's last check-in write
+        self._checkins_lock = threading.Lock()
+        if connect is not None:
+            connect().executescript(TRIAGE_SCHEMA)
+
+    def connect(self):
+        if self._connect is not None:
+            return self._connect()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(TRIAGE_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def is_built(self, conn=None):
+        row = (conn or self.connect()).execute("SELECT value FROM triage_meta WHERE key = 'layout'").fetchone()
+        return row is not None and row[0] == LAYOUT
+
+    def _write(self, conn, fn):
+        if conn is not None:
+            return fn(conn)
+        conn = self.connect()
+        with conn:
+            return fn(conn)
+
+    def apply(self, changes, conn=None):
+        """
+        Applies (ID, priority) pairs from queue_delta: a priority queues the issue
+        (keeping any lease on it), None removes it. A no-op until the queue is built.
+        """
+        changes = [c for c in changes if c is not None]
+
+        def write(conn):
+            if not changes or not self.is_built(conn):
+                return
+            conn.executemany("DELETE FROM triage WHERE issue_id = ?", [(i,) for i, p in changes if p is None])
+            conn.executemany(
+                "INSERT INTO triage (issue_id, priority) VALUES (?, ?) "
+                "ON CONFLICT (issue_id) DO UPDATE SET priority = excluded.priority",
+                [(i, p) for i, p in changes if p is not None],
+            )
+        self._write(conn, write)
+
+    def replace(self, entries, conn=None):
+        """Replaces the queue with (ID, priority) pairs, keeping unexpired leases on issues still in it."""
+        def write(conn):
+            leases = conn.execute("SELECT issue_id, lead, lease_until FROM triage WHERE lease_until > ?",
+                                  (time.time(),)).fetchall()
+            conn.execute("DELETE FROM triage")
+            conn.executemany("INSERT OR REPLACE INTO triage (issue_id, priority) VALUES (?, ?)", entries)
+            conn.executemany("UPDATE triage SET lead = ?, lease_until = ? WHERE issue_id = ?",
+                             [(lead, until, issue_id) for issue_id, lead, until in leases])
+            conn.execute("INSERT OR REPLACE INTO triage_meta (key, value) VALUES ('layout', ?)", (LAYOUT,))
+        self._write(conn, write)
+
+    # Leases
+
+    def _share(self, conn, now):
+        """Most issues one lead may hold: TRIAGE_MAX_LEASES, or an even split of a short queue."""
+        active = conn.execute("SELECT COUNT(*) FROM triage_leads WHERE seen > ?",
+                              (now - TRIAGE_LEASE_MINUTES * 60,)).fetchone()[0]
+        active = max(1, active)
+        # Counting stops once there is enough work for everyone
+        queued = conn.execute("SELECT COUNT(*) FROM (SELECT 1 FROM triage LIMIT ?)",
+                              (active * TRIAGE_MAX_LEASES,)).fetchone()[0]
+        return max(1, min(TRIAGE_MAX_LEASES, math.ceil(queued / active)))
+
+    def checkin(self, lead):
+        """
+        Marks `lead` active and renews their leases. Returns the IDs they hold,
+        most urgent first. Pages call this on every run, so within
+        TRIAGE_CHECKIN_SECONDS of this process's last write for the lead it
+        only reads: a lease renewed then still has over half its time left.
+        """
+        now = time.time()
+        with self._checkins_lock:
+            fresh = now - self._checkins.get(lead, 0) < TRIAGE_CHECKIN_SECONDS
+            if not fresh:
+                self._checkins[lead] = now
+        if fresh:
+            return self.held(lead)
+        conn = self.connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO triage_leads (lead, seen) VALUES (?, ?)", (lead, now))
+            conn.execute("UPDATE triage SET lease_until = ? WHERE lead = ? AND lease_until > ?",
+                         (now + TRIAGE_LEASE_MINUTES * 60, lead, now))
+            rows = conn.execute("SELECT issue_id FROM triage WHERE lead = ? AND lease_until > ? ORDER BY priority",
+                                (lead, now)).fetchall()
+        return [r[0] for r in rows]
+
+    def held(self, lead):
+        """IDs `lead` holds an unexpired lease on, most urgent first (read only)."""
+        rows = self.connect().execute("SELECT issue_id FROM triage WHERE lead = ? AND lease_until > ? ORDER BY priority",
+                                      (lead, time.time())).fetchall()
+        return [r[0] for r in rows]
+
+    def claim(self, lead):
+        """
+        Leases the head of the queue (skipping issues leased to others) to `lead`.
+        Returns its ID, or None if the queue is empty or the lead already holds their share.
+        """
+        now = time.time()
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")  # Two leads asking at once never get the same issue
+            conn.execute("INSERT OR REPLACE INTO triage_leads (lead, seen) VALUES (?, ?)", (lead, now))
+            held = conn.execute("SELECT COUNT(*) FROM triage WHERE lead = ? AND lease_until > ?",
+                                (lead, now)).fetchone()[0]
+            if held >= self._share(conn, now):
+                return None
+            row = conn.execute(
+                "UPDATE triage SET lead = ?, lease_until = ? WHERE issue_id = ("
+                "  SELECT issue_id FROM triage WHERE lease_until <= ? ORDER BY priority, issue_id LIMIT 1"
+                ") RETURNING issue_id",
+                (lead, now + TRIAGE_LEASE_MINUTES * 60, now),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def release(self, issue_id, lead):
+        """Puts an issue `lead` holds back in the queue, at its original place."""
+        with self.connect() as conn:
+            conn.execute("UPDATE triage SET lead = '', lease_until = 0 WHERE issue_id = ? AND lead = ?",
+                         (str(issue_id), lead))
+
+    def leases(self):
+        """{issue ID: lead} for every unexpired lease."""
+        rows = self.connect().execute("SELECT issue_id, lead FROM triage WHERE lease_until > ?",
+                                      (time.time(),)).fetchall()
+        return dict(rows)
+
+    def status(self):
+        """{'queued', 'leased', 'active_leads'} counts."""
+        now = time.time()
+        conn = self.connect()
+        queued, leased = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(lease_until > ?), 0) FROM triage", (now,)).fetchone()
+        active = conn.execute("SELECT COUNT(*) FROM triage_leads WHERE seen > ?",
+                              (now - TRIAGE_LEASE_MINUTES * 60,)).fetchone()[0]
+        return {"queued": queued - leased, "leased": leased, "active_leads": active}
+
+    def head(self, limit=10):
+        """The next `limit` (ID, priority, lead) in queue order, leased ones included."""
+        return self.connect().execute(
+            "SELECT issue_id, priority, CASE WHEN lease_until > ? THEN lead ELSE '' END FROM triage "
+            "ORDER BY priority, issue_id LIMIT ?", (time.time(), limit)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the triage queue.")
+    parser.add_argument("--backend", default=None, help="csv or sqlite (default: HELPDESK_BACKEND)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="queued and leased issues, active leads")
+    p_next = sub.add_parser("next", help="the head of the queue")
+    p_next.add_argument("--limit", type=int, default=10)
+    sub.add_parser("rebuild", help="requeue every open issue from the issue data")
+    args = parser.parse_args(argv)
+
+    from utils.storage import create_store
+    store = create_store(args.backend)
+    if args.command == "rebuild":
+        store.rebuild_triage()
+        print("Rebuilt the triage queue")
+        return
+    queue = store.triage_queue()
+    if args.command == "status":
+        print(queue.status())
+        return
+    for issue_id, prio, lead in queue.head(args.limit):
+        issue = store.get(issue_id) or {}
+        arrival = (EPOCH + pd.Timedelta(seconds=prio)).strftime("%Y-%m-%d %H:%M")
+        print(f"{issue_id}  {issue.get('Urgency', ''):<7} queued as of {arrival}  "
+              f"{issue.get('Title', '')[:50]:<50}  {lead and 'leased to ' + lead}")
+
+
+if __name__ == "__main__":
+    main()
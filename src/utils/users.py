@@ -0,0 +1,143 @@
+import csv
+import io
+import os
+import threading
+
+from utils.filelock import file_lock
+from utils.metrics import BYTES_WRITTEN
+
+USER_COLUMNS = ["email", "password", "role"]
+ROLES = ["Developer Intern", "Tech Lead"]
+
+
+def normalize_email(email):
+    return str(email).strip().lower()
+
+
+def is_gmail(email):
+    """The sign-up rule: a Gmail address (surrounding whitespace ignored)."""
+    return str(email).strip().endswith("@gmail.com")
+
+
+class UserDirectory:
+    """
+    In-memory index of users.csv keyed by normalized email.
+    - Built once, then kept current by reading only the bytes appended since the
+      last look; the file is re-read in full only if it was replaced or truncated.
+    - Registration appends a single row under a file lock.
+    Login and duplicate checks are a dict lookup plus one os.stat.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock_path = os.path.splitext(path)[0] + ".lock"
+        self._users = {}
+        self._inode = None
+        self._offset = 0
+        self._header = None
+        self._lock = threading.Lock()
+
+    def _parse(self, text):
+        rows = csv.reader(io.StringIO(text))
+        if self._header is None:
+            header = next(rows, None)
+            if header is None:
+                return
+            self._header = [c.strip() for c in header]
+        for row in rows:
+            if not row:
+                continue
+            rec = dict(zip(self._header, row))
+            email = rec.get("email", "")
+            self._users[normalize_email(email)] = {
+                "email":    email.strip(),
+                "password": str(rec.get("password", "")).strip(),
+                "role":     rec.get("role", ""),
+            }
+
+    def _refresh(self):
+        """Caller holds self._lock. Cheap when the file is unchanged: a single stat."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._users, self._inode, self._offset, self._header = {}, None, 0, None
+            return
+        if st.st_ino == self._inode and st.st_size == self._offset:
+            return
+        with file_lock(self._lock_path, shared=True):
+            self._read_new_rows()
+
+    def _read_new_rows(self):
+        """Caller holds the file lock, so no append is half-written."""
+        st = os.stat(self.path)
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._users, self._offset, self._header = {}, 0, None
+            self._inode = st.st_ino
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        self._parse(data.decode("utf-8"))
+        self._offset += len(data)
+
+    def get(self, email):
+        with self._lock:
+            self._refresh()
+            return self._users.get(normalize_email(email))
+
+    def __contains__(self, email):
+        return self.get(email) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def users(self):
+        """Every registered user as {'email', 'password', 'role'}, in file order."""
+        with self._lock:
+            self._refresh()
+            return list(self._users.values())
+
+    def add(self, email, password, role):
+        """Appends one row. Returns False if the email is already registered."""
+        return self.add_many([{"email": email, "password": password, "role": role}]) == 1
+
+    def add_many(self, users):
+        """
+        Appends a batch of {'email', 'password', 'role'} rows in one write under
+        one lock. Emails already registered, or repeated in the batch, are
+        skipped. Returns the number added.
+        """
+        with self._lock, file_lock(self._lock_path):
+            if os.path.exists(self.path):
+                self._read_new_rows()
+            rows, seen = [], set()
+            for user in users:
+                key = normalize_email(user["email"])
+                if key in self._users or key in seen:
+                    continue  # Already registered
+                seen.add(key)
+                rows.append([str(user["email"]).strip(), str(user["password"]).strip(), user["role"]])
+            if not rows:
+                return 0
+
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator="\n")
+            needs_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            if needs_header:
+                writer.writerow(USER_COLUMNS)
+            elif not self._ends_with_newline():
+                buf.write("\n")
+            writer.writerows(rows)
+            data = buf.getvalue()
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                f.write(data)
+            BYTES_WRITTEN.inc(len(data.encode("utf-8")), target="users")
+
+            self._read_new_rows()
+            return len(rows)
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
@@ -0,0 +1,182 @@
+"""
+Chrome shared by every page: theme, header, rerun helpers, sidebar and the
+stats footer. The login page imports it too, so nothing here imports pandas,
+Altair or the issue store at module level.
+"""
+import streamlit as st
+
+from utils import metrics
+from utils.schema import SchemaVersionError
+
+# ─── CUSTOM DARK MODE STYLES (RED / ORANGE THEME) ───────────────────────────────
+
+THEME_CSS = """
+    <style>
+    body, .main, .stApp {
+        background-color: #1f0b0b !important;  /* Very dark red/brown */
+    }
+    .stApp {
+        font-family: 'Segoe UI', 'Roboto', sans-serif;
+        color: #ffece0 !important;             /* Light cream text */
+    }
+    .resolve-header {
+        background: linear-gradient(90deg, #660000 0%, #990000 100%);  /* Dark red gradient */
+        border-radius: 18px;
+        padding: 2.5rem 1rem 2rem 1rem;
+        margin-bottom: 2.5rem;
+        box-shadow: 0 6px 32px 0 rgba(20, 10, 10, 0.5);
+    }
+    .resolve-header h1 {
+        color: #fff1e0;                       /* Soft cream */
+        font-size: 3.2rem;
+        font-family: 'Segoe UI', 'Roboto', sans-serif;
+        letter-spacing: 2px;
+        text-align: center;
+        margin-bottom: 0.5rem;
+    }
+    .resolve-header p {
+        color: #ffd1a4;                       /* Pale orange */
+        font-size: 1.25rem;
+        text-align: center;
+        margin-top: 0;
+    }
+    .stButton>button, .stFormSubmitButton>button {
+        background: linear-gradient(90deg, #ff4500 0%, #cc3300 100%) !important;  /* Bright orange to dark red */
+        color: #ffffff !important;
+        border-radius: 8px !important;
+        font-weight: 600 !important;
+        padding: 0.5rem 1.5rem !important;
+        border: none !important;
+        transition: background 0.2s;
+        box-shadow: 0 2px 8px 0 rgba(44, 10, 10, 0.5);
+    }
+    .stButton>button:hover, .stFormSubmitButton>button:hover {
+        background: #cc3300 !important;       /* Darker red on hover */
+        color: #ffffff !important;
+    }
+    .stTextInput>div>div>input, .stTextArea>div>textarea {
+        background-color: #2b1a1a !important; /* Dark maroon */
+        color: #ffece0 !important;
+        border-radius: 6px !important;
+        border: 1.5px solid #cc3300 !important;  /* Dark red border */
+    }
+    .stTabs [data-baseweb="tab-list"] {
+        background: #2e1d1d;
+        border-radius: 8px 8px 0 0;
+    }
+    .stTabs [data-baseweb="tab"] {
+        font-weight: 600;
+        color: #ffd1a4;                       /* Pale orange text */
+    }
+    .stTabs [aria-selected="true"] {
+        background: #cc3300 !important;       /* Dark red selected tab */
+        color: #ffffff !important;
+        border-radius: 8px 8px 0 0;
+    }
+    .stAlert {
+        border-radius: 8px !important;
+        background: #2b1a1a !important;       /* Dark maroon */
+        color: #ffece0 !important;
+    }
+    .stDataFrame {
+        background: #2e1d1d !important;       /* Very dark maroon */
+        border-radius: 10px !important;
+        color: #ffece0 !important;
+    }
+    .resolve-card {
+        background: #2b1a1a;
+        border-radius: 14px;
+        box-shadow: 0 2px 12px 0 rgba(44, 10, 10, 0.5);
+        padding: 2rem 2rem 1.5rem 2rem;
+        margin-bottom: 2rem;
+        color: #ffece0;
+    }
+    .resolve-card h3 {
+        color: #ffb380;                       /* Soft peach */
+    }
+    .resolve-card p {
+        color: #ffd1a4;                       /* Pale orange */
+    }
+    .resolve-success {
+        background: #442222;                  /* Dark burgundy */
+        border-radius: 12px;
+        padding: 2rem 2rem 1.5rem 2rem;
+        text-align: center;
+        margin-bottom: 2rem;
+        border: 1.5px solid #ff4500;           /* Bright orange border */
+        color: #ffece0;
+    }
+    .resolve-success span {
+        color: #ffb380;                       /* Soft peach */
+    }
+    </style>
+"""
+
+HEADER_HTML = """
+    <div class="resolve-header">
+        <h1>ResolveHub</h1>
+        <p>Your friendly help desk for developer interns and tech leads.<br>
+        <span style="font-size:1.5rem;">🤝</span></p>
+    </div>
+"""
+
+def apply_theme():
+    """Streamlit rebuilds the page on every run, so the styles and header are sent each time."""
+    st.markdown(THEME_CSS, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+# ─── FUNCTION TO HANDLE RERUN COMPATIBILITY ─────────────────────────────────────
+
+def safe_rerun():
+    """Handle rerun compatibility across Streamlit versions"""
+    try:
+        st.rerun()
+    except AttributeError:
+        try:
+            st.experimental_rerun()
+        except AttributeError:
+            # If neither works, we'll just refresh the page state
+            st.session_state._rerun_requested = True
+
+# ─── STORAGE ────────────────────────────────────────────────────────────────────
+
+def open_store():
+    """The process-wide issue store (HELPDESK_BACKEND: csv | sqlite); stops the page if its schema is stale."""
+    from utils.storage import get_store  # Imported on first use: the login page never loads pandas
+    try:
+        return get_store()
+    except SchemaVersionError as exc:
+        st.error(f"⚠️ {exc}")
+        st.stop()
+
+# ─── AFTER LOGIN: SIDEBAR & LOGOUT ───────────────────────────────────────────────
+
+def sidebar():
+    st.sidebar.markdown("---")
+    st.sidebar.write(f"Logged in as: {st.session_state.user} ({st.session_state.role})")
+    if st.sidebar.button("Logout"):
+        st.session_state.logged_in = False
+        st.session_state.role = None
+        st.session_state.user = None
+        st.session_state.issue_submitted = False  # Reset form state if present
+        safe_rerun()
+    st.sidebar.markdown("---")
+
+# ─── GLOBAL STATS (BOTTOM) ─────────────────────────────────────────────────────
+
+def show_stats(store):
+    with metrics.span("render.stats"):
+        st.header("📊 Issue Tracker Stats")
+        counts = store.counts_by_status()
+
+        if sum(counts.values()):
+            total_issues    = sum(counts.values())
+            resolved_issues = counts.get("Resolved", 0)
+            open_issues     = counts.get("Open", 0)
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("📌 Total Issues", total_issues)
+            col2.metric("✅ Resolved Issues", resolved_issues)
+            col3.metric("🕒 Open Issues", open_issues)
+        else:
+            st.warning("No data available yet.")
@@ -0,0 +1,104 @@
+"""
+Developer Intern page: raise an issue (with the possible-duplicates check)
+and follow your own under My Issues.
+"""
+import streamlit as st
+
+from components.developer_form import DeveloperForm
+from utils import metrics
+from views.common import safe_rerun
+
+
+def render(store):
+    tab_new, tab_mine = st.tabs(["🚀 Raise an Issue", "📋 My Issues"])
+
+    with tab_new:
+        raise_issue(store)
+
+    with tab_mine, metrics.span("render.my_issues"):
+        my_issues(store)
+
+# ─── RAISE AN ISSUE ─────────────────────────────────────────────────────────────
+
+def raise_issue(store):
+    st.markdown(
+        "<div class='resolve-card'>"
+        "<h3 style='color:#ffece0;margin-bottom:0.5rem;'>Raise a New Issue 🚀</h3>"
+        "<div style='color:#ffd1a4;font-size:1.1rem;'>Fill out the form below and our tech leads will help you soon!</div>"
+        "</div>",
+        unsafe_allow_html=True
+    )
+
+    if "issue_submitted" not in st.session_state:
+        st.session_state.issue_submitted = False
+
+    if "pending_issue" not in st.session_state:
+        st.session_state.pending_issue = None
+
+    if st.session_state.pending_issue is not None:
+        # ─── Possible duplicates: shown before the new issue is saved ──────────
+        pending = st.session_state.pending_issue
+        st.warning("These existing issues look similar to yours. Maybe one of them already has your answer?")
+        for similar in st.session_state.pending_similar:
+            with st.expander(f"{similar['Title']} · {similar['Status']} ({similar['Similarity']:.0%} similar)", expanded=True):
+                st.markdown(f"**Description:** {similar['Description']}")
+                st.markdown(f"**Response:** {similar['Response'] or 'No response yet'}")
+
+        col_submit, col_cancel = st.columns(2)
+        if col_submit.button("Submit my issue anyway"):
+            store.add_issue(pending)
+            st.session_state.pending_issue = None
+            st.session_state.issue_submitted = True
+            safe_rerun()
+        if col_cancel.button("Discard, my question is answered"):
+            st.session_state.pending_issue = None
+            safe_rerun()
+
+    elif not st.session_state.issue_submitted:
+        issue = DeveloperForm(st.session_state.user).display_form()
+        if issue is not None:
+            new_issue = issue.to_record()
+            similar = store.similar_issues(issue.title, issue.description)
+            if similar.empty:
+                store.add_issue(new_issue)
+                st.session_state.issue_submitted = True
+            else:
+                st.session_state.pending_issue = new_issue
+                st.session_state.pending_similar = similar.fillna("").to_dict("records")
+            safe_rerun()
+    else:
+        st.markdown(
+            "<div class='resolve-success'>"
+            "<span style='font-size:2.5rem;'>🎉</span><br>"
+            "<span style='color:#ffb380;font-size:1.3rem;font-weight:600;'>Issue submitted successfully!</span><br>"
+            "<span style='color:#ffd1a4;'>Our tech leads will get back to you soon. Follow it under 📋 My Issues.</span>"
+            "</div>",
+            unsafe_allow_html=True
+        )
+        st.write("")
+        if st.button("Any more queries?"):
+            st.session_state.issue_submitted = False
+            safe_rerun()
+
+# ─── MY ISSUES ──────────────────────────────────────────────────────────────────
+
+def my_issues(store):
+    st.subheader("📋 My Issues")
+    mine = store.issues_by_email(st.session_state.user)
+
+    if not mine:
+        st.info("You have not raised any issues yet.")
+        return
+    still_open = sum(row["Status"] == "Open" for row in mine)
+    st.caption(f"{len(mine)} issue(s), {still_open} still open. Newest first.")
+    for row in mine:
+        resolved = row["Status"] == "Resolved"
+        with st.expander(f"{'✅' if resolved else '🕒'} {row['Title']} · {row['Status']}", expanded=False):
+            st.markdown(f"**Description:** {row['Description']}")
+            st.markdown(f"**Urgency:** {row['Urgency']}")
+            st.markdown(f"**Timestamp:** {row['Timestamp']}")
+            if resolved:
+                st.markdown(f"**Resolved By:** {row['ResolvedBy']}")
+                st.markdown(f"**Response:** {row['Response'] or 'No response'}")
+            else:
+                st.markdown("**Response:** Waiting for a tech lead.")
@@ -0,0 +1,57 @@
+"""
+Login / register page. It runs on every cold start, so it reads users only,
+through utils/accounts.py: no issue store, pandas or Altair.
+"""
+import streamlit as st
+
+from utils.accounts import get_accounts
+from utils.users import ROLES, is_gmail
+from views.common import safe_rerun
+
+
+def render():
+    accounts = get_accounts()
+    auth_mode = st.radio("Choose an option", ["Login", "Register"], horizontal=True)
+
+    if auth_mode == "Register":
+        st.subheader("📝 Register for ResolveHub")
+        with st.form("register_form", clear_on_submit=True):
+            reg_email = st.text_input("Email", key="reg_email")
+            reg_password = st.text_input("Password", type="password", key="reg_password")
+            reg_role = st.selectbox("Register as", ROLES, key="reg_role")
+            reg_submit = st.form_submit_button("Register")
+
+        if reg_submit:
+            if reg_email and reg_password and reg_role:
+                if not is_gmail(reg_email):
+                    st.warning("Please enter a valid Gmail address ending with @gmail.com.")
+                else:
+                    success = accounts.add_user(reg_email, reg_password, reg_role)
+                    if success:
+                        st.success("✅ Registered successfully! You can now switch to Login.")
+                    else:
+                        st.error("⚠️ Email already registered.")
+            else:
+                st.warning("Please fill in all fields.")
+
+    else:  # Login path
+        st.subheader("🔐 Login to ResolveHub")
+        with st.form("login_form", clear_on_submit=True):
+            username = st.text_input("Email", key="login_email")
+            password = st.text_input("Password", type="password", key="login_password")
+            login_submit = st.form_submit_button("Login")
+
+        if login_submit:
+            username_clean = username.strip()
+            password_clean = password.strip()
+            if not is_gmail(username_clean):
+                st.warning("Please enter a valid Gmail address ending with @gmail.com.")
+            else:
+                user = accounts.get_user(username_clean)
+                if user is not None and user["password"] == password_clean:
+                    st.session_state.logged_in = True
+                    st.session_state.role = user["role"]
+                    st.session_state.user = username_clean
+                    safe_rerun()
+                else:
+                    st.error("Invalid email or password.")
@@ -0,0 +1,382 @@
+"""
+Tech Lead panel: live feed, filters and search, the triage queue, open and
+resolved issues, and the analytics charts. Only this page imports Altair.
+"""
+import os
+
+import altair as alt
+import streamlit as st
+
+from utils import analytics, metrics, reports
+from utils.storage import ConflictError, IssueNotFoundError, URGENCY_LEVELS
+from utils.triage import TRIAGE_LEASE_MINUTES
+from views.common import safe_rerun
+
+PAGE_SIZES = [10, 20, 50, 100]
+DEFAULT_PAGE_SIZE = int(os.environ.get("HELPDESK_PAGE_SIZE", 20))
+
+SEARCH_TOP_K = 10
+
+# Live feed of new issues on the Tech Lead panel, polled from the change feed
+FEED_REFRESH_SECONDS = float(os.environ.get("HELPDESK_FEED_REFRESH", 10))
+FEED_SIZE = 10
+FEED_APPLY_LIMIT = 500  # Further behind than this, the feed starts over instead of replaying
+FEED_FIELDS = ["Title", "Name", "College", "Urgency", "Status", "ResolvedBy"]
+
+# Dimension shown in the resolution-time breakdown -> rollup dimension
+BREAKDOWN_LABELS = {
+    "Urgency":   "Urgency",
+    "College":   "College",
+    "Tech Lead": "ResolvedBy",
+}
+
+SORT_LABELS = {
+    "Oldest first":        "oldest",
+    "Newest first":        "newest",
+    "Urgency (High first)": "urgency",
+}
+
+REPORT_FORMATS = {
+    "CSV":        "csv",
+    "JSON Lines": "jsonl",
+    "Excel":      "xlsx",
+}
+
+# ─── PAGINATION HELPERS ─────────────────────────────────────────────────────────
+
+def fetch_page(store, key, page_size, **query):
+    """Returns (rows, total) for the page picked by the pager under `key`, clamped to the last page."""
+    page = st.session_state.get(key, 1)
+    rows, total = store.query_issues(limit=page_size, offset=(page - 1) * page_size, **query)
+    last_page = max(1, -(-total // page_size))
+    if page > last_page:
+        st.session_state[key] = page = last_page
+        rows, total = store.query_issues(limit=page_size, offset=(page - 1) * page_size, **query)
+    return rows, total
+
+def page_controls(key, total, page_size):
+    """Caption plus page picker; render after the rows fetched with fetch_page(key, ...)."""
+    last_page = max(1, -(-total // page_size))
+    page = st.session_state.get(key, 1)
+    first = (page - 1) * page_size
+    st.caption(f"Showing {first + 1}–{min(first + page_size, total)} of {total}")
+    if last_page > 1:
+        st.number_input(f"Page (of {last_page})", min_value=1, max_value=last_page, step=1, key=key)
+
+# ─── RESOLVE HELPER ─────────────────────────────────────────────────────────────
+
+def resolve_issue(store, row, resolved_by, response_text):
+    """Resolves `row` if nobody changed it since it was rendered; reruns on success."""
+    try:
+        store.resolve(row["ID"], resolved_by, response_text, expected_version=row["Version"])
+    except ConflictError as e:
+        by = e.current.get("ResolvedBy") or "another tech lead"
+        st.error(f"This issue was already updated by {by}. Refresh to see the latest version.")
+    except IssueNotFoundError:
+        st.error("This issue no longer exists.")
+    else:
+        st.success(f"Issue marked as resolved by {resolved_by}")
+        safe_rerun()
+
+# ─── LIVE FEED ──────────────────────────────────────────────────────────────────
+
+def apply_change(items, change):
+    """Folds one change-feed entry into the feed's {ID: summary}."""
+    data = change["data"]
+    if change["op"] == "submit" and data.get("Status") == "Open":
+        items[change["key"]] = {**{f: data.get(f, "") for f in FEED_FIELDS}, "seq": change["seq"]}
+    elif change["op"] == "update" and change["key"] in items:
+        items[change["key"]].update({f: v for f, v in data.items() if f in FEED_FIELDS})
+
+@st.fragment(run_every=FEED_REFRESH_SECONDS)
+def live_feed(store):
+    """
+    Issues submitted since this session opened the panel. Each run reads the
+    feed's latest sequence number and applies only newer changes to the copy
+    in session state; with no new writes, that one lookup is all it costs.
+    Issues newer than the lists on the page (lists_seq) are marked 🆕.
+    """
+    state = st.session_state
+    with metrics.span("render.feed"):
+        latest = store.changes.latest()
+        if "feed_seq" not in state:
+            state.feed_seq, state.feed_items = latest, {}
+        if latest > state.feed_seq:
+            changes, complete = store.changes.since(state.feed_seq, FEED_APPLY_LIMIT)
+            if complete and len(changes) < FEED_APPLY_LIMIT:
+                for change in changes:
+                    apply_change(state.feed_items, change)
+            state.feed_seq = latest
+            newest = sorted(state.feed_items.items(), key=lambda kv: kv[1]["seq"])[-FEED_SIZE:]
+            state.feed_items = dict(newest)
+
+        items = state.feed_items
+        if not items:
+            st.caption("📡 New issues will appear here as they are submitted.")
+            return
+        fresh = [i for i, item in items.items() if item["seq"] > state.get("lists_seq", 0)]
+        st.markdown(f"**📡 {len(items)} new issue(s) since you opened the panel**")
+        for issue_id, item in reversed(list(items.items())):
+            mark = "🆕 " if issue_id in fresh else ""
+            status = f" · ✅ resolved by {item['ResolvedBy']}" if item["Status"] == "Resolved" else ""
+            st.markdown(f"{mark}**{item['Urgency']}** · {item['Title']} "
+                        f"(by {item['Name']}, {item['College']}){status}")
+        if fresh and st.button(f"🔄 Show {len(fresh)} new in the lists", key="feed_reload"):
+            safe_rerun()
+
+# ─── TECH LEAD SECTION ───────────────────────────────────────────────────────────
+
+def render(store):
+    st.markdown(
+        "<div class='resolve-card'>"
+        "<h3 style='color:#ffece0;margin-bottom:0.5rem;'>🛠️ Tech Lead Panel</h3>"
+        "<div style='color:#ffd1a4;font-size:1.1rem;'>View, respond, and resolve issues raised by developer interns.</div>"
+        "</div>",
+        unsafe_allow_html=True
+    )
+    me = st.session_state.user  # The login identity: leases and ResolvedBy both use it
+    st.caption(f"Resolving as {me}")
+
+    # Everything up to this sequence number is in the lists rendered below
+    st.session_state.lists_seq = store.changes.latest()
+    live_feed(store)
+
+    counts = store.counts_by_status()
+
+    if not sum(counts.values()):
+        st.info("No issues have been reported yet.")
+        return
+
+    # ─── Filters (applied by the store before any widgets are built) ────
+    f1, f2, f3 = st.columns(3)
+    urgency_filter = f1.multiselect("Urgency", URGENCY_LEVELS, key="flt_urgency")
+    college_filter = f2.selectbox("College", ["All"] + store.colleges(), key="flt_college")
+    sort_label     = f3.selectbox("Sort by", list(SORT_LABELS), key="flt_sort")
+    f4, f5 = st.columns([2, 1])
+    date_range     = f4.date_input("Submitted between", value=(), key="flt_dates")
+    page_size      = f5.selectbox(
+        "Issues per page", PAGE_SIZES,
+        index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE) if DEFAULT_PAGE_SIZE in PAGE_SIZES else 1,
+        key="flt_page_size"
+    )
+
+    filters = {
+        "urgency":   urgency_filter or None,
+        "college":   None if college_filter == "All" else college_filter,
+        "date_from": date_range[0] if len(date_range) > 0 else None,
+        "date_to":   date_range[1] if len(date_range) > 1 else None,
+        "sort":      SORT_LABELS[sort_label],
+    }
+
+    # ─── Full-text Search ──────────────────────────────────────────────
+    s1, s2 = st.columns([3, 1])
+    search_text   = s1.text_input("🔎 Search titles, descriptions and responses", key="tl_search")
+    search_status = s2.selectbox("Status", ["Any", "Open", "Resolved"], key="tl_search_status")
+
+    if search_text.strip():
+        with metrics.span("render.search"):
+            results = store.search(
+                search_text,
+                limit=SEARCH_TOP_K,
+                urgency=filters["urgency"],
+                college=filters["college"],
+                status=None if search_status == "Any" else search_status,
+            )
+            st.caption(f"Top {len(results)} matches for “{search_text.strip()}”")
+            if results.empty:
+                st.info("No matching issues.")
+            for _, row in results.iterrows():
+                with st.expander(f"{row['Title']} (by {row['Name']}) · {row['Status']}", expanded=False):
+                    st.markdown(f"**Description:** {row['Description']}")
+                    st.markdown(f"**College:** {row['College']}")
+                    st.markdown(f"**Urgency:** {row['Urgency']}")
+                    st.markdown(f"**Response:** {row['Response'] or 'No response yet'}")
+
+    queue = store.triage_queue()
+
+    tab0, tab1, tab2 = st.tabs(["🎯 Next for Me", "🕒 Open Issues", "✅ Resolved Issues"])
+
+    with tab0, metrics.span("render.triage"):
+        st.subheader("🎯 Next Issue for Me")
+        held = queue.checkin(me)  # Renews this lead's leases, at most every half lease (TRIAGE_CHECKIN_SECONDS)
+        if st.button("Next issue for me ➡️", key="triage_claim"):
+            if queue.claim(me) is None:
+                if queue.status()["queued"]:
+                    st.info("You already hold your share of the queue. Resolve or release one first.")
+                else:
+                    st.info("Nothing is waiting: every open issue is resolved or claimed.")
+            else:
+                held = queue.held(me)
+        if not held:
+            st.caption(f"Claims the most urgent waiting issue and holds it for you for "
+                       f"{TRIAGE_LEASE_MINUTES:g} minutes, renewed while this page is open.")
+        for issue_id in held:
+            row = store.get(issue_id)
+            if row is None:
+                continue
+            with st.expander(f"{row['Urgency']} · {row['Title']} (by {row['Name']})", expanded=True):
+                st.markdown(f"**Description:** {row['Description']}")
+                st.markdown(f"**Raised by:** {row['Name']} ({row['Email']})")
+                st.markdown(f"**College:** {row['College']}")
+                st.markdown(f"**Timestamp:** {row['Timestamp']}")
+                response_text = st.text_area("Response:", key=f"triage_response_{issue_id}")
+                c1, c2 = st.columns(2)
+                if c1.button("Mark as Resolved ✔️", key=f"triage_resolve_{issue_id}"):
+                    resolve_issue(store, row, me, response_text)
+                if c2.button("Release ↩️", key=f"triage_release_{issue_id}"):
+                    queue.release(issue_id, me)
+                    safe_rerun()
+
+    with tab1, metrics.span("render.open_issues"):
+        st.subheader("🕒 Open Issues")
+        open_issues, open_total = fetch_page(store, "open_page", page_size, status="Open", **filters)
+        leases = queue.leases()
+
+        if open_issues.empty:
+            st.info("No open issues.")
+        else:
+            arrived = st.session_state.get("feed_items", {})
+            for i, row in open_issues.iterrows():
+                claimed = f" · 🔒 {leases[row['ID']]}" if row["ID"] in leases else ""
+                new = "🆕 " if row["ID"] in arrived else ""
+                with st.expander(f"{new}{row['Title']} (by {row['Name']}){claimed}", expanded=False):
+                    st.markdown(f"**Title:** {row['Title']}")
+                    st.markdown(f"**Description:** {row['Description']}")
+                    st.markdown(f"**Raised by:** {row['Name']} ({row['Email']})")
+                    st.markdown(f"**College:** {row['College']}")
+                    st.markdown(f"**Urgency:** {row['Urgency']}")
+                    st.markdown(f"**Timestamp:** {row['Timestamp']}")
+
+                    response_key = f"response_{row['ID']}"
+                    response_text = st.text_area("Response:", key=response_key)
+
+                    button_key = f"resolve_{row['ID']}"
+                    if st.button("Mark as Resolved ✔️", key=button_key):
+                        resolve_issue(store, row, me, response_text)
+            page_controls("open_page", open_total, page_size)
+
+    with tab2, metrics.span("render.resolved_issues"):
+        st.subheader("✅ Resolved Issues")
+        resolved_issues, resolved_total = fetch_page(store, "resolved_page", page_size, status="Resolved", **filters)
+
+        if resolved_issues.empty:
+            st.info("No resolved issues yet.")
+        else:
+            for i, row in resolved_issues.iterrows():
+                with st.expander(f"{row['Title']} (by {row['Name']})", expanded=False):
+                    st.markdown(f"**Title:** {row['Title']}")
+                    st.markdown(f"**Description:** {row['Description']}")
+                    st.markdown(f"**Raised by:** {row['Name']} ({row['Email']})")
+                    st.markdown(f"**College:** {row['College']}")
+                    st.markdown(f"**Urgency:** {row['Urgency']}")
+                    st.markdown(f"**Resolved By:** {row.get('ResolvedBy', 'Unknown')}")
+                    st.markdown(f"**Response:** {row.get('Response', 'No response')}")
+                    st.markdown(f"**Timestamp:** {row['Timestamp']}")
+                    st.markdown("---")
+            page_controls("resolved_page", resolved_total, page_size)
+
+    # ─── All Reported Issues Table ────────────────────────────────────────
+    with metrics.span("render.all_issues"):
+        st.subheader("📋 All Reported Issues")
+        all_issues, all_total = fetch_page(store, "all_page", page_size, **filters)
+        st.dataframe(all_issues)
+        page_controls("all_page", all_total, page_size)
+
+    # ─── Issues Resolved per Tech Lead Chart ────────────────────────────
+    with metrics.span("render.chart"):
+        st.subheader("👨‍💻 Issues Resolved per Tech Lead")
+        resolved_count = store.resolved_counts_by_lead()
+
+        if not resolved_count.empty:
+            chart = (
+                alt.Chart(resolved_count)
+                   .mark_bar(size=30)
+                   .encode(
+                       x=alt.X("ResolvedBy:N", title="Tech Lead"),
+                       y=alt.Y("Count:Q", title="Resolved Issues"),
+                       tooltip=["ResolvedBy", "Count"]
+                   )
+                   .properties(width=600, height=400)
+            )
+            st.altair_chart(chart, use_container_width=True)
+        else:
+            st.info("No resolved issues have 'ResolvedBy' data yet.")
+
+    # ─── Resolution Times, SLA and Backlog (daily rollups) ──────────────
+    with metrics.span("render.analytics"):
+        st.subheader("⏱️ Resolution Times & SLA")
+        rollups = store.daily_rollups()
+        date_from, date_to = filters["date_from"], filters["date_to"]
+        overall = analytics.resolution_stats(rollups, "All", date_from, date_to)
+
+        if overall.empty:
+            st.info("No issues with a recorded resolution time in this range yet.")
+        else:
+            row = overall.iloc[0]
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Resolved", int(row["Resolved"]))
+            m2.metric("Median (h)", f"{row['p50']:.1f}")
+            m3.metric("p90 (h)", f"{row['p90']:.1f}")
+            m4.metric("SLA breached", f"{row['Breach rate']:.0%}")
+
+            breakdown = st.selectbox("Break down by", list(BREAKDOWN_LABELS), key="an_breakdown")
+            by = BREAKDOWN_LABELS[breakdown]
+            table = analytics.resolution_stats(rollups, by, date_from, date_to).rename(columns={by: breakdown})
+            st.dataframe(table, hide_index=True)
+            st.caption("Resolution times in hours, by day resolved. SLA: " + ", ".join(
+                f"{level} {hours:g}h" for level, hours in analytics.SLA_HOURS.items()))
+
+        backlog = analytics.backlog_curve(rollups, date_from, date_to)
+        if not backlog.empty:
+            chart = (
+                alt.Chart(backlog)
+                   .mark_line()
+                   .encode(
+                       x=alt.X("Day:T", title="Day"),
+                       y=alt.Y("Backlog:Q", title="Open issues at end of day"),
+                       tooltip=["Day:T", "Opened", "Resolved", "Backlog"]
+                   )
+                   .properties(width=600, height=300)
+            )
+            st.altair_chart(chart, use_container_width=True)
+
+    # ─── Export Resolved Issues (built when the button is clicked) ───────
+    with metrics.span("render.export"):
+        st.subheader("📤 Export Resolved Issues")
+        export_report(store)
+
+# ─── REPORT EXPORT ──────────────────────────────────────────────────────────────
+
+def export_report(store):
+    """
+    Report filters plus a download button. The report is built from
+    utils/reports.py only on click, on Streamlit's download thread, so the
+    page never loads the rows and other sessions are not held up.
+    """
+    e1, e2, e3 = st.columns(3)
+    # No range by default: every resolved issue, including those resolved before ResolvedAt was recorded
+    dates       = e1.date_input("Resolved between", value=(), key="ex_dates")
+    college     = e2.selectbox("College", ["All"] + store.colleges(), key="ex_college")
+    resolved_by = e3.selectbox("Resolved by", ["All"] + store.resolvers(), key="ex_resolved_by")
+
+    labels = [label for label, fmt in REPORT_FORMATS.items() if fmt != "xlsx" or reports.excel_available()]
+    e4, e5 = st.columns([2, 1])
+    fmt      = REPORT_FORMATS[e4.radio("Format", labels, horizontal=True, key="ex_format")]
+    compress = e5.checkbox("gzip", value=True, disabled=fmt == "xlsx", key="ex_gzip") and fmt != "xlsx"
+    if not reports.excel_available():
+        st.caption("Excel reports need openpyxl (`pip install openpyxl`).")
+
+    filters = {
+        "date_from":   dates[0] if len(dates) > 0 else None,
+        "date_to":     dates[1] if len(dates) > 1 else None,
+        "college":     None if college == "All" else college,
+        "resolved_by": None if resolved_by == "All" else resolved_by,
+    }
+    st.download_button(
+        "⬇️ Download report",
+        data=lambda: reports.report_bytes(store, fmt, compress, **filters),
+        file_name=reports.file_name(fmt, compress, filters["date_from"], filters["date_to"]),
+        mime=reports.mime_type(fmt, compress),
+        on_click="ignore",
+        key="ex_download",
+    )
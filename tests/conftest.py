@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from utils.sqlite_store import SqliteStore  # noqa: E402
+from utils.storage import FileStore  # noqa: E402
+
+
+def make_issue(issue_id, status="Open", timestamp="2025-01-15 10:00:00", **fields):
+    return {
+        "ID": issue_id, "Name": "Asha", "Email": "asha@gmail.com", "College": "IIT",
+        "Title": f"Issue {issue_id}", "Description": "pip install fails", "Urgency": "Low",
+        "Status": status, "Timestamp": timestamp, **fields,
+    }
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    """A fresh store of each backend in its own directory."""
+    monkeypatch.chdir(tmp_path)
+    if request.param == "csv":
+        return FileStore(str(tmp_path / "issues.csv"), str(tmp_path / "users.csv"))
+    return SqliteStore(str(tmp_path / "helpdesk.db"))
+
+
+def reopen(store):
+    """A new store over the same files, as another process (or a restart) would open it."""
+    if isinstance(store, FileStore):
+        return FileStore(store.issues_path, store.users_path)
+    return SqliteStore(store.path)
@@ -0,0 +1,64 @@
+"""The JSON API over a real socket."""
+import http.client
+import json
+import threading
+
+import pytest
+
+from api import make_server
+
+
+@pytest.fixture
+def api(store):
+    server = make_server("127.0.0.1", 0, threads=4, store=store)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    try:
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        conn.request(method, path, body=data, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read() or b"null")
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "1.5"])
+def test_bad_content_length_is_a_400(api, length):
+    conn = http.client.HTTPConnection("127.0.0.1", api.server_address[1], timeout=10)
+    try:
+        conn.putrequest("POST", "/issues/get")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == 400
+        assert "Content-Length" in json.loads(resp.read())["error"]
+    finally:
+        conn.close()
+
+
+def test_group_commit_reports_each_id_created_once(api, store):
+    ids = [f"ci-{i}" for i in range(20)]
+    issues = [{"ID": i, "Name": "Bot", "Email": "bot@gmail.com", "College": "IIT", "Title": f"Build {i}",
+               "Description": "CI failed", "Urgency": "High"} for i in ids]
+    results = []
+
+    def post():
+        results.append(request(api, "POST", "/issues", {"issues": issues}))
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    created = sorted(i for _, body in results for i in body["created"])
+    assert created == sorted(ids)
+    assert all(status in (200, 201) and body["ids"] == ids for status, body in results)
+    assert store.aggregates().total() == len(ids)
+    assert request(api, "POST", "/issues", {"issues": issues}) == (200, {"ids": ids, "created": []})
@@ -0,0 +1,59 @@
+"""Benchmark harness: the seeded generator, a small run, and regression flags."""
+import pytest
+
+from utils import bench, storage
+from utils.storage import ISSUE_COLUMNS, read_issues_csv
+
+
+def test_generator_is_seeded_and_realistic():
+    df = bench.generate_issues(2000)
+    assert df.equals(bench.generate_issues(2000))
+    assert not df.equals(bench.generate_issues(2000, seed=1))
+    assert list(df.columns) == ISSUE_COLUMNS
+    assert df["ID"].is_unique and df["Timestamp"].is_monotonic_increasing
+    assert set(df["Urgency"]) == set(bench.URGENCY_MIX)
+    assert 0.6 < (df["Status"] == "Resolved").mean() < 0.8
+    assert (df["Email"].str.startswith(" ")).any()  # Messy legacy emails
+    resolved = df[df["Status"] == "Resolved"]
+    assert (resolved["ResolvedBy"] != "").all() and (resolved["ResolvedAt"] >= resolved["Timestamp"]).all()
+    assert (df.loc[df["Status"] == "Open", "ResolvedAt"] == "").all()
+
+
+def test_legacy_dataset_reads_back_as_current(tmp_path):
+    issues = bench.write_dataset(str(tmp_path), 300)
+    legacy = read_issues_csv(str(tmp_path / "legacy_issues.csv"))
+    assert legacy["Title"].tolist() == issues["Title"].tolist()
+    assert legacy["Response"].tolist() == issues["Response"].tolist()
+    assert (tmp_path / "issues.parquet").exists() and (tmp_path / "users.csv").exists()
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite"])
+def test_small_run_times_every_case(tmp_path, monkeypatch, backend):
+    monkeypatch.setattr(storage, "_store", None)
+    monkeypatch.setenv("HELPDESK_BACKEND", backend)  # Restored after run_size sets it
+    monkeypatch.setenv("HELPDESK_DB", "")
+    results = bench.run_size(str(tmp_path / "200"), 200, backend, repeat=1, ops=5, render=False)
+    timed = {case for case, stats in results.items() if "p50_ms" in stats}
+    assert {"load", "load_legacy", "login", "open_page", "resolved_page", "submit", "resolve", "stats",
+            "analytics", "triage_claim", "my_issues", "report_export"} <= timed
+    for case in timed:
+        assert results[case]["p95_ms"] >= results[case]["p50_ms"] >= 0 and results[case]["peak_mb"] >= 0
+
+
+def test_compare_flags_regressions_above_the_noise_floor():
+    base = {"results": {"1000": {
+        "load": {"p50_ms": 100.0, "p95_ms": 120.0, "peak_mb": 50.0, "rss_growth_mb": None},
+        "login": {"p50_ms": 0.01, "p95_ms": 0.02, "peak_mb": 0.0, "rss_growth_mb": None},
+        "generate": {"seconds": 1.0},
+    }}}
+    new = {"results": {"1000": {
+        "load": {"p50_ms": 130.0, "p95_ms": 90.0, "peak_mb": 51.0, "rss_growth_mb": None},
+        "login": {"p50_ms": 0.05, "p95_ms": 0.08, "peak_mb": 0.0, "rss_growth_mb": None},  # 5x, but under 1 ms
+        "generate": {"seconds": 9.0},
+    }}}
+    flags = {(case, metric): flag for _, case, metric, _, _, _, flag in bench.compare(base, new)}
+    assert flags[("load", "p50_ms")] == "REGRESSION"
+    assert flags[("load", "p95_ms")] == "improved"
+    assert flags[("load", "peak_mb")] == ""
+    assert flags[("login", "p50_ms")] == ""
+    assert not any(case == "generate" for case, _ in flags)
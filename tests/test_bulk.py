@@ -0,0 +1,69 @@
+"""Streaming bulk import and export, on both backends."""
+import pandas as pd
+
+from conftest import make_issue
+from utils.bulk import export_issues, export_users, import_issues, import_users
+from utils.storage import ISSUE_COLUMNS
+
+ISSUES_CSV = (
+    "ID,Name,Email,College,Issue,Description,Urgency,Status,Timestamp,ResolvedBy,TechLeadResponse\n"
+    "b1,Asha, Asha@gmail.com,IIT,pip fails,On Windows,High,Open,2025-01-15 10:00:00,,\n"
+    "b2,Ravi,ravi@yahoo.com,NIT,Import error,,Low,Open,2025-01-16 10:00:00,,\n"
+    " ,Meera,meera@gmail.com,IIT,No ID,,Low,Open,2025-01-17 10:00:00,,\n"
+    "b1,Asha,asha@gmail.com,IIT,Again,,High,Open,2025-01-18 10:00:00,,\n"
+    "b3,Kiran,kiran@gmail.com,BITS,Venv,,Medium,Resolved,2025-01-19 10:00:00,lead@gmail.com,Use one\n"
+    "b4,Asha,asha@gmail.com,IIT,Path,,Low,Open,2025-01-20 10:00:00,,\n"
+)
+
+
+def test_import_cleans_rejects_and_dedupes_across_chunks(store, tmp_path):
+    store.add_issue(make_issue("b4"))  # Already stored
+    src = tmp_path / "backlog.csv"
+    src.write_text(ISSUES_CSV)
+    rejects = tmp_path / "rejects.csv"
+
+    stats = import_issues(store, str(src), chunk_size=2, rejects=str(rejects))
+    assert (stats.read, stats.written, stats.duplicates, stats.rejected) == (6, 2, 2, 2)
+    assert sorted(store.load_issues()["ID"]) == ["b1", "b3", "b4"]
+    b1 = store.get("b1")
+    assert (b1["Title"], b1["Email"]) == ("pip fails", "asha@gmail.com")  # First one wins, renamed, stripped
+    assert store.get("b3")["Response"] == "Use one"
+    assert sorted(pd.read_csv(rejects)["Reason"]) == ["missing ID", "not a Gmail address"]
+
+
+def test_export_streams_every_issue(store, tmp_path):
+    for i in range(5):
+        store.add_issue(make_issue(f"i{i}"))
+    store.resolve("i0", "lead@gmail.com", "Fixed")
+    out = tmp_path / "export.csv"
+    stats = export_issues(store, str(out), chunk_size=2)
+    assert stats.written == 5
+    df = pd.read_csv(out, dtype=str, keep_default_na=False)
+    assert list(df.columns) == ISSUE_COLUMNS
+    assert sorted(df["ID"]) == [f"i{i}" for i in range(5)]
+    assert df.set_index("ID").loc["i0", "ResolvedBy"] == "lead@gmail.com"
+
+
+def test_empty_export_still_has_a_header(store, tmp_path):
+    out = tmp_path / "export.csv"
+    export_issues(store, str(out))
+    assert out.read_text().strip() == ",".join(ISSUE_COLUMNS)
+
+
+def test_users_round_trip(store, tmp_path):
+    src = tmp_path / "new-users.csv"
+    src.write_text(
+        "email,password,role\n"
+        " Asha@gmail.com ,pw,Developer Intern\n"
+        "lead@gmail.com,pw,Tech Lead\n"
+        "ravi@gmail.com,,Developer Intern\n"
+        "kiran@gmail.com,pw,Manager\n"
+    )
+    stats = import_users(store, str(src), chunk_size=3)
+    assert (stats.written, stats.rejected) == (2, 2)
+
+    out = tmp_path / "export.csv"
+    export_users(store, str(out))
+    users = pd.read_csv(out, dtype=str)
+    assert sorted(users["email"].str.lower()) == ["asha@gmail.com", "lead@gmail.com"]
+    assert store.get_user(" ASHA@gmail.com")["role"] == "Developer Intern"
@@ -0,0 +1,56 @@
+"""Change feed: every write in order, with sequence numbers readers can resume from."""
+import time
+
+import pytest
+
+from conftest import make_issue
+from utils import changes as changes_module
+from utils.changes import ChangeLog
+from utils.storage import ConflictError
+
+
+def test_writes_are_logged_in_order(store):
+    assert store.changes.latest() == 0
+    store.add_issues([make_issue("i1"), make_issue("i2")])
+    store.resolve("i1", "lead@gmail.com", "Fixed")
+    store.add_user("asha@gmail.com", "pw", "Developer Intern")
+    with pytest.raises(ConflictError):
+        store.update_issue("i2", 5, Response="Stale")  # Not written, not logged
+
+    log, complete = store.changes.since(0)
+    assert complete
+    assert [(c["op"], c["key"]) for c in log] == [
+        ("submit", "i1"), ("submit", "i2"), ("update", "i1"), ("register", "asha@gmail.com"),
+    ]
+    assert [c["seq"] for c in log] == sorted(c["seq"] for c in log)
+    assert store.changes.latest() == log[-1]["seq"]
+    assert log[0]["data"]["Title"] == "Issue i1"
+    assert log[2]["data"]["Status"] == "Resolved" and log[2]["data"]["ResolvedBy"] == "lead@gmail.com"
+
+
+def test_readers_resume_after_their_last_seq(store):
+    for i in range(5):
+        store.add_issue(make_issue(f"i{i}"))
+    first, _ = store.changes.since(0, limit=2)
+    assert [c["key"] for c in first] == ["i0", "i1"]
+    rest, complete = store.changes.since(first[-1]["seq"])
+    assert complete and [c["key"] for c in rest] == ["i2", "i3", "i4"]
+    assert store.changes.since(store.changes.latest()) == ([], True)  # Idle feed
+
+
+def test_pruned_history_is_reported_incomplete(tmp_path, monkeypatch):
+    log = ChangeLog(str(tmp_path / "changes.db"))
+    monkeypatch.setattr(changes_module, "PRUNE_EVERY", 2)
+    now = time.time()
+    monkeypatch.setattr(changes_module.time, "time", lambda: now - 30 * 86400)
+    log.append([("submit", "old", {})])
+    monkeypatch.setattr(changes_module.time, "time", lambda: now)
+    seq = log.append([("submit", "new", {})])  # Crosses PRUNE_EVERY: the month-old change goes
+
+    changes, complete = log.since(0)
+    assert not complete
+    assert [c["key"] for c in changes] == ["new"]
+    assert log.since(1) == (changes, True)
+    assert log.latest() == seq == 2
+    log.append([("submit", "newer", {})])
+    assert log.latest() == 3  # Never reused after pruning
@@ -0,0 +1,150 @@
+"""CSV backend: journal, compaction and the monthly archive."""
+import os
+import threading
+
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import make_issue
+from utils.schema import SCHEMA_KEY, SchemaVersionError
+from utils.snapshot import snapshot_path
+from utils.storage import FileStore, compact_journal
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return str(tmp_path / "issues.csv"), str(tmp_path / "users.csv")
+
+
+def test_concurrent_writers_race_compaction(paths):
+    issues_path, users_path = paths
+    FileStore(issues_path, users_path)
+    writers, per_writer = 4, 15
+    stop = threading.Event()
+    errors, compactions = [], []
+
+    def compactor():
+        while not stop.wait(0.01):
+            compactions.append(compact_journal(issues_path, force=True))
+
+    def writer(k):
+        # A store of its own, as another app process would have: its own lock descriptors and caches
+        store = FileStore(issues_path, users_path)
+        try:
+            for i in range(per_writer):
+                issue_id = f"w{k}-{i}"
+                store.add_issue(make_issue(issue_id, timestamp=f"2025-0{1 + i % 3}-10 09:00:00"))
+                if i % 2 == 0:
+                    store.resolve(issue_id, "lead@gmail.com", "Fixed")
+        except Exception as exc:  # Reported from the main thread
+            errors.append(exc)
+
+    threads = [threading.Thread(target=compactor)] + [threading.Thread(target=writer, args=(k,)) for k in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads[1:]:
+        t.join()
+    stop.set()
+    threads[0].join()
+    assert errors == []
+    assert sum(compactions) > 1  # The writers really did race it
+    compact_journal(issues_path, force=True)
+
+    store = FileStore(issues_path, users_path)
+    df = store.load_issues()
+    expected = {f"w{k}-{i}" for k in range(writers) for i in range(per_writer)}
+    assert len(df) == len(expected) and set(df["ID"]) == expected
+    resolved = set(df.loc[df["Status"] == "Resolved", "ID"])
+    assert resolved == {f"w{k}-{i}" for k in range(writers) for i in range(0, per_writer, 2)}
+    assert set(store._hot()["ID"]) == expected - resolved  # Every resolved issue is archived
+    assert store.aggregates().by("Status") == {"Open": len(expected - resolved), "Resolved": len(resolved)}
+    assert store.rebuild_aggregates().by("Status") == store.aggregates().by("Status")
+
+
+def test_archived_issue_updates_in_place_and_reopens_to_the_hot_tier(paths):
+    store = FileStore(*paths)
+    store.add_issue(make_issue("i1", timestamp="2025-01-10 09:00:00"))
+    store.add_issue(make_issue("i2", timestamp="2025-01-11 09:00:00"))
+    store.resolve("i1", "lead@gmail.com", "Fixed")
+    compact_journal(paths[0], force=True)
+    assert store.archive.months() == ["2025-01"]
+    assert "i1" not in set(store._hot()["ID"])
+
+    after = store.update_issue("i1", 1, Response="Fixed, see the wiki")
+    assert after["Version"] == 2
+    assert store.archive.get("i1")["Response"] == "Fixed, see the wiki"
+    assert "i1" not in set(store._hot()["ID"])
+
+    store.update_issue("i1", 2, Status="Open", ResolvedBy="", ResolvedAt="")
+    assert store.archive.get("i1") is None
+    assert set(store.open_issues()["ID"]) == {"i1", "i2"}
+    assert store.get("i1")["Version"] == 3
+    assert store.aggregates().by("Status") == {"Open": 2}
+    compact_journal(paths[0], force=True)  # Open issues stay hot
+    assert store.archive.get("i1") is None
+    assert store.get("i1")["Status"] == "Open"
+
+
+def test_archived_ids_are_found_without_reading_partitions(paths, monkeypatch):
+    store = FileStore(*paths)
+    for issue_id, when in [("i1", "2025-01-10"), ("20250210-x", "2025-03-05"), ("i3", "2025-02-01")]:
+        store.add_issue(make_issue(issue_id, timestamp=f"{when} 09:00:00"))
+        store.resolve(issue_id, "lead@gmail.com", "Fixed")
+    compact_journal(paths[0], force=True)
+    os.remove(store.archive._ids_path)  # Archived before the ID table existed: built from the partitions once
+    store = FileStore(*paths)
+    assert store.archive.find("20250210-x") == "2025-03"  # Not the month the ID encodes
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("read a partition")
+
+    monkeypatch.setattr(store.archive, "read", no_reads)
+    assert store.archive.contains(["i1", "i3", "i9", "20250210-x"]) == {"i1", "i3", "20250210-x"}
+    store.add_issue(make_issue("i3", Title="Submitted twice"))  # Already archived: ignored
+    monkeypatch.undo()
+    assert store.get("i3")["Title"] == "Issue i3"
+    assert len(store.load_issues()) == 3
+
+    store.update_issue("i3", 1, Status="Open", ResolvedBy="", ResolvedAt="")
+    assert store.archive.find("i3") is None
+    assert FileStore(*paths).archive.contains(["i1", "i3"]) == {"i1"}
+
+
+def test_migration_normalizes_resolved_by(paths):
+    import pyarrow as pa
+
+    store = FileStore(*paths)
+    for issue_id in ("i1", "i2"):
+        store.add_issue(make_issue(issue_id))
+        store.resolve(issue_id, "lead@gmail.com", "Fixed")
+    compact_journal(paths[0], force=True)
+    counts = store.rebuild_aggregates()
+    counts.counts["ResolvedBy"] = {"lead@gmail.com": 1, " lead@gmail.com": 1}  # As they were counted
+    counts.save(store.stats_path)
+    part = store.archive._path("2025-01")
+    table = pq.read_table(part)  # As a version 3 partition could hold it
+    column = table.schema.get_field_index("ResolvedBy")
+    leads = pa.array(["lead@gmail.com", " Lead@gmail.com"], table.column(column).type)
+    table = table.set_column(column, "ResolvedBy", leads)
+    pq.write_table(table.replace_schema_metadata({**table.schema.metadata, SCHEMA_KEY: b"3"}), part)
+
+    store = FileStore(*paths, check_schema=False)
+    assert store.migrate_schema() == 1
+    assert set(store.load_issues()["ResolvedBy"]) == {"lead@gmail.com"}
+    assert store.aggregates().by("ResolvedBy") == {"lead@gmail.com": 2}
+    FileStore(*paths)  # Opens at the current version
+
+
+@pytest.mark.parametrize("found", [2, 99])
+def test_schema_version_mismatch_fails_fast(paths, found):
+    store = FileStore(*paths)
+    store.add_issue(make_issue("i1"))
+    compact_journal(paths[0], force=True)
+    snap = snapshot_path(paths[0])
+    table = pq.read_table(snap)
+    pq.write_table(table.replace_schema_metadata({**table.schema.metadata, SCHEMA_KEY: str(found).encode()}), snap)
+
+    with pytest.raises(SchemaVersionError) as exc:
+        FileStore(*paths)
+    assert exc.value.found == found
@@ -0,0 +1,140 @@
+"""Resolve notifications: queued with the resolve, delivered once over real SMTP."""
+import socket
+import threading
+import warnings
+
+import pytest
+
+from conftest import make_issue
+from utils import outbox
+from utils.outbox import SmtpConnection, deliver_batch
+from utils.storage import ConflictError
+
+
+class Mailbox:
+    """A local SMTP server (aiosmtpd, else the stdlib smtpd) that can turn messages away with 451."""
+
+    def __init__(self, reject=0):
+        self.reject = reject  # Messages to answer with a temporary failure first
+        self.received = []
+        self.port = None
+
+    def accept(self, data):
+        if self.reject:
+            self.reject -= 1
+            return "451 Try again later"
+        self.received.append(data)
+        return None
+
+    def __enter__(self):
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            return self._start_smtpd()
+        box = self
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                return box.accept(envelope.content) or "250 OK"
+
+        self._controller = Controller(Handler(), hostname="127.0.0.1", port=_free_port())
+        self._controller.start()
+        self.port = self._controller.port
+        self._stop = self._controller.stop
+        return self
+
+    def _start_smtpd(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            import asyncore
+            import smtpd
+        box = self
+
+        class Server(smtpd.SMTPServer):
+            def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+                return box.accept(data)
+
+        self.port = _free_port()
+        server = Server(("127.0.0.1", self.port), None, decode_data=False)
+        loop = threading.Thread(target=asyncore.loop, kwargs={"timeout": 0.05, "map": server._map}, daemon=True)
+        loop.start()
+
+        def stop():
+            server.close()
+            loop.join(1)
+
+        self._stop = stop
+        return self
+
+    def __exit__(self, *exc):
+        self._stop()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _drain(store, connection):
+    while deliver_batch(store.outbox, connection):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def smtp_configured(monkeypatch):
+    monkeypatch.setattr(outbox, "SMTP_HOST", "127.0.0.1")
+
+
+def test_resolve_delivers_exactly_one_message(store):
+    store.add_issue(make_issue("i1"))
+    version = store.get("i1")["Version"]
+    store.resolve("i1", "lead@gmail.com", "Use a virtualenv", expected_version=version)
+    with pytest.raises(ConflictError):  # A second click on the same rendered row
+        store.resolve("i1", "other@gmail.com", "Same here", expected_version=version)
+    store.resolve("i1", "lead@gmail.com", "Edited response")  # Already resolved: no new email
+
+    with Mailbox() as box:
+        connection = SmtpConnection("127.0.0.1", box.port, user="", starttls=False)
+        try:
+            _drain(store, connection)
+        finally:
+            connection.close()
+    assert len(box.received) == 1
+    assert b"Use a virtualenv" in box.received[0]
+    assert store.outbox.counts() == {"sent": 1}
+
+
+def test_temporary_failure_is_retried_and_delivered_once(store):
+    store.add_issue(make_issue("i1"))
+    store.resolve("i1", "lead@gmail.com", "Fixed")
+
+    with Mailbox(reject=1) as box:
+        connection = SmtpConnection("127.0.0.1", box.port, user="", starttls=False)
+        try:
+            _drain(store, connection)
+            assert box.received == []
+            assert store.outbox.counts() == {"pending": 1}
+            with store.outbox.connect() as conn:
+                conn.execute("UPDATE outbox SET due = 0")  # Skip the backoff
+            _drain(store, connection)
+            _drain(store, connection)
+        finally:
+            connection.close()
+    assert len(box.received) == 1
+    assert store.outbox.counts() == {"sent": 1}
+
+
+def test_sqlite_adopts_the_old_outbox_file(tmp_path, monkeypatch):
+    from utils.outbox import Outbox, outbox_path
+    from utils.sqlite_store import SqliteStore
+
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "helpdesk.db")
+    old = Outbox(outbox_path(db))
+    old.enqueue("asha@gmail.com", "Resolved", "body", issue_id="i1")
+    old.connect().close()
+
+    store = SqliteStore(db)
+    assert store.outbox.counts() == {"pending": 1}
+    assert SqliteStore(db).outbox.counts() == {"pending": 1}  # Moved in once
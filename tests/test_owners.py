@@ -0,0 +1,47 @@
+"""My Issues: an intern's own issues, looked up by normalized email."""
+from conftest import make_issue, reopen
+from utils.storage import FileStore, compact_journal
+
+
+def test_issues_by_email_are_normalized_and_newest_first(store):
+    store.add_issue(make_issue("i1", Email=" Asha@gmail.com", timestamp="2025-01-10 09:00:00"))
+    store.add_issue(make_issue("i2", Email="ravi@gmail.com"))
+    store.add_issue(make_issue("i3", Email="asha@gmail.com", timestamp="2025-02-10 09:00:00"))
+    store.resolve("i1", "lead@gmail.com", "Use a venv")
+
+    mine = store.issues_by_email("ASHA@gmail.com ")
+    assert [i["ID"] for i in mine] == ["i3", "i1"]
+    assert (mine[1]["Status"], mine[1]["Response"]) == ("Resolved", "Use a venv")
+    assert store.issues_by_email("nobody@gmail.com") == []
+
+
+def test_index_follows_writes_after_it_is_built(store):
+    store.add_issue(make_issue("i1"))
+    assert [i["ID"] for i in store.issues_by_email("asha@gmail.com")] == ["i1"]  # Built here on the CSV backend
+    store.add_issue(make_issue("i2"))
+    store.update_issue("i1", 0, Email="ravi@gmail.com")
+    assert [i["ID"] for i in store.issues_by_email("asha@gmail.com")] == ["i2"]
+    assert [i["ID"] for i in reopen(store).issues_by_email("ravi@gmail.com")] == ["i1"]
+
+
+def test_archived_issues_are_read_from_their_partition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = FileStore(str(tmp_path / "issues.csv"), str(tmp_path / "users.csv"))
+    store.add_issue(make_issue("i1", timestamp="2025-01-10 09:00:00"))
+    store.add_issue(make_issue("i2", timestamp="2025-03-10 09:00:00"))
+    store.add_issue(make_issue("i3", Email="ravi@gmail.com", timestamp="2025-02-10 09:00:00"))
+    for issue_id in ("i1", "i3"):
+        store.resolve(issue_id, "lead@gmail.com", "Fixed")
+    store.issues_by_email("asha@gmail.com")
+    compact_journal(store.issues_path, force=True)
+    assert store.archive.months() == ["2025-01", "2025-02"]
+
+    read = []
+    lookup = store.archive.lookup
+    monkeypatch.setattr(store.archive, "lookup", lambda month, ids: read.append(month) or lookup(month, ids))
+    assert [i["ID"] for i in store.issues_by_email("asha@gmail.com")] == ["i2", "i1"]
+    assert read == ["2025-01"]  # Not ravi's month
+
+    entries = sorted(store.owners.connect().execute("SELECT email, issue_id, month FROM owners"))
+    store.rebuild_owners()
+    assert sorted(store.owners.connect().execute("SELECT email, issue_id, month FROM owners")) == entries
@@ -0,0 +1,64 @@
+"""Reports of resolved issues, built chunk by chunk."""
+import gzip
+import io
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from conftest import make_issue
+from utils.reports import REPORT_COLUMNS, build_report, excel_available, file_name, month_range, report_bytes
+
+
+@pytest.fixture
+def resolved(store):
+    """Five issues: i0-i3 resolved in January 2025 (i3 by another lead, from NIT), i4 still open."""
+    for i in range(5):
+        store.add_issue(make_issue(f"i{i}", College="NIT" if i == 3 else "IIT"))
+    for i in range(4):
+        store.update_issue(f"i{i}", 0, Status="Resolved", ResolvedBy="other@gmail.com" if i == 3 else "lead@gmail.com",
+                           ResolvedAt=f"2025-01-{10 + i} 12:00:00", Response=f"Fix, {i}")
+    return store
+
+
+def _csv(data):
+    return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+
+
+def test_csv_report_applies_the_filters(resolved):
+    df = _csv(report_bytes(resolved, chunk_size=2))
+    assert list(df.columns) == REPORT_COLUMNS
+    assert sorted(df["ID"]) == ["i0", "i1", "i2", "i3"]
+    assert df.set_index("ID").loc["i1", "Response"] == "Fix, 1"  # Quoted, not split
+
+    assert sorted(_csv(report_bytes(resolved, date_from=date(2025, 1, 11), date_to=date(2025, 1, 12)))["ID"]) == \
+        ["i1", "i2"]
+    assert _csv(report_bytes(resolved, college="NIT"))["ID"].tolist() == ["i3"]
+    assert _csv(report_bytes(resolved, resolved_by="other@gmail.com"))["ID"].tolist() == ["i3"]
+    assert len(_csv(report_bytes(resolved, date_from=date(2025, 2, 1)))) == 0  # Header only
+
+
+def test_gzipped_jsonl_report(resolved):
+    data = report_bytes(resolved, fmt="jsonl", compress=True, chunk_size=3, college="IIT")
+    rows = [json.loads(line) for line in gzip.decompress(data).decode("utf-8").splitlines()]
+    assert sorted(r["ID"] for r in rows) == ["i0", "i1", "i2"]
+    assert rows[0]["ResolvedAt"].startswith("2025-01-1")
+
+
+@pytest.mark.skipif(not excel_available(), reason="openpyxl is not installed")
+def test_excel_report(resolved):
+    from openpyxl import load_workbook
+
+    with build_report(resolved, fmt="xlsx") as report:
+        sheet = load_workbook(report, read_only=True).active
+        rows = list(sheet.values)
+    assert list(rows[0]) == REPORT_COLUMNS and len(rows) == 5
+
+
+def test_names_and_months():
+    assert month_range("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert file_name("csv", True, *month_range("2025-01")) == "resolved-2025-01-01_2025-01-31.csv.gz"
+    assert file_name("xlsx", True) == "resolved-all.xlsx"  # Already compressed
+    with pytest.raises(ValueError):
+        report_bytes(None, fmt="pdf")
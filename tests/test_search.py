@@ -0,0 +1,39 @@
+"""Full-text search index."""
+import glob
+import os
+
+from conftest import make_issue, reopen
+
+
+def _ids(results):
+    return sorted(results["ID"])
+
+
+def test_search_finds_issues_by_prefix_and_filters(store):
+    store.add_issue(make_issue("i1", Title="Testing pandas install", Urgency="High"))
+    store.add_issue(make_issue("i2", Title="Docker build", Description="testing layer cache"))
+    store.add_issue(make_issue("i3", Title="Unrelated", Description="nothing here"))
+
+    assert _ids(store.search("test")) == ["i1", "i2"]
+    assert store.search("pandas testing")["ID"].tolist() == ["i1"]
+    assert _ids(store.search("testing", urgency=["High"])) == ["i1"]
+    store.resolve("i2", "lead@gmail.com", "Cleared the cache")
+    assert _ids(store.search("testing", status="Resolved")) == ["i2"]
+    assert _ids(store.search("cache")) == ["i2"]  # Response text is indexed too
+    assert store.search("   ").empty
+
+
+def test_submit_before_the_first_search_keeps_old_issues_searchable(store):
+    store.add_issue(make_issue("old1", Title="Testing sample data"))
+    store.add_issue(make_issue("old2", Title="SAMPLE upload fails"))
+    # The data predates the index: a fresh index file, as on an existing install
+    data_path = store.issues_path if hasattr(store, "issues_path") else store.path
+    for path in glob.glob(os.path.splitext(data_path)[0] + ".search.db*"):
+        os.remove(path)
+    store = reopen(store)
+
+    store.add_issue(make_issue("new1", Title="Testing a new submit"))
+    assert _ids(store.search("testing")) == ["new1", "old1"]
+    assert _ids(store.search("SAMPLE")) == ["old1", "old2"]
+    store.add_issue(make_issue("new2", Title="Sample after the build"))
+    assert _ids(store.search("sample")) == ["new2", "old1", "old2"]
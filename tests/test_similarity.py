@@ -0,0 +1,35 @@
+"""Near-duplicate detection: the MinHash matrix and its saved copy."""
+import os
+import threading
+
+from conftest import make_issue
+from utils.similarity import DuplicateDetector
+
+
+def test_detectors_saving_at_once_leave_one_whole_file(store, tmp_path):
+    store.add_issue(make_issue("i1", Title="pip install fails behind the proxy"))
+    path = str(tmp_path / "shared.minhash.npz")
+    detectors = [DuplicateDetector(path) for _ in range(8)]  # As separate processes would hold them
+    barrier = threading.Barrier(len(detectors))
+    errors = []
+
+    def refresh(detector):
+        barrier.wait()
+        try:
+            for _ in range(5):
+                detector._seq = None  # Rebuild and save again
+                detector.refresh(store.changes, store.get, store.load_issues)
+        except Exception as exc:  # Reported from the main thread
+            errors.append(exc)
+
+    threads = [threading.Thread(target=refresh, args=(d,)) for d in detectors]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert [n for n in os.listdir(tmp_path) if ".tmp" in n] == []
+    loaded = DuplicateDetector(path)
+    loaded.refresh(store.changes, store.get, store.load_issues)
+    assert [i for i, _ in loaded.query("pip install fails behind the proxy")] == ["i1"]
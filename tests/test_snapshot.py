@@ -0,0 +1,79 @@
+"""Typed Parquet snapshot and the CSV import/export format."""
+import io
+
+import pandas as pd
+import pytest
+
+from conftest import make_issue
+from utils.schema import SCHEMA_VERSION, SchemaVersionError
+from utils.snapshot import (CATEGORY_COLUMNS, DATETIME_COLUMNS, main, plain_issue, read_snapshot,
+                            snapshot_version, to_text, typed_issues, write_snapshot)
+from utils.storage import ISSUE_COLUMNS, FileStore, read_issues_csv
+
+LEGACY_CSV = (
+    "ID,Name,Email,College,Issue,Description,Urgency,Status,Timestamp,ResolvedBy,TechLeadResponse\n"
+    "20250115100000123456,Asha, Asha@Gmail.com,IIT,pip fails,On Windows,High,Resolved,2025-01-15 10:00:00,"
+    "lead@gmail.com,Use a venv\n"
+    "20250116100000123456,Ravi,ravi@gmail.com,NIT,Import error,,Low,Open,2025-01-16 10:00:00,,\n"
+)
+
+
+def test_csv_of_any_vintage_reads_typed():
+    df = read_issues_csv(io.StringIO(LEGACY_CSV))
+    assert list(df.columns) == ISSUE_COLUMNS
+    assert df["ID"].tolist() == ["20250115100000123456", "20250116100000123456"]  # Not an int or a float
+    assert df["Title"].tolist() == ["pip fails", "Import error"]
+    assert df["Response"].tolist() == ["Use a venv", ""]  # Empty stays "", not NaN
+    assert df["Email"].tolist() == ["asha@gmail.com", "ravi@gmail.com"]
+    assert isinstance(df["Urgency"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["Timestamp"].dtype)
+    assert df["Version"].tolist() == [0, 0]
+
+
+def test_snapshot_round_trips_with_its_schema(tmp_path):
+    df = typed_issues(pd.DataFrame([make_issue("i1"), make_issue("i2", Urgency="High")], columns=ISSUE_COLUMNS))
+    path = str(tmp_path / "issues.parquet")
+    write_snapshot(df, path)
+    assert snapshot_version(path) == SCHEMA_VERSION
+
+    back = read_snapshot(path)
+    assert all(isinstance(back[c].dtype, pd.CategoricalDtype) for c in CATEGORY_COLUMNS)
+    assert all(pd.api.types.is_datetime64_any_dtype(back[c].dtype) for c in DATETIME_COLUMNS)
+    assert back["ID"].tolist() == ["i1", "i2"] and back["Version"].dtype == "int64"
+    assert back["Timestamp"].tolist() == [pd.Timestamp("2025-01-15 10:00:00")] * 2
+    assert read_snapshot(path, ["ID", "Urgency"]).columns.tolist() == ["ID", "Urgency"]
+
+
+def test_unstamped_snapshot_is_refused(tmp_path):
+    path = str(tmp_path / "issues.parquet")
+    pd.DataFrame({"ID": ["i1"]}).to_parquet(path)
+    with pytest.raises(SchemaVersionError) as exc:
+        read_snapshot(path)
+    assert exc.value.found == 0
+
+
+def test_text_forms():
+    row = typed_issues(pd.DataFrame([make_issue("i1")], columns=ISSUE_COLUMNS))
+    assert to_text(row).iloc[0]["Timestamp"] == "2025-01-15 10:00:00"
+    assert to_text(row).iloc[0]["ResolvedAt"] == ""
+    issue = plain_issue(row.iloc[0].to_dict())
+    assert issue["Timestamp"] == "2025-01-15 10:00:00" and issue["ResolvedAt"] == "" and issue["Version"] == 0
+
+
+def test_export_then_import_restores_the_issues(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "issues.csv").write_text(LEGACY_CSV)
+    store = FileStore()
+    store.resolve("20250116100000123456", "lead@gmail.com", "Reinstall")
+    main(["export", "--out", "export.csv"])
+    exported = pd.read_csv(tmp_path / "export.csv", dtype=str, keep_default_na=False)
+    assert list(exported.columns) == ISSUE_COLUMNS
+    assert len(exported) == 2
+
+    store.add_issue(make_issue("i3"))
+    main(["import", "export.csv"])
+    assert "Imported 2 issues" in capsys.readouterr().out
+    store = FileStore()
+    assert sorted(store.load_issues()["ID"]) == ["20250115100000123456", "20250116100000123456"]
+    assert store.get("20250116100000123456")["Response"] == "Reinstall"
+    assert store.counts_by_status() == {"Resolved": 2}
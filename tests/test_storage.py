@@ -0,0 +1,127 @@
+"""IssueStore behaviour shared by both backends."""
+import pandas as pd
+import pytest
+
+from conftest import make_issue
+
+
+def test_resolve_returns_a_typed_row(store):
+    store.add_issue(make_issue("i1"))
+    after = store.resolve("i1", "lead@gmail.com", "Fixed")
+    assert after["Status"] == "Resolved"
+    assert after["ResolvedBy"] == "lead@gmail.com"
+    assert isinstance(after["ResolvedAt"], pd.Timestamp)
+    assert isinstance(after["Timestamp"], pd.Timestamp)
+    assert after["Version"] == store.get("i1")["Version"] == 1
+
+
+def test_inserted_issues_default_to_open(store):
+    issue = make_issue("i1")
+    del issue["Status"]
+    assert store.insert_issues([issue]) == ["i1"]
+    stored = store.get("i1")
+    assert stored["Status"] == "Open"
+    assert int(stored["Version"]) == 0
+    assert store.counts_by_status().get("Open") == 1
+
+
+def test_iter_resolved_bounds_are_inclusive_days(store):
+    from datetime import date
+
+    for issue_id in ("i1", "i2", "i3"):
+        store.add_issue(make_issue(issue_id))
+    store.update_issue("i1", 0, Status="Resolved", ResolvedAt="2025-03-01 00:00:00")
+    store.update_issue("i2", 0, Status="Resolved", ResolvedAt="2025-03-31T23:59:59")  # ISO form, as an import may write it
+    store.update_issue("i3", 0, Status="Resolved")  # Resolved before ResolvedAt was recorded
+
+    def ids(**filters):
+        return sorted(i for chunk in store.iter_resolved(**filters) for i in chunk["ID"])
+
+    assert ids(date_from=date(2025, 3, 1), date_to=date(2025, 3, 31)) == ["i1", "i2"]
+    assert ids(date_from=date(2025, 3, 2)) == ["i2"]
+    assert ids(date_to=date(2025, 3, 30)) == ["i1"]
+    assert ids() == ["i1", "i2", "i3"]
+
+
+def test_query_date_bounds_are_inclusive_days(store):
+    from datetime import date
+
+    store.add_issue(make_issue("i1", timestamp="2025-03-01 00:00:00"))
+    store.add_issue(make_issue("i2", timestamp="2025-03-31T23:59:59"))  # ISO form, as an import may write it
+    store.add_issue(make_issue("i3", timestamp="2025-04-01 00:00:00"))
+
+    def ids(**filters):
+        page, total = store.query_issues(**filters)
+        assert len(page) == total
+        return sorted(page["ID"])
+
+    assert ids(date_from=date(2025, 3, 1), date_to=date(2025, 3, 31)) == ["i1", "i2"]
+    assert ids(date_from=date(2025, 3, 2)) == ["i2", "i3"]
+    assert ids(date_to=date(2025, 3, 30)) == ["i1"]
+
+
+def test_stale_version_raises_conflict(store):
+    from utils.storage import ConflictError
+
+    store.add_issue(make_issue("i1"))
+    store.resolve("i1", "lead@gmail.com", "Fixed", expected_version=0)
+    with pytest.raises(ConflictError) as exc:
+        store.resolve("i1", "other@gmail.com", "Also fixed", expected_version=0)
+    assert exc.value.current["ResolvedBy"] == "lead@gmail.com"
+    assert store.get("i1")["Response"] == "Fixed"
+    assert store.aggregates().by("ResolvedBy") == {"lead@gmail.com": 1}
+
+
+def test_resolved_by_is_stored_normalized(store):
+    store.add_issue(make_issue("i1"))
+    store.add_issue(make_issue("i2"))
+    store.add_issue(make_issue("i3", status="Resolved", ResolvedBy=" LEAD@gmail.com"))  # As an import may carry it
+    store.resolve("i1", " Lead@Gmail.com ", "Fixed")
+    store.resolve("i2", "lead@gmail.com", "Fixed")
+    assert store.get("i1")["ResolvedBy"] == store.get("i3")["ResolvedBy"] == "lead@gmail.com"
+    assert store.aggregates().by("ResolvedBy") == {"lead@gmail.com": 3}
+    assert store.resolved_counts_by_lead()["ResolvedBy"].tolist() == ["lead@gmail.com"]
+    resolved = [i for chunk in store.iter_resolved(resolved_by=" Lead@gmail.com") for i in chunk["ID"]]
+    assert sorted(resolved) == ["i1", "i2", "i3"]
+    assert set(store.daily_rollups().totals("ResolvedBy").index) == {"lead@gmail.com"}
+
+
+def test_sqlite_migration_normalizes_resolved_by(tmp_path):
+    from utils.sqlite_store import SqliteStore
+
+    db = str(tmp_path / "helpdesk.db")
+    store = SqliteStore(db)
+    store.add_issue(make_issue("i1"))
+    store.add_issue(make_issue("i2"))
+    store.resolve("i1", "lead@gmail.com", "Fixed")
+    store.resolve("i2", "lead@gmail.com", "Fixed")
+    with store.connect() as conn:  # As a version 3 database could hold it
+        conn.execute("UPDATE issues SET ResolvedBy = ' lead@gmail.com' WHERE ID = 'i2'")
+        conn.execute("PRAGMA user_version = 3")
+    store.rebuild_aggregates()
+    store.rebuild_rollups()
+    assert store.aggregates().by("ResolvedBy") == {"lead@gmail.com": 1, " lead@gmail.com": 1}
+
+    store = SqliteStore(db, check_schema=False)
+    assert store.migrate_schema() == 1
+    assert store.get("i2")["ResolvedBy"] == "lead@gmail.com"
+    assert store.aggregates().by("ResolvedBy") == {"lead@gmail.com": 2}
+    assert store.daily_rollups().totals("ResolvedBy")["resolved"].to_dict() == {"lead@gmail.com": 2}
+
+
+def test_sqlite_schema_version_mismatch_fails_fast(tmp_path):
+    from utils.schema import SchemaVersionError
+    from utils.sqlite_store import SqliteStore
+
+    db = str(tmp_path / "helpdesk.db")
+    SqliteStore(db).connect().execute("PRAGMA user_version = 2")
+    with pytest.raises(SchemaVersionError):
+        SqliteStore(db)
+
+
+def test_double_submit_is_stored_once(store):
+    store.add_issue(make_issue("i1"))
+    store.add_issue(make_issue("i1"))
+    assert len(store.load_issues()) == 1
+    assert store.aggregates().total() == 1
+    assert [c["key"] for c in store.changes.since(0)[0] if c["op"] == "submit"] == ["i1"]
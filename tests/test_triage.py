@@ -0,0 +1,23 @@
+"""Triage queue leases."""
+from conftest import make_issue
+
+
+def _seen(queue, lead):
+    return queue.connect().execute("SELECT seen FROM triage_leads WHERE lead = ?", (lead,)).fetchone()[0]
+
+
+def test_checkin_writes_at_most_every_half_lease(store, monkeypatch):
+    from utils import triage
+
+    store.add_issue(make_issue("i1"))
+    queue = store.triage_queue()
+    assert queue.checkin("lead@gmail.com") == []
+    assert queue.claim("lead@gmail.com") == "i1"
+    seen = _seen(queue, "lead@gmail.com")
+
+    assert queue.checkin("lead@gmail.com") == ["i1"]  # Read only
+    assert _seen(queue, "lead@gmail.com") == seen
+
+    monkeypatch.setattr(triage, "TRIAGE_CHECKIN_SECONDS", 0)
+    assert queue.checkin("lead@gmail.com") == ["i1"]
+    assert _seen(queue, "lead@gmail.com") > seen